@@ -2,29 +2,90 @@
 Ukraine Energy Dashboard - Main Application Module.
 
 This module contains the main Dash application for visualizing Ukraine's power stations.
-It includes data loading, layout setup, callbacks for interactivity, and server configuration.
+It includes the app factory, callbacks for interactivity, and server configuration. Data is
+loaded lazily, once per process, by a DataProvider (see ``create_app``).
 """
 
+import atexit
 import datetime as dt
+import functools
+import logging
 import os
+import time
 import uuid
+from collections.abc import Hashable, Iterator, Mapping
+from pathlib import Path
 from typing import Any
+from urllib.parse import urlencode
 
 import dash
 import dash_bootstrap_components as dbc
+import flask
 import geopandas as gpd
-import pandas as pd
-from dash import Input, Output, State, dcc, html
+import numpy as np
+import plotly.graph_objects as go
+from dash import Input, Output, Patch, State, callback, clientside_callback, html
 from dotenv import load_dotenv
-from flask import Flask
+from flask import Flask, Response, abort, request
 
 # ================= Utilities =================
-from components.utils import default_map_figure, generate_map_figure, get_station_details
-from layouts.layout_main import get_main_layout, unique_oblasts
+from components.clusters import (
+    bounds_from_corners,
+    cluster_trace_data,
+    empty_cluster_trace_data,
+    rows_in_bounds,
+    viewport_bounds,
+)
+from components.compression import DEFAULT_MIN_SIZE, ResponseCompressor, install_compression
+from components.data_provider import DEFAULT_DATA_DIR, DashboardData, DataProvider
+from components.encoding import DEFAULT_COORDINATE_DECIMALS, encode_figure, encode_trace
+from components.export import EXPORT_FORMATS, export_response
+from components.figure_cache import FigureCache, MapState, warm_up_figure_cache
+from components.filter_index import FilterIndex, build_filter_index
+from components.geo_cache import DEFAULT_CACHE_DIR
+from components.metrics import PROMETHEUS_MIMETYPE, CallbackMetrics, gauge_lines, instrument_callbacks
+from components.profiling import DEFAULT_PROFILE_DIR, CallbackProfiler, instrument_profiling
+from components.selection import SelectionCache
+from components.table import (
+    TABLE_COLUMNS,
+    TableQuery,
+    filter_rows,
+    normalise_sort_by,
+    normalise_table_query,
+    page_bounds,
+    sort_rows,
+)
+from components.tiles import (
+    DEFAULT_TILE_CACHE_DIR,
+    MAX_TILE_ZOOM,
+    MIN_TILE_ZOOM,
+    MVT_MIMETYPE,
+    TILE_LAYERS,
+    TileCache,
+    vector_tile_layers,
+)
+from components.utils import (
+    CLUSTER_TRACE_INDEX,
+    HIGHLIGHT_TRACE_INDEX,
+    MARKER_TRACE_OFFSET,
+    OUTLINE_TRACE_INDEX,
+    generate_map_figure,
+    get_station_details,
+    highlight_trace_data,
+    marker_trace_data,
+    station_center,
+    station_color,
+)
+from layouts.layout_main import get_main_layout
+
+logger = logging.getLogger(__name__)
 
 
 def _apply_power_source_filter(
-    stations_df: gpd.GeoDataFrame, filter_type: str, include_substations: bool = True
+    stations_df: gpd.GeoDataFrame,
+    filter_type: str,
+    include_substations: bool = True,
+    index: FilterIndex | None = None,
 ) -> gpd.GeoDataFrame:
     """
     Apply power source type filter to stations data.
@@ -33,6 +94,7 @@ def _apply_power_source_filter(
         stations_df: GeoDataFrame containing station data
         filter_type: Type of filter to apply ('thermal', 'nuclear', 'renewable')
         include_substations: Whether to include substations in the filtered result
+        index: Prebuilt FilterIndex for ``stations_df``; built on the fly when omitted
 
     Returns:
         Filtered GeoDataFrame
@@ -41,78 +103,54 @@ def _apply_power_source_filter(
     if filter_type == "all":
         return stations_df
 
-    # Define categories based on new classification
-    # Thermal: heat-based, usually combustion
-    thermal = {"coal", "gas", "oil", "diesel", "mazut", "biogas", "biomass", "wood", "waste"}
-    # nuclear = {"nuclear"}
-    # Renewables: non-thermal (solar, wind, hydro)
-    renewable = {"solar", "wind", "hydro"}
-
-    # Get plants only first
-    plants_df = stations_df[stations_df["power"] == "plant"]
-
-    if filter_type == "thermal":
-        # Filter for thermal plants (all heat-based combustion sources)
-        filtered_plants = plants_df[
-            plants_df["plant:source"].apply(
-                lambda sources: any(fuel in thermal for fuel in str(sources).split(";")) if pd.notna(sources) else False
-            )
-        ]
-    elif filter_type == "nuclear":
-        # Filter for nuclear plants
-        filtered_plants = plants_df[
-            plants_df["plant:source"].apply(
-                lambda sources: "nuclear" in str(sources).split(";") if pd.notna(sources) else False
-            )
-        ]
-    elif filter_type == "renewable":
-        # Filter for renewable plants (non-thermal: solar, wind, hydro)
-        filtered_plants = plants_df[
-            plants_df["plant:source"].apply(
-                lambda sources: any(fuel in renewable for fuel in str(sources).split(";"))
-                if pd.notna(sources)
-                else False
-            )
-        ]
-    else:
-        filtered_plants = plants_df
+    index = index if index is not None else build_filter_index(stations_df)
+    mask = index.mask("power", "plant") & index.mask("category", filter_type)
 
     # Add substations if requested
     if include_substations:
-        substations_df = stations_df[stations_df["power"] == "substation"]
-        return pd.concat([filtered_plants, substations_df], ignore_index=True)
-    else:
-        return filtered_plants
+        mask |= index.mask("power", "substation")
+    return stations_df.iloc[np.flatnonzero(mask)]
 
 
-# ================= Load Data =================
-stations_df = gpd.read_file("assets/data/power_stations_with_oblasts.geojson").set_geometry("geometry")
-stations_df = stations_df.to_crs(4326)
-if "centroid" not in stations_df.columns:
-    stations_df["centroid"] = stations_df.geometry.centroid
+# ================= Data =================
+# Datasets are loaded lazily, once per process, and shared by all callbacks
+provider = DataProvider()
 
-oblasts_gdf = gpd.read_file("assets/data/ukraine_oblasts.geojson").set_geometry("geometry")
-outer_ukraine = gpd.read_file("assets/data/full_ukraine.geojson").set_geometry("geometry")
+# Rendered map figures, keyed by normalised filter state (stored with the compact payload encoding)
+figure_cache = FigureCache(encode=lambda figure: encode_figure(figure, *_payload_encoding()))
+# figures rendered from replaced data must not be served after a reload
+provider.add_listener(lambda _data: figure_cache.clear())
 
-# ================= Env =================
-load_dotenv()
-server = Flask(__name__)
+# Station rows of the current filters and lasso/box selection, keyed by the token in ``selection-store``
+selection_cache = SelectionCache()
+provider.add_listener(lambda _data: selection_cache.clear())
 
-# ================= App Setup =================
-app = dash.Dash(
-    __name__,
-    suppress_callback_exceptions=True,
-    external_stylesheets=[
-        dbc.themes.BOOTSTRAP,
-        "https://fonts.googleapis.com/css2?family=Kaisei+Decol&family=Libre+Franklin:wght@100..900&display=swap",
-    ],
-    server=server,
-)
-server.secret_key = os.getenv("FLASK_SECRET_KEY", str(uuid.uuid4()))
+# Vector tiles of stations and boundaries, cached on disk per dataset
+tile_cache = TileCache()
+provider.add_listener(lambda _data: tile_cache.reset())
+
+# Wall/CPU time and response size of every callback request, exposed on /metrics
+callback_metrics = CallbackMetrics()
 
-app.layout = get_main_layout(unique_oblasts, stations_df)
+# Profiles of sampled or explicitly requested callback requests, written when slow (off by default)
+profiler = CallbackProfiler()
 
-app.index_string = """
+# Above this many stations in the current filters the map switches to viewport-driven level of detail;
+# with vector tiles the tile layers draw the outlines and every station, and the traces only carry the
+# markers of the viewport (up to ``tile_marker_limit``, clusters beyond it);
+# figure payloads are sent with coordinates rounded to ``coordinate_decimals``, as typed arrays if enabled
+map_settings = {
+    "lod_marker_limit": 20000,
+    "vector_tiles": False,
+    "tile_marker_limit": 2000,
+    "coordinate_decimals": DEFAULT_COORDINATE_DECIMALS,
+    "typed_arrays": True,
+}
+
+# gzip/brotli compression of the server's responses
+compressor = ResponseCompressor()
+
+INDEX_STRING = """
 <!DOCTYPE html>
 <html>
     <head>
@@ -136,7 +174,7 @@ app.index_string = """
 
 
 # ================= Filter Stores =================
-@app.callback(Output("gppd-filter-store", "data"), Input("gppd-filter", "value"))
+@callback(Output("gppd-filter-store", "data"), Input("gppd-filter", "value"))
 def store_gppd_filter(value: list[str]) -> dict[str, bool]:
     """
     Store GPPD filter state in dcc.Store component.
@@ -151,7 +189,7 @@ def store_gppd_filter(value: list[str]) -> dict[str, bool]:
     return {"enabled": "gppd" in value}
 
 
-@app.callback(Output("substations-filter-store", "data"), Input("substations-filter", "value"))
+@callback(Output("substations-filter-store", "data"), Input("substations-filter", "value"))
 def store_substations_filter(value: list[str]) -> dict[str, bool]:
     """
     Store substations filter state in dcc.Store component.
@@ -166,7 +204,7 @@ def store_substations_filter(value: list[str]) -> dict[str, bool]:
     return {"enabled": "substations" in value}
 
 
-@app.callback(
+@callback(
     [
         Output("power-source-filter-store", "data"),
         Output("power-source-all", "className"),
@@ -244,7 +282,7 @@ def update_power_source_filter(
     )
 
 
-@app.callback(
+@callback(
     [Output("substations-filter", "value"), Output("substations-filter", "options")],
     Input("power-source-filter", "value"),
     State("substations-filter", "value"),
@@ -269,143 +307,322 @@ def update_substations_filter(power_source: str, current_substations: list[str])
         return current_substations, [{"label": "", "value": "substations", "disabled": False}]
 
 
+# ================= Shared Selection =================
+@callback(
+    Output("selection-store", "data"),
+    Input("oblast-dropdown", "value"),
+    Input("gppd-filter-store", "data"),
+    Input("power-source-filter-store", "data"),
+    Input("substations-filter-store", "data"),
+    Input("map-display", "selectedData"),
+)
+def update_selection(
+    selected_oblast: str | None,
+    gppd_store: dict[str, bool] | None,
+    power_source_store: dict[str, str] | None,
+    substations_store: dict[str, bool] | None,
+    selected_data: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """
+    Resolve the sidebar filters and the lasso/box selection once per interaction.
+
+    The rows are kept in the server-side selection cache; the map, table, details panel and export
+    link only listen to the small token written to ``selection-store``.
+
+    Args:
+        selected_oblast: Currently selected oblast from dropdown
+        gppd_store: GPPD filter state
+        power_source_store: Power source filter state
+        substations_store: Substations filter state
+        selected_data: Data from lasso/box selection on the map
+
+    Returns:
+        Selection store data (token and URL parameters of the selection)
+
+    """
+    query = normalise_table_query(
+        selected_oblast, gppd_store, power_source_store, substations_store, selected_data, None, None
+    )
+    return selection_cache.get(provider.get(), query).to_store()
+
+
 # ================= Map Callback =================
-@app.callback(
-    Output("map-display", "figure"),
+def _filter_rows(data: DashboardData, state: MapState) -> np.ndarray:
+    """Station store positions passing the GPPD, power source and substations filters of a map state."""
+    # substations only toggle when showing all sources
+    return data.filter_index.select(
+        gppd_only=state.gppd_only,
+        power_source=state.power_source,
+        include_substations=state.include_substations,
+    )
+
+
+def _view_rows(data: DashboardData, state: MapState) -> np.ndarray:
+    """Station store positions shown by a map state: its filters, restricted to its oblast."""
+    return data.oblast_registry.restrict(_filter_rows(data, state), state.oblast)
+
+
+def _marker_limit() -> int:
+    """Most stations drawn as individual markers (in the viewport, when drawn with level of detail)."""
+    return int(map_settings["tile_marker_limit" if map_settings["vector_tiles"] else "lod_marker_limit"])
+
+
+def _lod_enabled(rows: np.ndarray) -> bool:
+    """Whether the markers follow the viewport: always with vector tiles, else above the marker limit."""
+    return bool(map_settings["vector_tiles"]) or rows.size > _marker_limit()
+
+
+def _view_bounds(view: dict[str, Any] | None) -> tuple[float, float, float, float] | None:
+    """Lon/lat bounds of a recorded view: reported by the browser, or estimated from its center and zoom."""
+    view = view or {}
+    bounds = bounds_from_corners(view.get("bounds"))
+    if bounds is None and view.get("center") and view.get("zoom") is not None:
+        bounds = viewport_bounds(view["center"], view["zoom"])
+    return bounds
+
+
+def _level_of_detail(
+    data: DashboardData, rows: np.ndarray, bounds: tuple[float, float, float, float] | None, zoom: float
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    Marker and cluster trace data of the stations in view.
+
+    Below the marker limit every row is drawn as a marker. Above it (and always with vector tiles,
+    which draw the other stations) only the rows inside the (padded) viewport are considered: they
+    are drawn as markers if few enough remain, otherwise as clusters of the pyramid level for ``zoom``.
+    """
+    store = data.station_store
+    limit = _marker_limit()
+    if (rows.size > limit or map_settings["vector_tiles"]) and bounds is not None:
+        rows = rows_in_bounds(store, rows, bounds)
+    if rows.size <= limit:
+        return marker_trace_data(store, rows), empty_cluster_trace_data()
+    return marker_trace_data(store, rows[:0]), cluster_trace_data(data.cluster_pyramid, store, rows, zoom)
+
+
+def _payload_encoding() -> tuple[int, bool]:
+    """Coordinate decimals and typed-array flag of the figure payloads."""
+    return int(map_settings["coordinate_decimals"]), bool(map_settings["typed_arrays"])
+
+
+def _set_trace(patched: Patch, index: int, trace_data: dict[str, Any]) -> None:
+    """Write the (compactly encoded) properties of one trace into a partial figure update."""
+    for key, value in encode_trace(trace_data, *_payload_encoding()).items():
+        patched["data"][index][key] = value
+
+
+def _set_level_of_detail(patched: Patch, markers: list[dict[str, Any]], clusters: dict[str, Any]) -> Patch:
+    """Write marker and cluster trace data into a partial figure update."""
+    for offset, trace_data in enumerate(markers):
+        _set_trace(patched, MARKER_TRACE_OFFSET + offset, trace_data)
+    _set_trace(patched, CLUSTER_TRACE_INDEX, clusters)
+    return patched
+
+
+def render_map_figure(state: MapState) -> go.Figure:
+    """
+    Build the full map figure for a normalised filter state.
+
+    With more stations than the marker limit, the initial view is drawn with level of detail for
+    its estimated viewport (later pans and zooms are handled by ``update_lod_view``). With vector
+    tiles the outline trace is left empty, the tile layers draw the boundaries.
+
+    Args:
+        state: Normalised map state (oblast and filters)
+
+    Returns:
+        Plotly figure object with map visualization
+
+    """
+    data = provider.get()
+    rows = _filter_rows(data, state)
+    lod = _lod_enabled(_view_rows(data, state))
+    fig = generate_map_figure(
+        data.stations_df,
+        data.oblasts_gdf,
+        selected_oblast=state.oblast,
+        click_data=None,
+        reset=False,
+        outer_ukraine=data.outer_ukraine,
+        store=data.station_store,
+        # marker traces are filled in below for level-of-detail views
+        rows=rows[:0] if lod else rows,
+        boundaries=data.boundary_pyramid,
+        oblasts=data.oblast_registry,
+    )
+    if lod:
+        mapbox = fig.layout.mapbox
+        center, zoom = {"lat": mapbox.center.lat, "lon": mapbox.center.lon}, mapbox.zoom
+        markers, clusters = _level_of_detail(data, _view_rows(data, state), viewport_bounds(center, zoom), zoom)
+        for offset, trace_data in enumerate(markers):
+            fig.data[MARKER_TRACE_OFFSET + offset].update(trace_data)
+        fig.data[CLUSTER_TRACE_INDEX].update(clusters)
+    if map_settings["vector_tiles"]:
+        fig.data[OUTLINE_TRACE_INDEX].update(lat=[], lon=[])
+    return fig
+
+
+def _patch_markers(data: DashboardData, rows: np.ndarray, view: dict[str, Any] | None) -> Patch:
+    """Partial figure update replacing only the data arrays of the marker (and cluster) traces."""
+    if not _lod_enabled(rows):
+        return _set_level_of_detail(Patch(), marker_trace_data(data.station_store, rows), empty_cluster_trace_data())
+    zoom = (view or {}).get("zoom", 5)
+    return _set_level_of_detail(Patch(), *_level_of_detail(data, rows, _view_bounds(view), zoom))
+
+
+def _patch_station_focus(
+    data: DashboardData, rows: np.ndarray, station_index: Hashable | None, uirevision: str
+) -> tuple[Patch, dict[str, Any]] | None:
+    """Partial figure update zooming to a clicked station and highlighting its polygon, plus the new view."""
+    if station_index is None or station_index not in data.stations_df.index:
+        return None
+    station_row = data.stations_df.loc[station_index]
+    view = {"center": station_center(station_row.geometry), "zoom": 15}
+
+    patched = Patch()
+    patched["layout"]["mapbox"]["center"] = view["center"]
+    patched["layout"]["mapbox"]["zoom"] = view["zoom"]
+    patched["layout"]["uirevision"] = uirevision
+    _set_trace(patched, HIGHLIGHT_TRACE_INDEX, highlight_trace_data(station_row.geometry, station_color(station_row)))
+
+    if _lod_enabled(rows):
+        # the markers around the station replace the clusters of the previous view
+        _set_level_of_detail(patched, *_level_of_detail(data, rows, _view_bounds(view), view["zoom"]))
+    return patched, view
+
+
+@callback(
+    [
+        Output("map-display", "figure"),
+        Output("map-focus-store", "data"),
+        Output("map-lod-store", "data"),
+        Output("map-view-store-mainpage", "data", allow_duplicate=True),
+    ],
     [
-        Input("oblast-dropdown", "value"),
+        Input("selection-store", "data"),
         Input("map-display", "clickData"),
-        Input("map-display", "relayoutData"),
-        Input("map-display", "selectedData"),
-        Input("gppd-filter-store", "data"),
-        Input("power-source-filter-store", "data"),
-        Input("substations-filter-store", "data"),
+        Input("reset-view-button", "n_clicks"),
     ],
+    State("map-focus-store", "data"),
     State("map-view-store-mainpage", "data"),
-    prevent_initial_call=False,
+    prevent_initial_call="initial_duplicate",
 )
 def update_map(
-    selected_oblast: str | None,
+    selection_store: dict[str, Any] | None,
     click_data: dict[str, Any] | None,
-    relayout_data: dict[str, Any] | None,
-    selected_data: dict[str, Any] | None,
-    gppd_store: dict[str, bool],
-    power_source_store: dict[str, str],
-    substations_store: dict[str, bool],
-    store_data: dict[str, Any] | None,
-) -> dict[str, Any]:
+    reset_clicks: int | None,
+    focus_store: dict[str, Any] | None,
+    view_store: dict[str, Any] | None,
+) -> tuple[dict[str, Any] | Patch, dict[str, Any], dict[str, bool], dict[str, Any]]:
     """
     Update the map visualization based on user interactions and filters.
 
+    A full figure is only sent when the view changes (first paint, oblast selection, reset button).
+    Filter changes and station clicks are sent as partial updates (``dash.Patch``), so the outline
+    traces are never re-sent. Pan/zoom is handled entirely in the browser: the figure's
+    ``uirevision`` only changes with the focus, so filter updates keep the user's viewport.
+    When more stations pass the filters than the marker limit, the map is drawn with level of
+    detail (markers or clusters for the viewport) and ``map-lod-store`` asks the browser to report
+    its pans and zooms to ``update_lod_view``.
+
     Args:
-        selected_oblast: Currently selected oblast from dropdown
+        selection_store: Token of the shared selection (oblast, filters, lasso/box outline)
         click_data: Data from map click events
-        relayout_data: Data from map zoom/pan events
-        selected_data: Data from lasso/box selection
-        gppd_store: GPPD filter state
-        power_source_store: Power source filter state
-        substations_store: Substations filter state
-        store_data: Stored map view state
+        reset_clicks: Number of clicks on the reset view button
+        focus_store: View the browser currently shows (oblast, reset count, clicked station, filters)
+        view_store: Viewport last reported by the browser (center, zoom, bounds)
 
     Returns:
-        Dictionary containing the updated map figure
+        Tuple of (map figure or Patch, focus store data, level-of-detail store data, viewport store data)
 
     """
     ctx = dash.callback_context
     triggered = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
-    ignore_click = "oblast-dropdown" in triggered  # ignore stale click
 
-    # 🔹 Apply GPPD filter
-    filtered_stations = stations_df.copy()
-    if gppd_store and gppd_store.get("enabled"):
-        filtered_stations = filtered_stations[filtered_stations["gppd_overlap"]]
-
-    # 🔹 Apply power source filter
-    if power_source_store and power_source_store.get("type") != "all":
-        filter_type = power_source_store.get("type")
-        filtered_stations = _apply_power_source_filter(filtered_stations, filter_type, include_substations=False)
-    # 🔹 Apply substations filter only when showing all power sources
-    elif substations_store and not substations_store.get("enabled"):
-        filtered_stations = filtered_stations[filtered_stations["power"] != "substation"]
+    data = provider.get()
+    selection = selection_cache.from_store(data, selection_store)
+    state = selection.map_state
+    filters = list(state)
+    view = {"oblast": state.oblast, "reset": reset_clicks or 0}
+    focus = focus_store or {}
+    lod = {"enabled": _lod_enabled(selection.rows)}
 
     # ---------------- Map Logic ----------------
-    if "map-display.relayoutData" in triggered:
-        if selected_oblast:
-            return generate_map_figure(
-                filtered_stations,
-                oblasts_gdf,
-                selected_oblast=selected_oblast,
-                click_data=None,
-                reset=True,
-                outer_ukraine=outer_ukraine,
-            )
-        else:
-            return default_map_figure(filtered_stations, outer_ukraine=outer_ukraine)
-
-    if "oblast-dropdown" in triggered:
-        return generate_map_figure(
-            filtered_stations,
-            oblasts_gdf,
-            selected_oblast=selected_oblast,
-            click_data=None,
-            reset=False,
-            outer_ukraine=outer_ukraine,
+    # first paint, oblast selection (drops a stale click) or reset → full figure from the cache
+    if focus.get("view") != view:
+        figure = figure_cache.get_or_render(state, lambda: render_map_figure(state))
+        # cached figures are shared, so only the layout is copied to attach the view revision
+        uirevision = f"{state.oblast}|None|{view['reset']}"
+        mapbox = figure["layout"]["mapbox"]
+        layout = {**figure["layout"], "uirevision": uirevision}
+        if map_settings["vector_tiles"]:
+            # tile URLs must be absolute for the map's web workers, so they are attached per request
+            layout["mapbox"] = {**mapbox, "layers": vector_tile_layers(request.host_url.rstrip("/") + "/tiles")}
+        return (
+            {**figure, "layout": layout},
+            {"view": view, "station": None, "filters": filters},
+            lod,
+            {"center": mapbox["center"], "zoom": mapbox["zoom"]},
         )
 
-    if "map-display.clickData" in triggered and click_data and not ignore_click:
-        return generate_map_figure(
-            filtered_stations,
-            oblasts_gdf,
-            selected_oblast=selected_oblast,
-            click_data=click_data,
-            reset=False,
-            outer_ukraine=outer_ukraine,
+    # station click → recenter and highlight, markers untouched (unless drawn with level of detail)
+    if "map-display.clickData" in triggered and click_data and click_data.get("points"):
+        # cluster points carry no station index and are ignored
+        station_index = click_data["points"][0].get("customdata")
+        focused = _patch_station_focus(
+            data, selection.rows, station_index, f"{state.oblast}|{station_index}|{view['reset']}"
         )
+        if focused is None:
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+        patched, station_view = focused
+        return patched, {"view": view, "station": station_index, "filters": filters}, lod, station_view
 
-    if "map-display.selectedData" in triggered:
-        return generate_map_figure(
-            filtered_stations,
-            oblasts_gdf,
-            selected_oblast=selected_oblast,
-            click_data=None,
-            reset=False,
-            outer_ukraine=outer_ukraine,
-        )
+    # a lasso/box selection only narrows the table, the markers stay as they are
+    if focus.get("filters") == filters:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
-    # Default fallback
-    return generate_map_figure(
-        filtered_stations,
-        oblasts_gdf,
-        selected_oblast=selected_oblast,
-        click_data=None,
-        reset=False,
-        outer_ukraine=outer_ukraine,
-    )
+    # filter change → replace marker data only, keep the current viewport and highlight
+    return _patch_markers(data, selection.rows, view_store), {**focus, "filters": filters}, lod, dash.no_update
+
+
+@callback(
+    Output("map-display", "figure", allow_duplicate=True),
+    Input("map-lod-view-store", "data"),
+    State("selection-store", "data"),
+    prevent_initial_call=True,
+)
+def update_lod_view(view: dict[str, Any] | None, selection_store: dict[str, Any] | None) -> Patch:
+    """
+    Redraw the markers or clusters for a new viewport while the map is in level-of-detail mode.
+
+    Only called for pans and zooms reported while ``map-lod-store`` is enabled, so maps with few
+    enough stations never make a server round trip for a viewport change.
+
+    Args:
+        view: Viewport reported by the browser (center, zoom, bounds)
+        selection_store: Token of the shared selection
+
+    Returns:
+        Patch of the marker and cluster traces
+
+    """
+    data = provider.get()
+    return _patch_markers(data, selection_cache.from_store(data, selection_store).rows, view)
 
 
 # ================= Station Sidebar =================
-@app.callback(
+@callback(
     Output("station-details", "children"),
     [
         Input("map-display", "clickData"),
-        Input("map-display", "relayoutData"),
-        Input("oblast-dropdown", "value"),
-        Input("gppd-filter-store", "data"),
-        Input("power-source-filter-store", "data"),
-        Input("substations-filter-store", "data"),
-        Input("map-display", "selectedData"),
+        Input("selection-store", "data"),
         Input("stations-table", "active_cell"),
     ],
     prevent_initial_call=False,
 )
 def update_station_details(
     click_data: dict[str, Any] | None,
-    relayout_data: dict[str, Any] | None,
-    selected_oblast: str | None,
-    gppd_filter: dict[str, bool] | None,
-    power_source_filter: dict[str, str] | None,
-    substations_filter: dict[str, bool] | None,
-    selected_data: dict[str, Any] | None,
+    selection_store: dict[str, Any] | None,
     active_cell: dict[str, Any] | None,
 ) -> html.Div | str:
     """
@@ -413,12 +630,7 @@ def update_station_details(
 
     Args:
         click_data: Data from map click events
-        relayout_data: Data from map zoom/pan events
-        selected_oblast: Currently selected oblast
-        gppd_filter: GPPD filter state
-        power_source_filter: Power source filter state
-        substations_filter: Substations filter state
-        selected_data: Data from lasso/box selection
+        selection_store: Token of the shared selection (changes with any filter or lasso/box selection)
         active_cell: Active cell in the table
 
     Returns:
@@ -428,21 +640,14 @@ def update_station_details(
     ctx = dash.callback_context
     triggered = ctx.triggered[0]["prop_id"] if ctx.triggered else ""
 
-    # Clear station details when any filter changes, map is manipulated, table is interacted with, or lasso selection is made
-    if (
-        "oblast-dropdown" in triggered
-        or "relayoutData" in triggered
-        or "gppd-filter-store" in triggered
-        or "power-source-filter-store" in triggered
-        or "substations-filter-store" in triggered
-        or "selectedData" in triggered
-        or "active_cell" in triggered
-    ):
+    # Clear station details when any filter changes, table is interacted with, or lasso selection is made
+    if "selection-store" in triggered or "active_cell" in triggered:
         return ""
 
     if click_data and "points" in click_data and len(click_data["points"]) > 0:
         point = click_data["points"][0]
         station_index = point.get("customdata")
+        stations_df = provider.get().stations_df
         if station_index is not None and station_index in stations_df.index:
             station_row = stations_df.loc[int(station_index)]
             return get_station_details(station_row)
@@ -451,101 +656,248 @@ def update_station_details(
 
 
 # ================= Lasso / Selected Stations Table =================
-@app.callback(
+def _table_query(
+    selection_store: dict[str, Any] | None, filter_query: str | None, sort_by: list[dict[str, str]] | None
+) -> TableQuery:
+    """Table query of the shared selection with the table's filter row and sort order."""
+    query = TableQuery.from_params((selection_store or {}).get("params") or {})
+    return query._replace(filter_query=filter_query or "", sort_by=normalise_sort_by(sort_by))
+
+
+def _table_rows(data: DashboardData, query: TableQuery) -> np.ndarray:
+    """Row positions of the stations table: shared selection, table filter row, sort order."""
+    selection = selection_cache.get(data, query)
+    rows = filter_rows(data.table_index, selection.selected, query.filter_query)
+    return sort_rows(data.table_index, rows, query.sort_by)
+
+
+@callback(
     Output("stations-table", "data"),
-    Input("oblast-dropdown", "value"),
-    Input("gppd-filter-store", "data"),
-    Input("power-source-filter-store", "data"),
-    Input("substations-filter-store", "data"),
-    Input("map-display", "selectedData"),
+    Output("stations-table", "page_count"),
+    Output("stations-table", "page_current"),
+    Output("stations-table-count", "children"),
+    Input("selection-store", "data"),
+    Input("stations-table", "page_current"),
+    Input("stations-table", "page_size"),
+    Input("stations-table", "sort_by"),
+    Input("stations-table", "filter_query"),
     prevent_initial_call=False,
 )
 def update_table(
-    selected_oblast: str | None,
-    gppd_filter: dict[str, bool] | None,
-    power_source_filter: dict[str, str] | None,
-    substations_filter: dict[str, bool] | None,
-    selected_data: dict[str, Any] | None,
-) -> list[dict[str, Any]]:
+    selection_store: dict[str, Any] | None,
+    page_current: int | None,
+    page_size: int | None,
+    sort_by: list[dict[str, str]] | None,
+    filter_query: str | None,
+) -> tuple[list[dict[str, Any]], int, int, str]:
     """
-    Update the stations table based on filters and selections.
+    Update the visible page of the stations table based on filters, selections, sorting and paging.
+
+    Filtering, sorting and paging run on the server (the table's actions are ``"custom"``), so only
+    the rows of the current page are sent to the browser.
 
     Args:
-        selected_oblast: Currently selected oblast from dropdown
-        gppd_filter: GPPD filter state
-        power_source_filter: Power source filter state
-        substations_filter: Substations filter state
-        selected_data: Data from lasso/box selection on map
+        selection_store: Token of the shared selection (oblast, filters, lasso/box outline)
+        page_current: Zero-based page shown by the table
+        page_size: Rows per page
+        sort_by: Sort columns and directions of the table
+        filter_query: Query from the table's filter row
 
     Returns:
-        List of station records for the data table
+        Tuple of (station records of the page, page count, page shown, total row count text)
 
     """
-    df = stations_df.copy()
+    data = provider.get()
+    rows = _table_rows(data, _table_query(selection_store, filter_query, sort_by))
+
+    # any change of the row set starts again at the first page
+    triggered = dash.callback_context.triggered[0]["prop_id"] if dash.callback_context.triggered else ""
+    if "page_current" not in triggered and "page_size" not in triggered:
+        page_current = 0
+    page, page_count, page_size = page_bounds(len(rows), page_current, page_size)
+    page_rows = rows[page * page_size : (page + 1) * page_size]
+
+    # only the table columns of the visible rows are materialised
+    stations_df = data.stations_df
+    records = stations_df.iloc[page_rows, stations_df.columns.get_indexer(TABLE_COLUMNS)].to_dict("records")
+    return records, page_count, page, f"{len(rows):,} stations"
+
+
+# 2) Export link and endpoint
+@callback(
+    Output("download-link", "href"),
+    Input("export-format", "value"),
+    Input("selection-store", "data"),
+    Input("stations-table", "filter_query"),
+    Input("stations-table", "sort_by"),
+)
+def update_download_link(
+    export_format: str | None,
+    selection_store: dict[str, Any] | None,
+    filter_query: str | None,
+    sort_by: list[dict[str, str]] | None,
+) -> str:
+    """
+    Point the download link at the export endpoint for the current table rows.
 
-    # filter by oblast
-    if selected_oblast:
-        df = df[df["oblast_name_en"] == selected_oblast]
+    The link only encodes the filter state; the export itself is built and streamed by the server,
+    which takes the rows of the shared selection from the selection cache.
 
-    # apply GPPD filter
-    if gppd_filter and gppd_filter.get("enabled"):
-        df = df[df["gppd_overlap"]]
+    Args:
+        export_format: Selected export format (key of EXPORT_FORMATS)
+        selection_store: Token of the shared selection (oblast, filters, lasso/box outline)
+        filter_query: Query from the table's filter row
+        sort_by: Sort columns and directions of the table
 
-    # apply power source filter
-    if power_source_filter and power_source_filter.get("type") != "all":
-        filter_type = power_source_filter.get("type")
-        df = _apply_power_source_filter(df, filter_type, include_substations=False)
-    # apply substations filter only when showing all power sources
-    elif substations_filter and not substations_filter.get("enabled"):
-        df = df[df["power"] != "substation"]
+    Returns:
+        Relative URL of the export
 
-    # filter by lasso selection
-    if selected_data and "points" in selected_data:
-        indices = [pt.get("customdata") for pt in selected_data["points"] if pt.get("customdata") in stations_df.index]
-        if indices:
-            df = stations_df.loc[indices]
+    """
+    query = _table_query(selection_store, filter_query, sort_by)
+    return f"/export/{export_format or 'xlsx'}?{urlencode(query.to_params())}"
 
-    if df.empty:
-        return []
 
-    return df[
-        ["name", "station_name_en", "power", "plant:source", "plant:method", "oblast_name_en", "gppd_overlap"]
-    ].to_dict("records")
+def export_stations(fmt: str) -> Response:
+    """
+    Stream all rows of the stations table (every page, with geometry) in the requested format.
 
+    Args:
+        fmt: Export format (key of EXPORT_FORMATS)
+
+    Returns:
+        Streamed attachment response
 
-# 2) Download callback
-@app.callback(
-    Output("download-data", "data"),
-    Input("download-button", "n_clicks"),
-    State("stations-table", "data"),
-    prevent_initial_call=True,
-)
-def generate_excel_download(n_clicks: int | None, table_data: list[dict[str, Any]] | None) -> dict[str, Any] | None:
     """
-    Generate Excel download for the current table data.
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    data = provider.get()
+    rows = _table_rows(data, TableQuery.from_params(request.args))
+    timestamp = dt.datetime.now().strftime("%Y%m%d")
+    return export_response(fmt, data.stations_df, rows, f"ukraine_power_stations_osm_{timestamp}")
+
+
+# 3) Vector tiles
+def serve_tile(layer: str, z: int, x: int, y: int) -> Response:
+    """
+    Serve one Mapbox Vector Tile of the stations, oblast outlines or country border.
 
     Args:
-        n_clicks: Number of times download button was clicked
-        table_data: Current data in the stations table
+        layer: Tile layer (one of TILE_LAYERS)
+        z: Zoom level
+        x: Tile column
+        y: Tile row
 
     Returns:
-        Download data for dcc.Download component or None
+        Response with the MVT-encoded tile
 
     """
-    if not table_data:
-        return None
+    if layer not in TILE_LAYERS or not MIN_TILE_ZOOM <= z <= MAX_TILE_ZOOM or not (0 <= x < 2**z and 0 <= y < 2**z):
+        abort(404)
+    data = provider.get()
+    tile = tile_cache.get(tile_cache.source(data, provider.data_dir), layer, z, x, y)
+    response = Response(tile, mimetype=MVT_MIMETYPE)
+    # tile URLs do not change with the data, so browsers revalidate after a day
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return response
+
+
+# 4) Metrics
+def _collect_gauges() -> list[str]:
+    """Data-load timings and cache statistics of this process, read at scrape time."""
+    caches = {"figures": figure_cache, "selections": selection_cache, "tiles": tile_cache}
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    lines = gauge_lines("dashboard_data_generation", "Number of times the data was loaded", [({}, provider.generation)])
+    if provider.loaded:
+        # only report the data already loaded, a scrape must not trigger loading it
+        timings = provider.get().timings
+        lines += gauge_lines(
+            "dashboard_data_load_seconds",
+            "Seconds spent per phase of the last data load",
+            [({"phase": phase}, seconds) for phase, seconds in timings.items()],
+        )
+    for stat, documentation in (
+        ("hits", "Cache hits since start or the last reload"),
+        ("misses", "Cache misses since start or the last reload"),
+        ("hit_ratio", "Share of cache lookups answered from the cache"),
+    ):
+        samples = [({"cache": name}, values[stat]) for name, values in stats.items()]
+        lines += gauge_lines(f"dashboard_cache_{stat}", documentation, samples)
+    return lines
 
-    df = pd.DataFrame(table_data)
-    timestamp = dt.datetime.now().strftime("%Y%m%d")
 
-    # Use dcc.send_data_frame to send the Excel file
-    return dcc.send_data_frame(
-        df.to_excel, f"ukraine_power_stations_osm_{timestamp}.xlsx", index=False, engine="openpyxl"
-    )
+callback_metrics.add_gauges(_collect_gauges)
+
+
+def serve_metrics() -> Response:
+    """
+    Serve the callback, data-load and cache metrics of this process in the Prometheus text format.
+
+    Returns:
+        Response with the exposition text
+
+    """
+    return Response(callback_metrics.render(), content_type=PROMETHEUS_MIMETYPE)
+
+
+def serve_slowest_requests() -> Response:
+    """
+    Serve the slowest callback requests of this process with their inputs (``METRICS_SLOWEST``).
+
+    Returns:
+        JSON response, slowest first
+
+    """
+    return flask.jsonify(callback_metrics.slowest_requests())
+
+
+def _log_slowest_requests() -> None:
+    """Dump the slowest callback requests to the log (at interpreter exit)."""
+    for request_info in callback_metrics.slowest_requests():
+        logger.info(
+            "Slow callback %s (%s): %.3fs wall, %.3fs CPU, %d bytes, inputs %s",
+            request_info["callback"],
+            request_info["trigger"],
+            request_info["seconds"],
+            request_info["cpu_seconds"],
+            request_info["response_bytes"],
+            request_info["inputs"],
+        )
+
+
+# ================= Viewport Store =================
+# Pan/zoom stays in the browser: the current view is recorded client-side without a server round trip,
+# and only forwarded to the server (map-lod-view-store) while the map is drawn with level of detail
+clientside_callback(
+    """
+    function(relayoutData, view, lod) {
+        if (!relayoutData) {
+            return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+        }
+        const updated = Object.assign({}, view || {});
+        if ("mapbox.center" in relayoutData) {
+            updated.center = relayoutData["mapbox.center"];
+        }
+        if ("mapbox.zoom" in relayoutData) {
+            updated.zoom = relayoutData["mapbox.zoom"];
+        }
+        if ("mapbox._derived" in relayoutData) {
+            updated.bounds = relayoutData["mapbox._derived"].coordinates;
+        }
+        // the server only hears about the viewport while the map is drawn with level of detail
+        const lodView = lod && lod.enabled ? updated : window.dash_clientside.no_update;
+        return [updated, lodView];
+    }
+    """,
+    Output("map-view-store-mainpage", "data"),
+    Output("map-lod-view-store", "data"),
+    Input("map-display", "relayoutData"),
+    State("map-view-store-mainpage", "data"),
+    State("map-lod-store", "data"),
+)
 
 
 # ================= Auto-scroll Sidebar on Station Click =================
-app.clientside_callback(
+clientside_callback(
     """
     function(children) {
         // Only scroll if children is not empty (station details are shown)
@@ -575,6 +927,175 @@ app.clientside_callback(
 )
 
 
+# ================= App Factory =================
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Whether an environment variable is set to a truthy value (1/true/yes)."""
+    return os.getenv(name, "1" if default else "").lower() in {"1", "true", "yes"}
+
+
+def default_config() -> dict[str, Any]:
+    """
+    Read the app configuration from the environment (and a ``.env`` file).
+
+    Returns:
+        Configuration dictionary accepted by create_app
+
+    """
+    load_dotenv()
+    return {
+        "DATA_DIR": os.getenv("DATA_DIR", str(DEFAULT_DATA_DIR)),
+        # empty GEO_CACHE_DIR disables the GeoParquet startup cache
+        "GEO_CACHE_DIR": os.getenv("GEO_CACHE_DIR", str(DEFAULT_CACHE_DIR)),
+        "FIGURE_CACHE_SIZE": int(os.getenv("FIGURE_CACHE_SIZE", "256")),
+        "FIGURE_CACHE_WARMUP": _env_flag("FIGURE_CACHE_WARMUP"),
+        "SELECTION_CACHE_SIZE": int(os.getenv("SELECTION_CACHE_SIZE", "1024")),
+        "LOD_MARKER_LIMIT": int(os.getenv("LOD_MARKER_LIMIT", "20000")),
+        "MAP_VECTOR_TILES": _env_flag("MAP_VECTOR_TILES"),
+        "TILE_MARKER_LIMIT": int(os.getenv("TILE_MARKER_LIMIT", "2000")),
+        # decimals kept for figure coordinates (5 is about a metre) and typed-array encoding of the arrays
+        "FIGURE_COORDINATE_DECIMALS": int(os.getenv("FIGURE_COORDINATE_DECIMALS", str(DEFAULT_COORDINATE_DECIMALS))),
+        "FIGURE_TYPED_ARRAYS": _env_flag("FIGURE_TYPED_ARRAYS", default=True),
+        "COMPRESSION_ENABLED": _env_flag("COMPRESSION_ENABLED", default=True),
+        "COMPRESSION_MIN_SIZE": int(os.getenv("COMPRESSION_MIN_SIZE", str(DEFAULT_MIN_SIZE))),
+        # empty TILE_CACHE_DIR disables the on-disk tile cache
+        "TILE_CACHE_DIR": os.getenv("TILE_CACHE_DIR", str(DEFAULT_TILE_CACHE_DIR)),
+        "PRELOAD_DATA": _env_flag("PRELOAD_DATA"),
+        "METRICS_ENABLED": _env_flag("METRICS_ENABLED", default=True),
+        # keep the N slowest callback requests with their inputs (0 disables)
+        "METRICS_SLOWEST": int(os.getenv("METRICS_SLOWEST", "0")),
+        # share of callback requests profiled at random (0 disables), and whether ?profile=1 may ask for it
+        "PROFILE_SAMPLE_RATE": float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+        "PROFILE_REQUESTS": _env_flag("PROFILE_REQUESTS"),
+        "PROFILE_THRESHOLD_MS": float(os.getenv("PROFILE_THRESHOLD_MS", "500")),
+        "PROFILE_MODE": os.getenv("PROFILE_MODE", "sample"),
+        "PROFILE_DIR": os.getenv("PROFILE_DIR", str(DEFAULT_PROFILE_DIR)),
+        "SECRET_KEY": os.getenv("FLASK_SECRET_KEY", str(uuid.uuid4())),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _build_layout(data: DashboardData) -> html.Div:
+    """Build the page layout for a loaded dataset (rebuilt only after a reload)."""
+    start = time.perf_counter()
+    layout = get_main_layout(data.oblast_registry.names, data.stations_df, data.fuel_matrix)
+    logger.info("Built layout in %.3fs", time.perf_counter() - start)
+    return layout
+
+
+def serve_layout() -> html.Div:
+    """
+    Return the page layout, loading the data on the first page load of the process.
+
+    Returns:
+        Dash HTML Div containing the complete dashboard layout
+
+    """
+    return _build_layout(provider.get())
+
+
+def reload_data() -> DashboardData:
+    """
+    Reload the datasets of this process; figures rendered from the old data are dropped.
+
+    Returns:
+        The newly loaded DashboardData
+
+    """
+    return provider.reload()
+
+
+def _warm_up_states() -> Iterator[MapState]:
+    """All-Ukraine and each oblast with default filters (the oblasts are known once the data is loaded)."""
+    yield MapState()
+    for name in provider.get().oblast_registry.names:
+        yield MapState(oblast=name)
+
+
+def create_app(config: Mapping[str, Any] | None = None) -> dash.Dash:
+    """
+    Create the Dash app without loading any data (unless ``PRELOAD_DATA`` is set).
+
+    Data is loaded once per process by the shared DataProvider on first use. With ``PRELOAD_DATA``
+    it is loaded (and the figure cache warmed up, if enabled) right away, which is what gunicorn's
+    ``--preload`` needs to load it once in the master and share it with the forked workers.
+
+    Args:
+        config: Overrides for the keys of default_config()
+
+    Returns:
+        Configured Dash app; its Flask server is ``app.server``
+
+    """
+    config = {**default_config(), **(config or {})}
+    logging.basicConfig(level=config["LOG_LEVEL"])
+    provider.configure(config["DATA_DIR"], config["GEO_CACHE_DIR"] or None)
+    figure_cache.maxsize = int(config["FIGURE_CACHE_SIZE"])
+    selection_cache.maxsize = int(config["SELECTION_CACHE_SIZE"])
+    map_settings["lod_marker_limit"] = int(config["LOD_MARKER_LIMIT"])
+    map_settings["vector_tiles"] = bool(config["MAP_VECTOR_TILES"])
+    map_settings["tile_marker_limit"] = int(config["TILE_MARKER_LIMIT"])
+    map_settings["coordinate_decimals"] = int(config["FIGURE_COORDINATE_DECIMALS"])
+    map_settings["typed_arrays"] = bool(config["FIGURE_TYPED_ARRAYS"])
+    tile_cache.cache_dir = Path(config["TILE_CACHE_DIR"]) if config["TILE_CACHE_DIR"] else None
+
+    server = Flask(__name__)
+    server.secret_key = config["SECRET_KEY"]
+    app = dash.Dash(
+        __name__,
+        suppress_callback_exceptions=True,
+        external_stylesheets=[
+            dbc.themes.BOOTSTRAP,
+            "https://fonts.googleapis.com/css2?family=Kaisei+Decol&family=Libre+Franklin:wght@100..900&display=swap",
+        ],
+        server=server,
+    )
+    app.index_string = INDEX_STRING
+    server.add_url_rule("/export/<fmt>", "export_stations", export_stations)
+    server.add_url_rule("/tiles/<layer>/<int:z>/<int:x>/<int:y>.pbf", "serve_tile", serve_tile)
+    if config["COMPRESSION_ENABLED"]:
+        # first after_request hook, so it runs last: metrics and profiles see the uncompressed responses
+        compressor.min_size = int(config["COMPRESSION_MIN_SIZE"])
+        install_compression(server, compressor)
+    profiler.output_dir = Path(config["PROFILE_DIR"])
+    profiler.threshold = float(config["PROFILE_THRESHOLD_MS"]) / 1000
+    profiler.sample_rate = float(config["PROFILE_SAMPLE_RATE"])
+    profiler.allow_requests = bool(config["PROFILE_REQUESTS"])
+    profiler.mode = config["PROFILE_MODE"]
+    # installed before the metrics hooks, so writing a profile is not counted as callback time
+    instrument_profiling(app, profiler)
+    if config["METRICS_ENABLED"]:
+        callback_metrics.slowest = int(config["METRICS_SLOWEST"])
+        instrument_callbacks(app, callback_metrics)
+        server.add_url_rule("/metrics", "serve_metrics", serve_metrics)
+        server.add_url_rule("/metrics/slowest", "serve_slowest_requests", serve_slowest_requests)
+        if callback_metrics.slowest:
+            atexit.register(_log_slowest_requests)
+    # built from the provider's data on the first page load, not at import
+    app.layout = serve_layout
+
+    warm_up = None
+    if config["FIGURE_CACHE_WARMUP"]:
+        # all-Ukraine and each oblast with default filters
+        warm_up = warm_up_figure_cache(
+            figure_cache,
+            _warm_up_states(),
+            render_map_figure,
+        )
+
+    if config["PRELOAD_DATA"]:
+        if warm_up is not None:
+            warm_up.join()
+        serve_layout()
+        provider.preload()
+
+    return app
+
+
+# ================= App Instance =================
+app = create_app()
+server = app.server
+
 # ================= Run Server =================
 if __name__ == "__main__":
     app.run(debug=True)
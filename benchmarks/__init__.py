@@ -0,0 +1 @@
+"""Benchmarks of the Ukraine Energy Dashboard rendering and data pipeline hot paths."""
@@ -0,0 +1,276 @@
+"""
+Benchmark cases of the Ukraine Energy Dashboard.
+
+A case is a setup function registered with ``@benchmark``: it receives the synthetic fixtures
+of one dataset size, does all preparation that should not be timed, and returns the zero-argument
+callable the runner times. Fixtures are generated lazily and shared by all cases of a size.
+"""
+
+import contextlib
+import functools
+import io
+import json
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import geopandas as gpd
+import plotly.graph_objects as go
+from flask.testing import FlaskClient
+
+from benchmarks.synthetic import synthetic_gppd, synthetic_overpass, synthetic_stations, write_dataset, write_gadm
+from components.data_provider import DashboardData, load_dashboard_data
+from components.utils import add_station_markers, generate_map_figure
+
+
+class Fixtures:
+    """Synthetic data of one dataset size, generated on first use and kept for all cases of the size."""
+
+    def __init__(self, size: int, seed: int = 0) -> None:
+        self.size = size
+        self.seed = seed
+        self._tmp = tempfile.TemporaryDirectory(prefix=f"ukr-energy-bench-{size}-")
+        self.tmp_dir = Path(self._tmp.name)
+
+    def close(self) -> None:
+        """Delete the files written for this size."""
+        self._tmp.cleanup()
+
+    @functools.cached_property
+    def stations(self) -> gpd.GeoDataFrame:
+        """Processed stations (the input of the pipeline's later stages)."""
+        return synthetic_stations(self.size, self.seed)
+
+    @functools.cached_property
+    def data_dir(self) -> Path:
+        """Directory with the GeoJSON assets the dashboard loads."""
+        return write_dataset(self.tmp_dir / "data", self.size, self.seed)
+
+    @functools.cached_property
+    def data(self) -> DashboardData:
+        """Dashboard data loaded from ``data_dir`` (without the GeoParquet cache)."""
+        return load_dashboard_data(self.data_dir, cache_dir=None)
+
+    @functools.cached_property
+    def overpass(self) -> dict[str, Any]:
+        """Overpass JSON with ``size`` tagged features."""
+        return synthetic_overpass(self.size, self.seed)
+
+    @functools.cached_property
+    def gadm_path(self) -> Path:
+        """GADM-style oblast GeoPackage."""
+        return write_gadm(self.tmp_dir / "gadm.gpkg")
+
+    @functools.cached_property
+    def gppd_path(self) -> Path:
+        """GPPD-style CSV with one plant per 20 stations."""
+        path = self.tmp_dir / "gppd.csv"
+        synthetic_gppd(max(self.size // 20, 1), self.seed).to_csv(path, index=False)
+        return path
+
+    @functools.cached_property
+    def client(self) -> FlaskClient:
+        """Test client of the dashboard app, serving ``data_dir``."""
+        import app as dashboard
+
+        dashboard.provider.configure(self.data_dir, None)
+        dashboard.provider.get()
+        return dashboard.app.server.test_client()
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A registered benchmark case."""
+
+    name: str
+    group: str
+    setup: Callable[[Fixtures], Callable[[], object]]
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str, group: str
+) -> Callable[[Callable[[Fixtures], Callable[[], object]]], Callable[[Fixtures], Callable[[], object]]]:
+    """
+    Register a setup function as a benchmark case.
+
+    Args:
+        name: Unique case name, e.g. 'generate_map_figure[oblast]'
+        group: 'render' for the app's request path, 'pipeline' for data processing
+
+    Returns:
+        Decorator returning the setup function unchanged
+
+    """
+
+    def register(setup: Callable[[Fixtures], Callable[[], object]]) -> Callable[[Fixtures], Callable[[], object]]:
+        BENCHMARKS[name] = Benchmark(name=name, group=group, setup=setup)
+        return setup
+
+    return register
+
+
+# ================= Rendering =================
+def _map_figure(fixtures: Fixtures, **kwargs: object) -> Callable[[], go.Figure]:
+    """Time ``generate_map_figure`` with the app's precomputed structures."""
+    data = fixtures.data
+    return lambda: generate_map_figure(
+        data.stations_df,
+        data.oblasts_gdf,
+        outer_ukraine=data.outer_ukraine,
+        store=data.station_store,
+        rows=data.station_store.all_rows(),
+        boundaries=data.boundary_pyramid,
+        oblasts=data.oblast_registry,
+        **kwargs,
+    )
+
+
+@benchmark("generate_map_figure[country]", "render")
+def bench_map_country(fixtures: Fixtures) -> Callable[[], object]:
+    return _map_figure(fixtures)
+
+
+@benchmark("generate_map_figure[oblast]", "render")
+def bench_map_oblast(fixtures: Fixtures) -> Callable[[], object]:
+    return _map_figure(fixtures, selected_oblast="Kiev")
+
+
+@benchmark("generate_map_figure[station]", "render")
+def bench_map_station(fixtures: Fixtures) -> Callable[[], object]:
+    station = int(fixtures.data.stations_df.index[0])
+    return _map_figure(fixtures, click_data={"points": [{"customdata": station}]})
+
+
+@benchmark("generate_map_figure[reset]", "render")
+def bench_map_reset(fixtures: Fixtures) -> Callable[[], object]:
+    return _map_figure(fixtures, selected_oblast="Kiev", reset=True)
+
+
+@benchmark("add_station_markers[single]", "render")
+def bench_markers_single(fixtures: Fixtures) -> Callable[[], object]:
+    data = fixtures.data
+    return lambda: add_station_markers(go.Figure(), data.stations_df, show_legend=False, store=data.station_store)
+
+
+@benchmark("add_station_markers[legend]", "render")
+def bench_markers_legend(fixtures: Fixtures) -> Callable[[], object]:
+    data = fixtures.data
+    return lambda: add_station_markers(go.Figure(), data.stations_df, show_legend=True, store=data.station_store)
+
+
+@benchmark("_apply_power_source_filter[thermal]", "render")
+def bench_power_source_filter(fixtures: Fixtures) -> Callable[[], object]:
+    from app import _apply_power_source_filter
+
+    data = fixtures.data
+    return lambda: _apply_power_source_filter(data.stations_df, "thermal", index=data.filter_index)
+
+
+@benchmark("_apply_power_source_filter[renewable+substations]", "render")
+def bench_power_source_filter_substations(fixtures: Fixtures) -> Callable[[], object]:
+    from app import _apply_power_source_filter
+
+    data = fixtures.data
+    return lambda: _apply_power_source_filter(
+        data.stations_df, "renewable", include_substations=True, index=data.filter_index
+    )
+
+
+def _table_request(client: FlaskClient, params: dict[str, str], sort_by: list[dict[str, str]]) -> dict[str, Any]:
+    """Body of a Dash callback request for ``update_table`` (the table changes page)."""
+    dependencies = client.get("/_dash-dependencies").get_json()
+    spec = next(dep for dep in dependencies if "stations-table.data" in dep["output"])
+    values = {
+        "selection-store.data": {"params": params},
+        "stations-table.page_current": 1,
+        "stations-table.page_size": 50,
+        "stations-table.sort_by": sort_by,
+        "stations-table.filter_query": "",
+    }
+    outputs = [
+        dict(zip(("id", "property"), out.rsplit(".", 1), strict=True)) for out in spec["output"].strip(".").split("...")
+    ]
+    return {
+        "output": spec["output"],
+        "outputs": outputs,
+        "inputs": [{**dep, "value": values.get(f"{dep['id']}.{dep['property']}")} for dep in spec["inputs"]],
+        "state": [],
+        "changedPropIds": ["stations-table.page_current"],
+    }
+
+
+def _update_table(fixtures: Fixtures, params: dict[str, str], sort_by: list[dict[str, str]]) -> Callable[[], object]:
+    """Time one ``update_table`` round trip through the Dash callback endpoint."""
+    client = fixtures.client
+    body = _table_request(client, params, sort_by)
+
+    def request() -> object:
+        response = client.post("/_dash-update-component", json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f"update_table failed with HTTP {response.status_code}")
+        return response
+
+    return request
+
+
+@benchmark("update_table[page]", "render")
+def bench_update_table_page(fixtures: Fixtures) -> Callable[[], object]:
+    return _update_table(fixtures, {}, [])
+
+
+@benchmark("update_table[filtered+sorted]", "render")
+def bench_update_table_sorted(fixtures: Fixtures) -> Callable[[], object]:
+    return _update_table(
+        fixtures, {"power_source": "renewable", "gppd": "1"}, [{"column_id": "station_name_en", "direction": "desc"}]
+    )
+
+
+# ================= Pipeline =================
+@benchmark("elements_to_geodataframe", "pipeline")
+def bench_elements_to_geodataframe(fixtures: Fixtures) -> Callable[[], object]:
+    from data.process import elements_to_geodataframe
+
+    overpass = fixtures.overpass
+    return lambda: elements_to_geodataframe(overpass)
+
+
+@benchmark("stream_elements", "pipeline")
+def bench_stream_elements(fixtures: Fixtures) -> Callable[[], object]:
+    from data.process import STREAM_CHUNK_SIZE, ElementCollector, iter_json_array
+
+    body = json.dumps(fixtures.overpass).encode()
+
+    def stream() -> gpd.GeoDataFrame:
+        chunks = (body[i : i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE))
+        return ElementCollector().extend(iter_json_array(chunks, "elements")).to_geodataframe()
+
+    return stream
+
+
+@benchmark("assign_oblasts", "pipeline")
+def bench_assign_oblasts(fixtures: Fixtures) -> Callable[[], object]:
+    from data.process import assign_oblasts
+
+    stations = fixtures.stations.drop(columns=["oblast_name_en"])
+    gadm = str(fixtures.gadm_path)
+    return lambda: assign_oblasts(stations, gadm_url=gadm)
+
+
+@benchmark("match_with_gppd", "pipeline")
+def bench_match_with_gppd(fixtures: Fixtures) -> Callable[[], object]:
+    from data.process import match_with_gppd
+
+    stations = fixtures.stations.drop(columns=["gppd_overlap"])
+    gppd = str(fixtures.gppd_path)
+
+    def match() -> gpd.GeoDataFrame:
+        # the summary printed per run would drown the benchmark output
+        with contextlib.redirect_stdout(io.StringIO()):
+            return match_with_gppd(stations, gppd_url=gppd)
+
+    return match
@@ -0,0 +1,280 @@
+"""
+Benchmark runner of the Ukraine Energy Dashboard.
+
+Times the registered cases at each requested dataset size and stores the results as JSON,
+together with the commit, Python and package versions, so runs of different releases can be
+compared::
+
+    python -m benchmarks.runner run --sizes 1k,10k,100k
+    python -m benchmarks.runner run --sizes 1m --match pipeline
+    python -m benchmarks.runner compare benchmarks/results/v0.1.json benchmarks/results/latest.json
+
+Each case is called until ``--repeat`` timings are collected or ``--max-time`` seconds are spent
+(at least once); the first call is timed like the others, so ``min`` is the number to compare.
+"""
+
+import argparse
+import datetime as dt
+import fnmatch
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Sequence
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from benchmarks.cases import BENCHMARKS, Fixtures
+from benchmarks.synthetic import dataset_size
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the results file changes
+RESULTS_FORMAT_VERSION = 1
+
+DEFAULT_RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_SIZES = ("1k", "10k", "100k")
+
+# Packages whose versions are recorded with the results
+RECORDED_PACKAGES = ("numpy", "pandas", "geopandas", "shapely", "pyogrio", "plotly", "dash", "flask")
+
+
+def time_callable(func: Callable[[], object], repeat: int, max_time: float) -> list[float]:
+    """
+    Time repeated calls of a function, garbage collection disabled while a call runs.
+
+    Args:
+        func: Zero-argument function to time
+        repeat: Maximum number of calls
+        max_time: Stop repeating once this many seconds were spent (after at least one call)
+
+    Returns:
+        Wall-clock seconds per call
+
+    """
+    times: list[float] = []
+    deadline = time.perf_counter() + max_time
+    while len(times) < repeat and (not times or time.perf_counter() < deadline):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return times
+
+
+def summarise(times: Sequence[float]) -> dict[str, Any]:
+    """
+    Summary statistics of a case's timings.
+
+    Args:
+        times: Seconds per call
+
+    Returns:
+        Dictionary with the raw times, rounds, min, median, mean and stdev
+
+    """
+    return {
+        "times": list(times),
+        "rounds": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def _git_commit() -> str | None:
+    """Commit of the working tree, or None outside a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _package_version(name: str) -> str | None:
+    """Installed version of a distribution, or None when it is missing."""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment() -> dict[str, Any]:
+    """
+    Describe the environment of a run.
+
+    Returns:
+        Dictionary with the timestamp, commit, app version, Python, platform and package versions
+
+    """
+    return {
+        "created": dt.datetime.now(dt.UTC).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "version": _package_version("ukr-energy-dash"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "packages": {name: _package_version(name) for name in RECORDED_PACKAGES},
+    }
+
+
+def run_benchmarks(
+    sizes: Sequence[str], patterns: Sequence[str] = ("*",), repeat: int = 5, max_time: float = 30.0, seed: int = 0
+) -> dict[str, Any]:
+    """
+    Run the matching cases at each size.
+
+    Args:
+        sizes: Dataset size labels (keys of SIZES or plain numbers)
+        patterns: Shell-style patterns matched against case names and groups
+        repeat: Maximum calls per case and size
+        max_time: Time budget per case and size in seconds
+        seed: Seed of the synthetic data
+
+    Returns:
+        Results document: environment, settings and ``results[case][size]`` summaries
+
+    """
+    cases = [
+        case
+        for case in BENCHMARKS.values()
+        if any(fnmatch.fnmatch(case.name, pattern) or fnmatch.fnmatch(case.group, pattern) for pattern in patterns)
+    ]
+    results: dict[str, dict[str, Any]] = {case.name: {} for case in cases}
+    for label in sizes:
+        fixtures = Fixtures(dataset_size(label), seed)
+        try:
+            for case in cases:
+                func = case.setup(fixtures)
+                summary = {"n": fixtures.size, **summarise(time_callable(func, repeat, max_time))}
+                results[case.name][label] = summary
+                logger.info("%-48s %6s  min %9.4fs  median %9.4fs", case.name, label, summary["min"], summary["median"])
+        finally:
+            fixtures.close()
+    return {
+        "format": RESULTS_FORMAT_VERSION,
+        "environment": environment(),
+        "settings": {"sizes": list(sizes), "repeat": repeat, "max_time": max_time, "seed": seed},
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any], stat: str = "min", threshold: float = 0.1
+) -> list[dict[str, Any]]:
+    """
+    Compare two results documents case by case.
+
+    Args:
+        baseline: Results of the reference run (e.g. the last release)
+        current: Results of the run to check
+        stat: Statistic to compare ('min', 'median' or 'mean')
+        threshold: Relative slowdown above which a case counts as a regression
+
+    Returns:
+        One row per case and size present in both runs, with both values, their ratio and a regression flag
+
+    """
+    rows = []
+    for name, sizes in current["results"].items():
+        for label, summary in sizes.items():
+            reference = baseline["results"].get(name, {}).get(label)
+            if reference is None:
+                continue
+            ratio = summary[stat] / reference[stat] if reference[stat] else float("inf")
+            rows.append(
+                {
+                    "case": name,
+                    "size": label,
+                    "baseline": reference[stat],
+                    "current": summary[stat],
+                    "ratio": ratio,
+                    "regression": ratio > 1 + threshold,
+                }
+            )
+    return rows
+
+
+def _load(path: str | os.PathLike) -> dict[str, Any]:
+    """Read a results document."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _run(args: argparse.Namespace) -> int:
+    """``run`` command: time the cases and write the results file."""
+    document = run_benchmarks(
+        [label for label in args.sizes.split(",") if label],
+        args.match or ["*"],
+        repeat=args.repeat,
+        max_time=args.max_time,
+        seed=args.seed,
+    )
+    output = Path(args.output) if args.output else None
+    if output is None:
+        stamp = dt.datetime.now().strftime("%Y%m%dT%H%M%S")
+        output = DEFAULT_RESULTS_DIR / f"{stamp}-{document['environment']['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    logger.info("Wrote %s", output)
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    """``compare`` command: print the relative change per case; exit status 1 on regressions."""
+    rows = compare_results(_load(args.baseline), _load(args.current), args.stat, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['case']:<48} {row['size']:>6}  {row['baseline']:9.4f}s -> {row['current']:9.4f}s"
+            f"  x{row['ratio']:.2f}  {flag}"
+        )
+    return int(any(row["regression"] for row in rows))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line entry point (``python -m benchmarks.runner``)."""
+    parser = argparse.ArgumentParser(description="Benchmarks of the Ukraine Energy Dashboard")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="time the benchmark cases and write a results file")
+    run.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="comma-separated sizes, e.g. 1k,10k,100k,1m")
+    run.add_argument("--match", action="append", help="case name or group pattern, e.g. 'update_table*' or pipeline")
+    run.add_argument("--repeat", type=int, default=5, help="maximum calls per case and size")
+    run.add_argument("--max-time", type=float, default=30.0, help="time budget per case and size in seconds")
+    run.add_argument("--seed", type=int, default=0, help="seed of the synthetic data")
+    run.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    run.set_defaults(handler=_run)
+
+    compare = subparsers.add_parser("compare", help="compare two results files")
+    compare.add_argument("baseline", help="results file of the reference run")
+    compare.add_argument("current", help="results file of the run to check")
+    compare.add_argument("--stat", choices=("min", "median", "mean"), default="min")
+    compare.add_argument("--threshold", type=float, default=0.1, help="relative slowdown counted as a regression")
+    compare.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
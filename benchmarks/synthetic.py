@@ -0,0 +1,329 @@
+"""
+Synthetic datasets for the Ukraine Energy Dashboard benchmarks.
+
+Everything is generated from a seed inside Ukraine's bounding box, at any size: station
+GeoDataFrames with the columns of the processed GeoJSON, the matching oblast and country
+outlines, Overpass-style JSON as returned by the bulk query, a GADM-style oblast GeoPackage and
+a GPPD-style CSV. The oblasts are a regular grid over the bounding box, so the oblast of a
+station follows from its coordinates without any geometry work.
+"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from components.data_provider import OBLASTS_FILE, OUTER_UKRAINE_FILE, STATIONS_FILE
+
+# (west, south, east, north) of mainland Ukraine and Crimea
+UKRAINE_BOUNDS = (22.14, 44.38, 40.23, 52.38)
+
+# Dataset sizes by label, as accepted by the benchmark runner
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+OBLAST_NAMES = (
+    "Cherkasy",
+    "Chernihiv",
+    "Chernivtsi",
+    "Crimea",
+    "Dnipropetrovsk",
+    "Donetsk",
+    "Ivano-Frankivsk",
+    "Kharkiv",
+    "Kherson",
+    "Khmelnytskyi",
+    "Kiev",
+    "Kiev City",
+    "Kirovohrad",
+    "Luhansk",
+    "Lviv",
+    "Mykolayiv",
+    "Odessa",
+    "Poltava",
+    "Rivne",
+    "Sevastopol",
+    "Sumy",
+    "Ternopil",
+    "Vinnytsya",
+    "Volyn",
+    "Zakarpattia",
+    "Zaporizhia",
+    "Zhytomyr",
+)
+
+# Columns x rows of the oblast grid (one cell per name)
+OBLAST_GRID = (9, 3)
+
+# Source tags and their share of the plants, close to the OSM data
+PLANT_SOURCES = {
+    "solar": 0.57,
+    "gas": 0.2,
+    "hydro": 0.13,
+    "coal": 0.03,
+    "wind": 0.03,
+    "nuclear": 0.01,
+    "biogas": 0.01,
+    "gas;oil": 0.01,
+    "coal;gas": 0.01,
+}
+
+SUBSTATION_SHARE = 0.33
+POLYGON_SHARE = 0.95
+GPPD_SHARE = 0.05
+
+# Edge length range of the square station footprints, in degrees (roughly 50-500 m)
+FOOTPRINT_DEGREES = (0.0005, 0.005)
+
+
+def dataset_size(label: str) -> int:
+    """
+    Parse a dataset size label.
+
+    Args:
+        label: Key of SIZES (e.g. '10k') or a plain number of features
+
+    Returns:
+        Number of features
+
+    """
+    label = label.strip().lower()
+    return SIZES[label] if label in SIZES else int(label)
+
+
+def _oblast_cells() -> list[tuple[str, shapely.Polygon]]:
+    """Grid cell of every oblast name, west to east and south to north."""
+    west, south, east, north = UKRAINE_BOUNDS
+    cols, rows = OBLAST_GRID
+    width, height = (east - west) / cols, (north - south) / rows
+    return [
+        (
+            name,
+            shapely.box(west + col * width, south + row * height, west + (col + 1) * width, south + (row + 1) * height),
+        )
+        for name, (row, col) in zip(OBLAST_NAMES, np.ndindex(rows, cols), strict=True)
+    ]
+
+
+def _oblast_of(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """Oblast name of the grid cell containing each coordinate."""
+    west, south, east, north = UKRAINE_BOUNDS
+    cols, rows = OBLAST_GRID
+    col = np.clip(((lon - west) / (east - west) * cols).astype(int), 0, cols - 1)
+    row = np.clip(((lat - south) / (north - south) * rows).astype(int), 0, rows - 1)
+    return np.asarray(OBLAST_NAMES, dtype=object)[row * cols + col]
+
+
+def synthetic_oblasts() -> gpd.GeoDataFrame:
+    """
+    Oblast outlines as a grid over Ukraine's bounding box.
+
+    Returns:
+        GeoDataFrame with 'oblast_name_en' and geometry (EPSG:4326)
+
+    """
+    names, geometries = zip(*_oblast_cells(), strict=True)
+    return gpd.GeoDataFrame({"oblast_name_en": names}, geometry=list(geometries), crs="EPSG:4326")
+
+
+def synthetic_country() -> gpd.GeoDataFrame:
+    """
+    Country outline (the bounding box).
+
+    Returns:
+        GeoDataFrame with one polygon (EPSG:4326)
+
+    """
+    return gpd.GeoDataFrame(geometry=[shapely.box(*UKRAINE_BOUNDS)], crs="EPSG:4326")
+
+
+def _coordinates(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Uniformly distributed lon/lat inside the bounding box."""
+    west, south, east, north = UKRAINE_BOUNDS
+    return rng.uniform(west, east, n), rng.uniform(south, north, n)
+
+
+def synthetic_stations(n: int, seed: int = 0) -> gpd.GeoDataFrame:
+    """
+    Generate power plants and substations with the columns of the processed station GeoJSON.
+
+    Args:
+        n: Number of stations
+        seed: Random seed
+
+    Returns:
+        GeoDataFrame of ``n`` stations (mostly square footprints, some points), EPSG:4326
+
+    """
+    rng = np.random.default_rng(seed)
+    lon, lat = _coordinates(rng, n)
+    is_substation = rng.random(n) < SUBSTATION_SHARE
+    is_polygon = rng.random(n) < POLYGON_SHARE
+
+    sources = np.asarray(list(PLANT_SOURCES), dtype=object)
+    weights = np.asarray(list(PLANT_SOURCES.values()))
+    source = sources[rng.choice(len(sources), size=n, p=weights / weights.sum())]
+    source[is_substation] = None
+
+    half = rng.uniform(*FOOTPRINT_DEGREES, n) / 2
+    footprints = shapely.box(lon - half, lat - half, lon + half, lat + half)
+    geometry = np.where(is_polygon, footprints, shapely.points(lon, lat))
+
+    ids = np.arange(1, n + 1)
+    output = rng.integers(1, 4000, n).astype(str).astype(object) + " MW"
+    output[is_substation] = None
+    voltage = np.where(is_substation, "330000;110000", None)
+    return gpd.GeoDataFrame(
+        {
+            "osm_id": ids,
+            "osm_type": np.where(is_polygon, "way", "node"),
+            "power": np.where(is_substation, "substation", "plant"),
+            "substation": np.where(is_substation, "transmission", None),
+            "name": [f"Станція {i}" for i in ids],
+            "station_name_en": [f"Station {i}" for i in ids],
+            "operator": np.where(rng.random(n) < 0.5, "Ukrenergo", None),
+            "operator:en": None,
+            "barrier": None,
+            "voltage": voltage,
+            "landuse": np.where(is_polygon, "industrial", None),
+            "plant:method": None,
+            "plant:output:electricity": output,
+            "plant:source": source,
+            "oblast_name_en": _oblast_of(lon, lat),
+            "gppd_overlap": rng.random(n) < GPPD_SHARE,
+        },
+        geometry=geometry,
+        crs="EPSG:4326",
+    )
+
+
+def _tags(rng: np.random.Generator, n: int) -> list[dict[str, str]]:
+    """Overpass tags of ``n`` plants and substations."""
+    sources = list(PLANT_SOURCES)
+    weights = np.asarray(list(PLANT_SOURCES.values()))
+    picks = rng.choice(len(sources), size=n, p=weights / weights.sum()).tolist()
+    substations = (rng.random(n) < SUBSTATION_SHARE).tolist()
+    return [
+        {"power": "substation", "substation": "transmission", "name": f"Substation {i}"}
+        if substation
+        else {"power": "plant", "plant:source": sources[pick], "name": f"Plant {i}"}
+        for i, (pick, substation) in enumerate(zip(picks, substations, strict=True))
+    ]
+
+
+def synthetic_overpass(n: int, seed: int = 0, relation_share: float = 0.02) -> dict[str, Any]:
+    """
+    Generate an Overpass JSON response as returned by the bulk query (``out body; >; out skel qt;``).
+
+    Tagged elements come first: closed ways (square footprints, 4 skeleton nodes each), tagged
+    nodes, and multipolygon relations with two outer ways. Untagged skeleton nodes and the member
+    ways of the relations follow.
+
+    Args:
+        n: Number of tagged features (ways, nodes and relations)
+        seed: Random seed
+        relation_share: Share of the features that are multipolygon relations
+
+    Returns:
+        Dictionary with an 'elements' list
+
+    """
+    rng = np.random.default_rng(seed)
+    lon, lat = _coordinates(rng, n)
+    half = rng.uniform(*FOOTPRINT_DEGREES, n) / 2
+    # 0: closed way, 1: tagged node, 2: multipolygon relation
+    kind = np.where(rng.random(n) < POLYGON_SHARE, 0, 1)
+    kind[rng.random(n) < relation_share] = 2
+    tags = _tags(rng, n)
+
+    elements: list[dict[str, Any]] = []
+    skeleton: list[dict[str, Any]] = []
+    next_node = n + 1
+
+    def ring(x: float, y: float, h: float) -> list[int]:
+        nonlocal next_node
+        ids = list(range(next_node, next_node + 4))
+        next_node += 4
+        corners = ((x - h, y - h), (x + h, y - h), (x + h, y + h), (x - h, y + h))
+        skeleton.extend({"type": "node", "id": i, "lat": c[1], "lon": c[0]} for i, c in zip(ids, corners, strict=True))
+        return [*ids, ids[0]]
+
+    member_ways = []
+    for i, (x, y, h, k) in enumerate(zip(lon.tolist(), lat.tolist(), half.tolist(), kind.tolist(), strict=True)):
+        if k == 0:
+            elements.append({"type": "way", "id": i + 1, "nodes": ring(x, y, h), "tags": tags[i]})
+        elif k == 1:
+            elements.append({"type": "node", "id": i + 1, "lat": y, "lon": x, "tags": tags[i]})
+        else:
+            outer = [{"type": "way", "id": n + 2 * i + j + 1, "nodes": ring(x + 3 * j * h, y, h)} for j in range(2)]
+            member_ways.extend(outer)
+            members = [{"type": "way", "ref": way["id"], "role": "outer"} for way in outer]
+            elements.append(
+                {"type": "relation", "id": i + 1, "members": members, "tags": {**tags[i], "type": "multipolygon"}}
+            )
+    return {"version": 0.6, "generator": "synthetic", "elements": elements + member_ways + skeleton}
+
+
+def synthetic_gppd(n: int = 500, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate GPPD-style plants: ``n`` in Ukraine plus a few in another country.
+
+    Args:
+        n: Number of Ukrainian plants
+        seed: Random seed
+
+    Returns:
+        DataFrame with name, country_long, latitude and longitude
+
+    """
+    rng = np.random.default_rng(seed)
+    lon, lat = _coordinates(rng, n)
+    foreign = max(n // 10, 1)
+    return pd.DataFrame(
+        {
+            "name": [f"Plant {i}" for i in range(n + foreign)],
+            "country_long": ["Ukraine"] * n + ["Poland"] * foreign,
+            "latitude": np.concatenate([lat, rng.uniform(49, 54, foreign)]),
+            "longitude": np.concatenate([lon, rng.uniform(14, 24, foreign)]),
+        }
+    )
+
+
+def write_gadm(path: str | os.PathLike) -> Path:
+    """
+    Write the oblast grid as a GADM-style GeoPackage (layer 'ADM_ADM_1', names in 'NAME_1').
+
+    Args:
+        path: GeoPackage file to write
+
+    Returns:
+        Path of the written file
+
+    """
+    path = Path(path)
+    synthetic_oblasts().rename(columns={"oblast_name_en": "NAME_1"}).to_file(path, layer="ADM_ADM_1", driver="GPKG")
+    return path
+
+
+def write_dataset(data_dir: str | os.PathLike, n: int, seed: int = 0) -> Path:
+    """
+    Write the three GeoJSON assets the dashboard loads (stations, oblasts, country outline).
+
+    Args:
+        data_dir: Directory to write to (created if missing)
+        n: Number of stations
+        seed: Random seed
+
+    Returns:
+        The data directory, usable as ``DATA_DIR``
+
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    synthetic_stations(n, seed).to_file(data_dir / STATIONS_FILE, driver="GeoJSON")
+    synthetic_oblasts().to_file(data_dir / OBLASTS_FILE, driver="GeoJSON")
+    synthetic_country().to_file(data_dir / OUTER_UKRAINE_FILE, driver="GeoJSON")
+    return data_dir
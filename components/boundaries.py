@@ -0,0 +1,112 @@
+"""
+Multi-resolution boundary outlines for Ukraine Energy Dashboard maps.
+
+The country border and oblast outlines are simplified once at load time into a small pyramid
+of zoom levels. Each level stores every outline as a single None-separated ring list, ready to
+be used as the lat/lon arrays of one Scattermapbox line trace, so the default view no longer
+ships full-resolution border vertices that are invisible at country zoom.
+"""
+
+from collections.abc import Hashable, Iterable, Mapping
+from dataclasses import dataclass
+
+import shapely
+from shapely.geometry import Polygon
+from shapely.geometry.base import BaseGeometry
+
+# Key of the country border in the pyramid (oblast outlines are keyed by oblast name)
+COUNTRY_KEY = "__country__"
+
+# Zoom levels of the pyramid: 5 = country view, 7 = oblast view, finer levels for zoomed-in views
+DEFAULT_ZOOM_LEVELS = (5, 7, 9, 12)
+
+
+def pixel_tolerance(zoom: float) -> float:
+    """
+    Return the simplification tolerance (degrees) of half a screen pixel at a web-mercator zoom level.
+
+    Args:
+        zoom: Mapbox zoom level
+
+    Returns:
+        Tolerance in degrees
+
+    """
+    return 360.0 / (256 * 2**zoom) / 2
+
+
+def _simplified_rings(geom: BaseGeometry, tolerance: float) -> tuple[list[float | None], list[float | None]]:
+    """Simplify a (multi)polygon and return its exterior rings as None-separated lat/lon lists."""
+    lats: list[float | None] = []
+    lons: list[float | None] = []
+    if geom is None or geom.is_empty:
+        return lats, lons
+
+    simplified = shapely.simplify(geom, tolerance, preserve_topology=True)
+    polygons = [p for p in shapely.get_parts(simplified) if isinstance(p, Polygon)]
+    # drop islands smaller than a pixel at this level, but never the largest part
+    largest = max(polygons, key=lambda p: p.area, default=None)
+    for poly in polygons:
+        if poly is not largest and poly.area < tolerance**2:
+            continue
+        coords = shapely.get_coordinates(poly.exterior)
+        lons.extend([*coords[:, 0].tolist(), None])
+        lats.extend([*coords[:, 1].tolist(), None])
+    return lats, lons
+
+
+@dataclass(frozen=True)
+class BoundaryPyramid:
+    """Simplified outlines per zoom level, keyed by outline name."""
+
+    zooms: tuple[int, ...]
+    levels: dict[int, dict[Hashable, tuple[list[float | None], list[float | None]]]]
+
+    def level_for(self, zoom: float) -> int:
+        """
+        Pick the pyramid level to use for a target zoom.
+
+        Args:
+            zoom: Mapbox zoom the outline will be displayed at
+
+        Returns:
+            Finest level not finer than ``zoom`` (the coarsest level for smaller zooms)
+
+        """
+        candidates = [level for level in self.zooms if level <= zoom]
+        return max(candidates) if candidates else min(self.zooms)
+
+    def outline(self, key: Hashable, zoom: float) -> tuple[list[float | None], list[float | None]]:
+        """
+        Return the None-separated lat/lon lists of an outline at the level matching ``zoom``.
+
+        Args:
+            key: Outline name (COUNTRY_KEY or an oblast name)
+            zoom: Mapbox zoom the outline will be displayed at
+
+        Returns:
+            Tuple of (lats, lons), both empty when the key is unknown
+
+        """
+        return self.levels[self.level_for(zoom)].get(key, ([], []))
+
+
+def build_boundary_pyramid(
+    outlines: Mapping[Hashable, BaseGeometry], zooms: Iterable[int] = DEFAULT_ZOOM_LEVELS
+) -> BoundaryPyramid:
+    """
+    Precompute simplified outlines for every zoom level.
+
+    Args:
+        outlines: Mapping of outline name to (multi)polygon geometry in EPSG:4326
+        zooms: Zoom levels to build
+
+    Returns:
+        BoundaryPyramid with one entry per outline and level
+
+    """
+    zooms = tuple(sorted(zooms))
+    levels = {
+        zoom: {key: _simplified_rings(geom, pixel_tolerance(zoom)) for key, geom in outlines.items()} for zoom in zooms
+    }
+    return BoundaryPyramid(zooms=zooms, levels=levels)
@@ -0,0 +1,223 @@
+"""
+Level-of-detail clustering for the Ukraine Energy Dashboard map.
+
+When more stations pass the filters than the browser should draw as individual markers, the
+map switches to clusters: stations are binned into square screen-space grid cells per zoom level.
+The cell of every station is precomputed once per level (the cluster pyramid), together with
+the aggregates of the unfiltered data, so a redraw only needs one grouping pass over the rows
+currently visible. Individual markers are sent only for the viewport at high zoom, so the
+payload stays bounded by the marker limit or by the number of on-screen cells.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from components.mercator import mercator_pixels, pixels_to_lonlat
+from components.utils import (
+    NO_CATEGORY,
+    SUBSTATION_CATEGORY,
+    StationStore,
+    category_colors,
+    category_labels,
+    indexed_colors,
+)
+
+# Zoom levels of the pyramid; views below the first level use the coarsest one
+DEFAULT_CLUSTER_ZOOMS = tuple(range(3, 14))
+
+# Edge length of a cluster cell in screen pixels
+CLUSTER_CELL_PIXELS = 60
+
+# Screen size assumed for views the browser has not reported yet (server-side zooms)
+DEFAULT_VIEWPORT_PIXELS = (1280, 800)
+
+
+def viewport_bounds(
+    center: dict[str, float], zoom: float, pixels: tuple[int, int] = DEFAULT_VIEWPORT_PIXELS
+) -> tuple[float, float, float, float]:
+    """
+    Approximate the lon/lat bounds of a view the browser has not reported yet.
+
+    Args:
+        center: Mapbox center ({'lat', 'lon'})
+        zoom: Mapbox zoom level
+        pixels: Assumed (width, height) of the map in pixels
+
+    Returns:
+        Tuple of (west, south, east, north) in degrees
+
+    """
+    x, y = mercator_pixels(center["lon"], center["lat"], zoom)
+    half_w, half_h = pixels[0] / 2, pixels[1] / 2
+    (west, east), (north, south) = pixels_to_lonlat([x - half_w, x + half_w], [y - half_h, y + half_h], zoom)
+    return float(west), float(south), float(east), float(north)
+
+
+def bounds_from_corners(corners: list[list[float]] | None) -> tuple[float, float, float, float] | None:
+    """
+    Convert the corner coordinates reported by the browser (``mapbox._derived.coordinates``) to bounds.
+
+    Args:
+        corners: List of [lon, lat] corners of the visible map
+
+    Returns:
+        Tuple of (west, south, east, north), or None when no corners were reported
+
+    """
+    if not corners:
+        return None
+    lons = [corner[0] for corner in corners]
+    lats = [corner[1] for corner in corners]
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def rows_in_bounds(
+    store: StationStore, rows: np.ndarray, bounds: tuple[float, float, float, float], padding: float = 0.1
+) -> np.ndarray:
+    """
+    Keep the rows whose marker lies inside (slightly padded) lon/lat bounds.
+
+    Args:
+        store: StationStore with marker coordinates
+        rows: Store positions to test
+        bounds: Tuple of (west, south, east, north)
+        padding: Fraction of the width/height added on each side, so short pans stay covered
+
+    Returns:
+        Subset of ``rows``
+
+    """
+    west, south, east, north = bounds
+    pad_x, pad_y = (east - west) * padding, (north - south) * padding
+    lon, lat = store.lon[rows], store.lat[rows]
+    inside = (lon >= west - pad_x) & (lon <= east + pad_x) & (lat >= south - pad_y) & (lat <= north + pad_y)
+    return rows[inside]
+
+
+@dataclass(frozen=True)
+class ClusterLevel:
+    """Cell assignment of one zoom level plus the aggregates of all stations."""
+
+    codes: np.ndarray  # cell code per station (int32, dense per level)
+    lat: np.ndarray  # mean latitude per cell
+    lon: np.ndarray  # mean longitude per cell
+    count: np.ndarray  # stations per cell
+    category: np.ndarray  # dominant category code per cell
+
+
+@dataclass(frozen=True)
+class ClusterPyramid:
+    """Precomputed cluster levels keyed by zoom."""
+
+    zooms: tuple[int, ...]
+    levels: dict[int, ClusterLevel]
+    drawn: int  # number of stations with a marker category (the rows aggregated per level)
+
+    def level_for(self, zoom: float) -> int:
+        """
+        Pick the pyramid level to use for a view zoom.
+
+        Args:
+            zoom: Mapbox zoom of the view
+
+        Returns:
+            Finest level not finer than ``zoom`` (the coarsest level for smaller zooms)
+
+        """
+        candidates = [level for level in self.zooms if level <= zoom]
+        return max(candidates) if candidates else min(self.zooms)
+
+
+def _aggregate(
+    codes: np.ndarray, lat: np.ndarray, lon: np.ndarray, category: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Group rows by cell code and return (mean lat, mean lon, count, dominant category) per occupied cell."""
+    _, inverse, count = np.unique(codes, return_inverse=True, return_counts=True)
+    n_cells = len(count)
+    mean_lat = np.bincount(inverse, weights=lat, minlength=n_cells) / count
+    mean_lon = np.bincount(inverse, weights=lon, minlength=n_cells) / count
+    # per-cell category histogram in one bincount over (cell, category) pairs
+    n_categories = SUBSTATION_CATEGORY + 1
+    histogram = np.bincount(inverse * n_categories + category, minlength=n_cells * n_categories)
+    dominant = histogram.reshape(n_cells, n_categories).argmax(axis=1)
+    return mean_lat, mean_lon, count, dominant
+
+
+def build_cluster_pyramid(
+    store: StationStore, zooms: tuple[int, ...] = DEFAULT_CLUSTER_ZOOMS, cell_pixels: int = CLUSTER_CELL_PIXELS
+) -> ClusterPyramid:
+    """
+    Assign every station to its grid cell at each zoom level and aggregate the unfiltered data.
+
+    Args:
+        store: StationStore with marker coordinates and categories
+        zooms: Zoom levels to build
+        cell_pixels: Edge length of a cell in screen pixels
+
+    Returns:
+        ClusterPyramid aligned with the store positions
+
+    """
+    x0, y0 = mercator_pixels(store.lon, store.lat)
+    # stations without a marker category are not drawn as markers, so they are not clustered either
+    drawn = np.flatnonzero(store.category != NO_CATEGORY)
+    category = store.category[drawn].astype(np.int64)
+    levels = {}
+    for zoom in sorted(zooms):
+        cell_size = cell_pixels / 2.0**zoom
+        key = (np.floor(x0 / cell_size).astype(np.int64) << 32) | np.floor(y0 / cell_size).astype(np.int64)
+        _, codes = np.unique(key, return_inverse=True)
+        codes = codes.astype(np.int32)
+        levels[zoom] = ClusterLevel(codes, *_aggregate(codes[drawn], store.lat[drawn], store.lon[drawn], category))
+    return ClusterPyramid(zooms=tuple(sorted(zooms)), levels=levels, drawn=len(drawn))
+
+
+def cluster_trace_data(pyramid: ClusterPyramid, store: StationStore, rows: np.ndarray, zoom: float) -> dict[str, Any]:
+    """
+    Aggregate rows into the clusters of the pyramid level for ``zoom`` as cluster trace properties.
+
+    Args:
+        pyramid: ClusterPyramid built from ``store``
+        store: StationStore with marker coordinates and categories
+        rows: Store positions of the stations to cluster
+        zoom: Mapbox zoom of the view
+
+    Returns:
+        Dictionary with lat, lon, marker (size, category colour codes), hovertext and visible
+
+    """
+    level = pyramid.levels[pyramid.level_for(zoom)]
+    rows = rows[store.category[rows] != NO_CATEGORY]
+    if rows.size == pyramid.drawn:
+        # unfiltered data: aggregates were computed with the pyramid
+        lat, lon, count, category = level.lat, level.lon, level.count, level.category
+    else:
+        lat, lon, count, category = _aggregate(
+            level.codes[rows], store.lat[rows], store.lon[rows], store.category[rows].astype(np.int64)
+        )
+
+    labels = np.asarray(category_labels(), dtype=object)
+    return {
+        "lat": lat,
+        "lon": lon,
+        "marker": {
+            "size": np.clip(8 + 6 * np.log10(count), 8, 36),
+            **indexed_colors(category, category_colors()),
+            "opacity": 0.75,
+        },
+        "hovertext": [f"{c:,} stations, mostly {label}" for c, label in zip(count, labels[category], strict=True)],
+        "visible": bool(len(count)),
+    }
+
+
+def empty_cluster_trace_data() -> dict[str, Any]:
+    """
+    Cluster trace properties that hide the cluster trace (marker mode).
+
+    Returns:
+        Dictionary with empty lat, lon, hovertext and visible False
+
+    """
+    return {"lat": [], "lon": [], "hovertext": [], "visible": False}
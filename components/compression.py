@@ -0,0 +1,221 @@
+"""
+HTTP response compression for the Ukraine Energy Dashboard server.
+
+An ``after_request`` hook compresses text-like responses (callback JSON, the page, Dash's
+scripts, vector tiles) with brotli when the client accepts it and the optional ``brotli``
+package is installed, and with gzip otherwise. Bodies of GET responses (Dash's component scripts,
+the layout, tiles) repeat across clients, so they are compressed once per encoding and kept in a
+small in-memory cache keyed by their content hash. Streamed responses (the exports) are
+compressed chunk by chunk as they are sent, so they are never read into memory as a whole.
+"""
+
+import gzip
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+
+import flask
+
+try:
+    import brotli
+except ImportError:  # optional dependency: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = frozenset(
+    {
+        "application/json",
+        "application/geo+json",
+        "application/javascript",
+        "application/vnd.mapbox-vector-tile",
+        "application/x-ndjson",
+        "image/svg+xml",
+        "text/css",
+        "text/csv",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+    }
+)
+
+# Smaller bodies are sent as they are, the headers would eat the saving
+DEFAULT_MIN_SIZE = 500
+
+DEFAULT_GZIP_LEVEL = 6
+# Quality 4-5 compresses about as fast as gzip -6 and better
+DEFAULT_BROTLI_QUALITY = 4
+
+# Compressed bodies of GET responses kept per (content hash, encoding)
+STATIC_CACHE_SIZE = 64
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Content encodings this process can produce, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str]) -> str | None:
+    """
+    Pick the content encoding of a response from an ``Accept-Encoding`` header.
+
+    Args:
+        accept_encoding: Value of the request header (e.g. 'gzip, deflate, br;q=0.9')
+        available: Encodings the server can produce, preferred first
+
+    Returns:
+        Chosen encoding, or None to send the body uncompressed
+
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class ResponseCompressor:
+    """Compresses Flask responses according to the client's ``Accept-Encoding``."""
+
+    def __init__(
+        self,
+        min_size: int = DEFAULT_MIN_SIZE,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        brotli_quality: int = DEFAULT_BROTLI_QUALITY,
+    ) -> None:
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._static: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """
+        Compress a body.
+
+        Args:
+            data: Uncompressed body
+            encoding: 'br' or 'gzip'
+
+        Returns:
+            Compressed body
+
+        """
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_stream(self, chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        """
+        Compress a streamed body incrementally.
+
+        Args:
+            chunks: Uncompressed chunks
+            encoding: 'br' or 'gzip'
+
+        Yields:
+            Compressed chunks (empty ones are skipped)
+
+        """
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            compress, finish = compressor.process, compressor.finish
+        else:
+            # wbits 16 + 15: gzip container, like gzip.compress
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            compress, finish = compressor.compress, compressor.flush
+        for chunk in chunks:
+            data = compress(chunk)
+            if data:
+                yield data
+        yield finish()
+
+    def _compress_static(self, data: bytes, encoding: str) -> bytes:
+        """Compress a body once per content and encoding."""
+        key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+        with self._lock:
+            body = self._static.get(key)
+            if body is not None:
+                self._static.move_to_end(key)
+                return body
+        body = self.compress(data, encoding)
+        with self._lock:
+            self._static[key] = body
+            while len(self._static) > STATIC_CACHE_SIZE:
+                self._static.popitem(last=False)
+        return body
+
+    def process(self, response: flask.Response) -> flask.Response:
+        """
+        Compress a response in place if the request accepts it and it is worth it.
+
+        Args:
+            response: Response about to be sent
+
+        Returns:
+            The same response
+
+        """
+        response.vary.add("Accept-Encoding")
+        if (
+            response.direct_passthrough
+            or response.status_code != 200
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+        encoding = negotiate_encoding(flask.request.headers.get("Accept-Encoding", ""), available_encodings())
+        if encoding is None:
+            return response
+        if response.is_streamed:
+            # the size is unknown up front, so streamed bodies are always compressed
+            body = response.response
+            if hasattr(body, "close"):
+                # the wrapping generator hides the body from Response.close()
+                response.call_on_close(body.close)
+            response.response = self.compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        if flask.request.method == "GET":
+            body = self._compress_static(data, encoding)
+        else:
+            body = self.compress(data, encoding)
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+def install_compression(server: flask.Flask, compressor: ResponseCompressor) -> None:
+    """
+    Compress the responses of a Flask server.
+
+    Register this before other ``after_request`` hooks that should see the uncompressed size:
+    Flask runs the hooks in reverse order of registration.
+
+    Args:
+        server: Flask server (``app.server`` of the Dash app)
+        compressor: Configured ResponseCompressor
+
+    """
+    server.after_request(compressor.process)
+    logger.info("Response compression enabled (%s)", ", ".join(available_encodings()))
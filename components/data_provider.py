@@ -0,0 +1,227 @@
+"""
+Data provider for the Ukraine Energy Dashboard.
+
+All datasets and the structures derived from them (marker store, filter index, outline and
+cluster pyramids) are loaded lazily, once per process, by a DataProvider instead of as a side
+effect of importing the app. Loading before workers fork (gunicorn ``--preload``) lets every worker share the same
+pages copy-on-write; ``reload()`` swaps in freshly loaded data without restarting the process.
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import geopandas as gpd
+
+from components.boundaries import COUNTRY_KEY, BoundaryPyramid, build_boundary_pyramid
+from components.clusters import ClusterPyramid, build_cluster_pyramid
+from components.filter_index import FilterIndex, build_filter_index
+from components.fuels import FuelMatrix, build_fuel_matrix
+from components.geo_cache import DEFAULT_CACHE_DIR, load_geodataframe
+from components.oblasts import OblastRegistry, build_oblast_registry
+from components.spatial import SpatialIndex, build_spatial_index
+from components.table import TableIndex, build_table_index
+from components.utils import StationStore, build_station_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = Path("assets/data")
+
+STATIONS_FILE = "power_stations_with_oblasts.geojson"
+OBLASTS_FILE = "ukraine_oblasts.geojson"
+OUTER_UKRAINE_FILE = "full_ukraine.geojson"
+
+
+@dataclass(frozen=True, eq=False)
+class DashboardData:
+    """Datasets and precomputed structures shared by all callbacks of a process (read-only)."""
+
+    stations_df: gpd.GeoDataFrame
+    oblasts_gdf: gpd.GeoDataFrame
+    outer_ukraine: gpd.GeoDataFrame
+    fuel_matrix: FuelMatrix
+    station_store: StationStore
+    filter_index: FilterIndex
+    table_index: TableIndex
+    spatial_index: SpatialIndex
+    boundary_pyramid: BoundaryPyramid
+    oblast_registry: OblastRegistry
+    cluster_pyramid: ClusterPyramid
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def load_dashboard_data(
+    data_dir: str | os.PathLike = DEFAULT_DATA_DIR, cache_dir: str | os.PathLike | None = DEFAULT_CACHE_DIR
+) -> DashboardData:
+    """
+    Load the GeoJSON assets and build the structures derived from them, logging the time per phase.
+
+    Args:
+        data_dir: Directory containing the GeoJSON assets
+        cache_dir: Directory of the GeoParquet startup cache; None disables it
+
+    Returns:
+        DashboardData with the seconds spent per phase in ``timings``
+
+    """
+    data_dir = Path(data_dir)
+    timings: dict[str, float] = {}
+
+    stations_df = load_geodataframe(data_dir / STATIONS_FILE, centroids=True, cache_dir=cache_dir, timings=timings)
+    oblasts_gdf = load_geodataframe(data_dir / OBLASTS_FILE, cache_dir=cache_dir, timings=timings)
+    outer_ukraine = load_geodataframe(data_dir / OUTER_UKRAINE_FILE, cache_dir=cache_dir, timings=timings)
+
+    start = time.perf_counter()
+    # Codes, outlines, camera views and station rows per oblast, so selecting one needs no geometry work
+    oblast_registry = build_oblast_registry(oblasts_gdf, stations_df)
+    # Simplified country/oblast outlines per zoom level, one None-separated trace each
+    boundary_pyramid = build_boundary_pyramid(
+        {
+            COUNTRY_KEY: outer_ukraine.geometry.union_all(),
+            **{name: oblast.geometry for name, oblast in oblast_registry.oblasts.items()},
+        }
+    )
+    timings["boundaries"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Multi-hot fuels and power source categories, shared by the filters, the data note and the legend
+    fuel_matrix = build_fuel_matrix(stations_df)
+    # Marker arrays (centroids, colours, hover text, categories) computed once for all map redraws
+    station_store = build_station_store(stations_df, fuel_matrix)
+    # Boolean masks per filter value, so callbacks never copy or re-filter stations_df
+    filter_index = build_filter_index(stations_df, fuel_matrix)
+    # Sort/filter keys of the table columns for server-side paging of the stations table
+    table_index = build_table_index(stations_df)
+    # STRtree over station polygons and centroids for lasso/box selections
+    spatial_index = build_spatial_index(stations_df)
+    # Grid cell of every station per zoom level for clustered (level-of-detail) rendering
+    cluster_pyramid = build_cluster_pyramid(station_store)
+    timings["indexes"] = time.perf_counter() - start
+
+    logger.info(
+        "Loaded %d stations in %.3fs (%s)",
+        len(stations_df),
+        sum(timings.values()),
+        ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in timings.items()),
+    )
+    return DashboardData(
+        stations_df=stations_df,
+        oblasts_gdf=oblasts_gdf,
+        outer_ukraine=outer_ukraine,
+        fuel_matrix=fuel_matrix,
+        station_store=station_store,
+        filter_index=filter_index,
+        table_index=table_index,
+        spatial_index=spatial_index,
+        boundary_pyramid=boundary_pyramid,
+        oblast_registry=oblast_registry,
+        cluster_pyramid=cluster_pyramid,
+        timings=timings,
+    )
+
+
+class DataProvider:
+    """Lazily loads DashboardData once per process and hands the same instance to every caller."""
+
+    def __init__(
+        self,
+        data_dir: str | os.PathLike = DEFAULT_DATA_DIR,
+        cache_dir: str | os.PathLike | None = DEFAULT_CACHE_DIR,
+    ) -> None:
+        self.data_dir = Path(data_dir)
+        self.cache_dir = cache_dir
+        self.generation = 0
+        self._data: DashboardData | None = None
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[DashboardData], None]] = []
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the data has been loaded in this process."""
+        return self._data is not None
+
+    def configure(self, data_dir: str | os.PathLike, cache_dir: str | os.PathLike | None) -> None:
+        """
+        Point the provider at other data; already loaded data is dropped if the location changes.
+
+        Args:
+            data_dir: Directory containing the GeoJSON assets
+            cache_dir: Directory of the GeoParquet startup cache; None disables it
+
+        """
+        with self._lock:
+            if Path(data_dir) != self.data_dir or cache_dir != self.cache_dir:
+                self.data_dir = Path(data_dir)
+                self.cache_dir = cache_dir
+                self._data = None
+
+    def add_listener(self, listener: Callable[[DashboardData], None]) -> None:
+        """
+        Register a function called with the new data after every (re)load, e.g. to clear caches.
+
+        Args:
+            listener: Function taking the freshly loaded DashboardData
+
+        """
+        self._listeners.append(listener)
+
+    def get(self) -> DashboardData:
+        """
+        Return the process-wide data, loading it on first use.
+
+        Returns:
+            DashboardData (shared, must not be mutated)
+
+        """
+        data = self._data
+        if data is None:
+            with self._lock:
+                # another thread may have loaded it while we waited for the lock
+                if self._data is None:
+                    self._publish(load_dashboard_data(self.data_dir, self.cache_dir))
+                data = self._data
+        return data
+
+    def reload(self) -> DashboardData:
+        """
+        Load the data again and swap it in; callers holding the old instance keep a consistent view.
+
+        Returns:
+            The newly loaded DashboardData
+
+        """
+        data = load_dashboard_data(self.data_dir, self.cache_dir)
+        with self._lock:
+            self._publish(data)
+        return data
+
+    def preload(self) -> DashboardData:
+        """
+        Load the data in the current (master) process before workers are forked.
+
+        The loaded objects are moved out of the garbage collector's tracked generations, so
+        collections in the workers do not write to their pages and break copy-on-write sharing.
+
+        Returns:
+            The loaded DashboardData
+
+        """
+        data = self.get()
+        gc.collect()
+        gc.freeze()
+        return data
+
+    def _publish(self, data: DashboardData) -> None:
+        """Install new data and notify listeners (called with the lock held)."""
+        self._data = data
+        self.generation += 1
+        for listener in self._listeners:
+            try:
+                listener(data)
+            except Exception:
+                logger.exception("Data reload listener %r failed", listener)
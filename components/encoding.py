@@ -0,0 +1,159 @@
+"""
+Compact encoding of map figure payloads for Ukraine Energy Dashboard callbacks.
+
+Figures and partial updates leave Python with float64 coordinates printed at full precision
+(``48.379412345678``) and integer arrays printed digit by digit. Before they are sent, numeric
+trace arrays are rounded to a fixed number of decimals (5 decimals are about a metre) and, where
+plotly.js accepts them, written as typed arrays: ``{"dtype": "f4", "bdata": "<base64>"}`` decodes
+straight into a ``Float32Array`` in the browser (plotly.js >= 2.28). Outline separators (None)
+become NaN, which plotly.js draws as the same line break.
+"""
+
+import base64
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+DEFAULT_COORDINATE_DECIMALS = 5
+
+# float32 keeps about 7 significant digits, enough for 5 decimals at Ukraine's longitudes (< 41)
+FLOAT32_MAX_DECIMALS = 5
+
+# Decimals kept for marker sizes (pixels)
+SIZE_DECIMALS = 1
+
+# Integer dtypes plotly.js decodes, narrowest first (no 64-bit integers in the browser)
+INTEGER_DTYPES = (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32)
+
+# Trace properties holding coordinates
+COORDINATE_KEYS = ("lat", "lon")
+
+# A trace data array, before and after encoding (a typed array is a dict)
+Values = Sequence[Any] | np.ndarray
+EncodedValues = Values | dict[str, str]
+
+
+def typed_array(values: np.ndarray) -> dict[str, str]:
+    """
+    Encode a 1-D numeric array as a plotly.js typed array specification.
+
+    Args:
+        values: Float or integer array (8, 16 or 32 bit integers, 32 or 64 bit floats)
+
+    Returns:
+        Dictionary with the dtype code (e.g. 'f4', 'u2') and the little-endian data as base64
+
+    """
+    dtype = values.dtype.newbyteorder("<")
+    data = np.ascontiguousarray(values, dtype=dtype).tobytes()
+    return {"dtype": f"{dtype.kind}{dtype.itemsize}", "bdata": base64.b64encode(data).decode("ascii")}
+
+
+def _narrowest_integer_dtype(values: np.ndarray) -> np.dtype | None:
+    """Narrowest integer dtype holding all values, None when they do not fit into 32 bits."""
+    low, high = (int(values.min()), int(values.max())) if values.size else (0, 0)
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return None
+
+
+def encode_floats(values: Values, decimals: int, typed: bool = True) -> EncodedValues:
+    """
+    Round a numeric sequence (None allowed as a gap) and encode it compactly.
+
+    Args:
+        values: Sequence or array of numbers and None
+        decimals: Decimals kept
+        typed: Whether to return a typed array (otherwise a list with None for gaps)
+
+    Returns:
+        Typed array specification or list; empty and non-numeric input is returned unchanged
+
+    """
+    if len(values) == 0:
+        return values
+    try:
+        array = np.round(np.asarray(values, dtype=np.float64), decimals)
+    except (TypeError, ValueError):
+        return values
+    if array.ndim != 1:
+        return values
+    if typed:
+        return typed_array(array.astype(np.float32) if decimals <= FLOAT32_MAX_DECIMALS else array)
+    output = array.astype(object)
+    output[np.isnan(array)] = None
+    return output.tolist()
+
+
+def encode_integers(values: Values, typed: bool = True) -> EncodedValues:
+    """
+    Encode an integer sequence (e.g. station indices or colour codes) in its narrowest typed array.
+
+    Args:
+        values: Sequence or array of integers
+        typed: Whether to return a typed array (otherwise the values are returned unchanged)
+
+    Returns:
+        Typed array specification, or the input for non-integer, empty or too large values
+
+    """
+    if not typed or len(values) == 0:
+        return values
+    array = np.asarray(values)
+    if array.ndim != 1 or not np.issubdtype(array.dtype, np.integer):
+        return values
+    dtype = _narrowest_integer_dtype(array)
+    return values if dtype is None else typed_array(array.astype(dtype))
+
+
+def encode_trace(trace: Mapping[str, Any], decimals: int = DEFAULT_COORDINATE_DECIMALS, typed: bool = True) -> dict:
+    """
+    Encode the numeric arrays of one trace (full trace dict or the properties of a partial update).
+
+    Coordinates are rounded to ``decimals``, ``customdata`` and integer marker colours (category
+    codes) become integer typed arrays, marker sizes are rounded to SIZE_DECIMALS. Other
+    properties are passed through.
+
+    Args:
+        trace: Trace properties
+        decimals: Decimals kept for coordinates
+        typed: Whether to use typed arrays
+
+    Returns:
+        New dictionary with the encoded properties
+
+    """
+    encoded = dict(trace)
+    for key in COORDINATE_KEYS:
+        if key in encoded and encoded[key] is not None:
+            encoded[key] = encode_floats(encoded[key], decimals, typed)
+    if encoded.get("customdata") is not None:
+        encoded["customdata"] = encode_integers(encoded["customdata"], typed)
+    marker = encoded.get("marker")
+    if isinstance(marker, Mapping):
+        marker = dict(marker)
+        if isinstance(marker.get("color"), np.ndarray):
+            marker["color"] = encode_integers(marker["color"], typed)
+        if isinstance(marker.get("size"), np.ndarray):
+            marker["size"] = encode_floats(marker["size"], SIZE_DECIMALS, typed)
+        encoded["marker"] = marker
+    return encoded
+
+
+def encode_figure(figure: Mapping[str, Any], decimals: int = DEFAULT_COORDINATE_DECIMALS, typed: bool = True) -> dict:
+    """
+    Encode every trace of a serialised figure (see ``encode_trace``).
+
+    Args:
+        figure: Figure dict (``go.Figure.to_dict()``)
+        decimals: Decimals kept for coordinates
+        typed: Whether to use typed arrays
+
+    Returns:
+        New figure dict sharing the layout with the input
+
+    """
+    return {**figure, "data": [encode_trace(trace, decimals, typed) for trace in figure.get("data", [])]}
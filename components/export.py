@@ -0,0 +1,305 @@
+"""
+Streaming export of stations for Ukraine Energy Dashboard.
+
+Exports are produced on the server from the current filter state (see ``TableQuery``) and
+written to the response in chunks of rows, so memory stays bounded by the chunk size and the
+browser never uploads the data it downloads. Every format carries all attribute columns plus
+the station geometry: GeoJSON geometries for GeoJSON/NDJSON, WKB for GeoParquet, and
+longitude/latitude plus WKT for CSV/XLSX.
+"""
+
+import io
+import json
+import tempfile
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from flask import Response
+
+# Rows materialised per chunk / Arrow record batch
+EXPORT_CHUNK_SIZE = 5000
+
+# Excel rejects cells longer than this; longer WKT geometries are left empty in XLSX exports
+XLSX_MAX_CELL_LENGTH = 32767
+
+
+class ExportFormat(NamedTuple):
+    """Response metadata of an export format."""
+
+    mimetype: str
+    extension: str
+    label: str
+
+
+EXPORT_FORMATS = {
+    "xlsx": ExportFormat("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx", "Excel"),
+    "csv": ExportFormat("text/csv", "csv", "CSV"),
+    "geojson": ExportFormat("application/geo+json", "geojson", "GeoJSON"),
+    "ndjson": ExportFormat("application/x-ndjson", "ndjson", "GeoJSON lines"),
+    "parquet": ExportFormat("application/vnd.apache.parquet", "parquet", "GeoParquet"),
+}
+
+
+def attribute_columns(stations_df: gpd.GeoDataFrame) -> list[str]:
+    """
+    Return the non-geometry columns of the stations frame, in frame order.
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+
+    Returns:
+        List of column names
+
+    """
+    return [column for column, dtype in stations_df.dtypes.items() if not isinstance(dtype, gpd.array.GeometryDtype)]
+
+
+def _chunks(stations_df: gpd.GeoDataFrame, rows: np.ndarray, chunk_size: int) -> Iterator[gpd.GeoDataFrame]:
+    """Yield the selected rows of the frame in order, ``chunk_size`` rows at a time."""
+    for start in range(0, len(rows), chunk_size):
+        yield stations_df.iloc[rows[start : start + chunk_size]]
+
+
+def _tabular_chunk(chunk: gpd.GeoDataFrame, columns: list[str]) -> pd.DataFrame:
+    """Attribute columns plus centroid longitude/latitude and the WKT geometry of a chunk."""
+    geometries = chunk.geometry.to_numpy()
+    centroids = shapely.centroid(geometries)
+    frame = chunk[columns].copy()
+    frame["longitude"] = shapely.get_x(centroids)
+    frame["latitude"] = shapely.get_y(centroids)
+    frame["geometry_wkt"] = shapely.to_wkt(geometries, rounding_precision=7)
+    return frame
+
+
+def _feature_lines(chunk: gpd.GeoDataFrame, columns: list[str]) -> list[str]:
+    """Serialise a chunk as GeoJSON Feature strings (one per row)."""
+    if chunk.empty:
+        return []
+    properties = chunk[columns].to_json(orient="records", lines=True, force_ascii=False).splitlines()
+    geometries = shapely.to_geojson(chunk.geometry.to_numpy())
+    return [
+        f'{{"type":"Feature","properties":{props},"geometry":{geom if geom is not None else "null"}}}'
+        for props, geom in zip(properties, geometries, strict=True)
+    ]
+
+
+def stream_csv(stations_df: gpd.GeoDataFrame, rows: np.ndarray, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Stream the selected stations as CSV.
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+        rows: Row positions to export, in export order
+        chunk_size: Rows per chunk
+
+    Yields:
+        CSV text chunks (the first one includes the header)
+
+    """
+    columns = attribute_columns(stations_df)
+    header = True
+    for chunk in _chunks(stations_df, rows, chunk_size):
+        yield _tabular_chunk(chunk, columns).to_csv(index=False, header=header)
+        header = False
+    if header:
+        yield _tabular_chunk(stations_df.iloc[:0], columns).to_csv(index=False)
+
+
+def stream_ndjson(
+    stations_df: gpd.GeoDataFrame, rows: np.ndarray, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Stream the selected stations as newline-delimited GeoJSON features.
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+        rows: Row positions to export, in export order
+        chunk_size: Rows per chunk
+
+    Yields:
+        Text chunks of one Feature per line
+
+    """
+    columns = attribute_columns(stations_df)
+    for chunk in _chunks(stations_df, rows, chunk_size):
+        lines = _feature_lines(chunk, columns)
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+
+def stream_geojson(
+    stations_df: gpd.GeoDataFrame, rows: np.ndarray, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Stream the selected stations as a GeoJSON FeatureCollection.
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+        rows: Row positions to export, in export order
+        chunk_size: Rows per chunk
+
+    Yields:
+        Text chunks of the FeatureCollection
+
+    """
+    columns = attribute_columns(stations_df)
+    yield '{"type":"FeatureCollection","features":['
+    separator = ""
+    for chunk in _chunks(stations_df, rows, chunk_size):
+        lines = _feature_lines(chunk, columns)
+        if lines:
+            yield separator + ",\n".join(lines)
+            separator = ",\n"
+    yield "]}\n"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object buffering written bytes until they are drained into the response."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Return and forget the bytes written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _geoparquet_metadata(stations_df: gpd.GeoDataFrame) -> bytes:
+    """GeoParquet 1.0 file metadata for a WKB 'geometry' column."""
+    crs = stations_df.crs.to_json_dict() if stations_df.crs is not None else None
+    metadata = {
+        "version": "1.0.0",
+        "primary_column": "geometry",
+        "columns": {"geometry": {"encoding": "WKB", "geometry_types": [], "crs": crs}},
+    }
+    return json.dumps(metadata).encode()
+
+
+def stream_geoparquet(
+    stations_df: gpd.GeoDataFrame, rows: np.ndarray, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Stream the selected stations as GeoParquet, one Arrow record batch (row group) per chunk.
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+        rows: Row positions to export, in export order
+        chunk_size: Rows per row group
+
+    Yields:
+        Bytes of the Parquet file, flushed after every row group
+
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = attribute_columns(stations_df)
+
+    def _batch(chunk: gpd.GeoDataFrame) -> pa.RecordBatch:
+        frame = chunk[columns].copy()
+        frame["geometry"] = shapely.to_wkb(chunk.geometry.to_numpy())
+        return pa.RecordBatch.from_pandas(frame, preserve_index=False)
+
+    schema = _batch(stations_df.iloc[:0]).schema
+    # object columns of an empty frame infer as null: they hold OSM tag strings (and WKB geometries)
+    for i, schema_field in enumerate(schema):
+        if schema_field.name == "geometry":
+            schema = schema.set(i, schema_field.with_type(pa.binary()))
+        elif pa.types.is_null(schema_field.type):
+            schema = schema.set(i, schema_field.with_type(pa.string()))
+    schema = schema.with_metadata({**(schema.metadata or {}), b"geo": _geoparquet_metadata(stations_df)})
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for chunk in _chunks(stations_df, rows, chunk_size):
+            writer.write_batch(_batch(chunk).cast(schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_xlsx(
+    stations_df: gpd.GeoDataFrame, rows: np.ndarray, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Stream the selected stations as an Excel workbook built with openpyxl's write-only mode.
+
+    Rows are appended chunk by chunk (write-only worksheets keep no cells in memory); the
+    finished workbook is spooled to a temporary file and streamed from there.
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+        rows: Row positions to export, in export order
+        chunk_size: Rows per chunk
+
+    Yields:
+        Bytes of the .xlsx file
+
+    """
+    from openpyxl import Workbook
+
+    columns = attribute_columns(stations_df)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("stations")
+    sheet.append([*columns, "longitude", "latitude", "geometry_wkt"])
+    for chunk in _chunks(stations_df, rows, chunk_size):
+        frame = _tabular_chunk(chunk, columns)
+        frame["geometry_wkt"] = frame["geometry_wkt"].where(frame["geometry_wkt"].str.len() <= XLSX_MAX_CELL_LENGTH)
+        # openpyxl expects plain Python values (None for missing)
+        for values in frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None):
+            sheet.append(values)
+
+    with tempfile.SpooledTemporaryFile(max_size=16 << 20) as buffer:
+        workbook.save(buffer)
+        buffer.seek(0)
+        while data := buffer.read(1 << 16):
+            yield data
+
+
+_STREAMS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "geojson": stream_geojson,
+    "parquet": stream_geoparquet,
+    "xlsx": stream_xlsx,
+}
+
+
+def export_response(fmt: str, stations_df: gpd.GeoDataFrame, rows: np.ndarray, filename: str) -> Response:
+    """
+    Build a streamed attachment response for an export.
+
+    Args:
+        fmt: Key of EXPORT_FORMATS
+        stations_df: GeoDataFrame containing station data
+        rows: Row positions to export, in export order
+        filename: Download file name without extension
+
+    Returns:
+        Flask response streaming the file
+
+    """
+    export_format = EXPORT_FORMATS[fmt]
+    return Response(
+        _STREAMS[fmt](stations_df, rows),
+        mimetype=export_format.mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.extension}"'},
+    )
@@ -0,0 +1,102 @@
+"""
+Figure cache for Ukraine Energy Dashboard map callbacks.
+
+The map only has a small number of distinct states (oblast x power source type x GPPD x
+substations), so rendered figures are memoised as
+serialised dicts in a bounded, thread-safe LRU cache keyed by the normalised filter state.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, NamedTuple
+
+import plotly.graph_objects as go
+
+from components.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class MapState(NamedTuple):
+    """Normalised map filter state, used as figure cache key."""
+
+    oblast: str | None = None
+    power_source: str = "all"
+    gppd_only: bool = False
+    include_substations: bool = True
+
+
+class FigureCache(LRUCache[Hashable, dict[str, Any]]):
+    """Bounded LRU cache of serialised Plotly figures with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 256, encode: Callable[[dict[str, Any]], dict[str, Any]] | None = None) -> None:
+        super().__init__(maxsize)
+        # applied once to every rendered figure before it is stored (e.g. compact payload encoding)
+        self.encode = encode
+
+    def _serialise(self, figure: go.Figure) -> dict[str, Any]:
+        """Figure dict as stored in the cache."""
+        serialised = figure.to_dict()
+        return self.encode(serialised) if self.encode is not None else serialised
+
+    def get_or_render(self, key: Hashable, render: Callable[[], go.Figure]) -> dict[str, Any]:
+        """
+        Return the cached figure for ``key``, rendering and storing it on a miss.
+
+        Args:
+            key: Normalised state the figure was rendered for
+            render: Zero-argument function building the figure
+
+        Returns:
+            Serialised figure dict (shared between callers, must not be mutated)
+
+        """
+        return self.get_or_compute(key, lambda: self._serialise(render()))
+
+    def prime(self, key: Hashable, render: Callable[[], go.Figure]) -> dict[str, Any]:
+        """
+        Render and store a figure without touching the hit/miss counters (used for warm-up).
+
+        Args:
+            key: Normalised state the figure is rendered for
+            render: Zero-argument function building the figure
+
+        Returns:
+            Serialised figure dict
+
+        """
+        return self.put(key, self._serialise(render()))
+
+
+def warm_up_figure_cache(
+    cache: FigureCache, states: Iterable[MapState], render: Callable[[MapState], go.Figure]
+) -> threading.Thread:
+    """
+    Pre-render figures for the given states in a background daemon thread.
+
+    Args:
+        cache: FigureCache to fill
+        states: Map states to pre-render, most important first
+        render: Function building the figure for a state
+
+    Returns:
+        The started thread
+
+    """
+
+    def _run() -> None:
+        count = 0
+        for state in states:
+            if state in cache:
+                continue
+            try:
+                cache.prime(state, lambda state=state: render(state))
+                count += 1
+            except Exception:
+                logger.exception("Figure cache warm-up failed for %s", state)
+        logger.info("Figure cache warm-up rendered %d figures (%s)", count, cache.stats())
+
+    thread = threading.Thread(target=_run, name="figure-cache-warm-up", daemon=True)
+    thread.start()
+    return thread
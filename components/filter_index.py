@@ -0,0 +1,118 @@
+"""
+Filter index for Ukraine Energy Dashboard station queries.
+
+This module precomputes one boolean mask per filter value (power type, fuel, power source
+category, oblast and GPPD validation) when the data is loaded, so that any combination of
+sidebar filters is answered with vectorised mask ANDs instead of copying and re-filtering
+the stations GeoDataFrame on every callback.
+"""
+
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from components.fuels import FuelMatrix, build_fuel_matrix
+
+
+@dataclass(frozen=True)
+class FilterIndex:
+    """
+    Precomputed boolean masks over the stations GeoDataFrame, keyed by ``(dimension, value)``.
+
+    Dimensions are ``"power"``, ``"fuel"``, ``"category"``, ``"oblast"`` and ``"gppd"``. Masks are
+    aligned with the row positions of the frame the index was built from.
+    """
+
+    masks: dict[tuple[str, Hashable], np.ndarray]
+    size: int
+
+    def mask(self, dimension: str, value: Hashable) -> np.ndarray:
+        """
+        Return the mask for one filter value.
+
+        Args:
+            dimension: Filter dimension (e.g. 'power', 'category', 'oblast')
+            value: Value within the dimension (e.g. 'plant', 'thermal', 'Kiev')
+
+        Returns:
+            Boolean array, all False when the value does not occur in the data
+
+        """
+        found = self.masks.get((dimension, value))
+        return found if found is not None else np.zeros(self.size, dtype=bool)
+
+    def select(
+        self,
+        oblast: str | None = None,
+        gppd_only: bool = False,
+        power_source: str = "all",
+        include_substations: bool = True,
+    ) -> np.ndarray:
+        """
+        Resolve a sidebar filter state to the row positions of matching stations.
+
+        Args:
+            oblast: Oblast name to restrict to; None or 'all' for the whole country
+            gppd_only: Keep only stations validated against the GPPD
+            power_source: Power source type ('all', 'thermal', 'nuclear', 'renewable')
+            include_substations: Whether substations are kept when showing all power sources
+
+        Returns:
+            Sorted array of row positions
+
+        """
+        mask = np.ones(self.size, dtype=bool)
+
+        if oblast and oblast != "all":
+            mask &= self.mask("oblast", oblast)
+
+        if gppd_only:
+            mask &= self.mask("gppd", True)
+
+        # A power source filter keeps plants of that category only (substations are never included)
+        if power_source and power_source != "all":
+            mask &= self.mask("power", "plant") & self.mask("category", power_source)
+        elif not include_substations:
+            mask &= ~self.mask("power", "substation")
+
+        return np.flatnonzero(mask)
+
+
+def build_filter_index(stations_df: gpd.GeoDataFrame, fuels: FuelMatrix | None = None) -> FilterIndex:
+    """
+    Build the filter index for a stations GeoDataFrame.
+
+    Args:
+        stations_df: GeoDataFrame containing station data ('power', 'plant:source', 'oblast_name_en', 'gppd_overlap')
+        fuels: Prebuilt FuelMatrix for ``stations_df``; built on the fly when omitted
+
+    Returns:
+        FilterIndex aligned with the row positions of ``stations_df``
+
+    """
+    n = len(stations_df)
+    masks: dict[tuple[str, Hashable], np.ndarray] = {}
+
+    for column, dimension in (("power", "power"), ("oblast_name_en", "oblast")):
+        if column not in stations_df.columns:
+            continue
+        codes = pd.Categorical(stations_df[column])
+        for code, value in enumerate(codes.categories):
+            masks[(dimension, value)] = codes.codes == code
+
+    if "gppd_overlap" in stations_df.columns:
+        gppd = stations_df["gppd_overlap"].fillna(False).to_numpy(dtype=bool)
+        masks[("gppd", True)] = gppd
+        masks[("gppd", False)] = ~gppd
+
+    # fuel and power source category masks are columns of the shared fuel matrix (no copies)
+    fuels = fuels if fuels is not None else build_fuel_matrix(stations_df)
+    for fuel in fuels.fuels:
+        masks[("fuel", fuel)] = fuels.fuel_mask(fuel)
+    for category in fuels.categories:
+        masks[("category", category)] = fuels.category_mask(category)
+
+    return FilterIndex(masks=masks, size=n)
@@ -0,0 +1,139 @@
+"""
+Fuel classification for Ukraine Energy Dashboard.
+
+The ';'-separated ``plant:source`` tag is parsed once when the data is loaded into a multi-hot
+fuel matrix (stations x fuels) and a power source category per station. The sidebar filters,
+the data note and the map legend all read these arrays, so a source string is never split or
+classified again while serving requests, and all of them share one definition of each category.
+"""
+
+from dataclasses import dataclass
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+# Thermal: heat-based, usually combustion (fossil fuels and bioenergy)
+THERMAL_FUELS = frozenset({"coal", "gas", "oil", "diesel", "mazut", "biogas", "biomass", "wood", "waste"})
+NUCLEAR_FUELS = frozenset({"nuclear"})
+# Renewables: non-thermal (solar, wind, hydro)
+RENEWABLE_FUELS = frozenset({"solar", "wind", "hydro"})
+
+POWER_SOURCE_CATEGORIES = {
+    "thermal": THERMAL_FUELS,
+    "nuclear": NUCLEAR_FUELS,
+    "renewable": RENEWABLE_FUELS,
+}
+
+# Category of a plant whose fuels belong to more than one power source category
+MIXED = "mixed"
+
+STATION_CATEGORIES = [*POWER_SOURCE_CATEGORIES, MIXED]
+
+
+@dataclass(frozen=True)
+class FuelMatrix:
+    """
+    Multi-hot fuels and power source categories of every station, aligned with the frame rows.
+
+    ``category_matrix[i, j]`` is True when station ``i`` uses any fuel of ``categories[j]``;
+    ``category`` is the single category of a station ('mixed' when its fuels span several,
+    missing when it has no known fuel, e.g. substations).
+    """
+
+    fuels: tuple[str, ...]
+    matrix: np.ndarray  # bool (stations x fuels)
+    categories: tuple[str, ...]
+    category_matrix: np.ndarray  # bool (stations x POWER_SOURCE_CATEGORIES)
+    category: pd.Categorical  # one of STATION_CATEGORIES per station
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def fuel_mask(self, fuel: str) -> np.ndarray:
+        """
+        Return the stations using a fuel.
+
+        Args:
+            fuel: Fuel name as tagged in OSM (e.g. 'gas')
+
+        Returns:
+            Boolean array, all False for fuels not in the data
+
+        """
+        if fuel not in self.fuels:
+            return np.zeros(len(self), dtype=bool)
+        return self.matrix[:, self.fuels.index(fuel)]
+
+    def category_mask(self, category: str) -> np.ndarray:
+        """
+        Return the stations using any fuel of a power source category.
+
+        Args:
+            category: Power source category ('thermal', 'nuclear', 'renewable')
+
+        Returns:
+            Boolean array, all False for unknown categories
+
+        """
+        if category not in self.categories:
+            return np.zeros(len(self), dtype=bool)
+        return self.category_matrix[:, self.categories.index(category)]
+
+    def single_fuel(self) -> np.ndarray:
+        """
+        Return the fuel column of stations with exactly one fuel.
+
+        Returns:
+            Integer array of indices into ``fuels``, -1 for stations with no or several fuels
+
+        """
+        return np.where(self.matrix.sum(axis=1) == 1, self.matrix.argmax(axis=1), -1)
+
+    def category_counts(self, rows: np.ndarray | None = None) -> dict[str, int]:
+        """
+        Count stations per single category.
+
+        Args:
+            rows: Row positions to count (all stations when omitted)
+
+        Returns:
+            Dictionary of STATION_CATEGORIES to count
+
+        """
+        codes = self.category.codes if rows is None else self.category.codes[rows]
+        counts = np.bincount(codes[codes >= 0], minlength=len(STATION_CATEGORIES))
+        return dict(zip(STATION_CATEGORIES, counts.tolist(), strict=True))
+
+
+def build_fuel_matrix(stations_df: gpd.GeoDataFrame) -> FuelMatrix:
+    """
+    Parse the ``plant:source`` tags of all stations into the fuel and category arrays.
+
+    Args:
+        stations_df: GeoDataFrame containing station data ('plant:source')
+
+    Returns:
+        FuelMatrix aligned with the row positions of ``stations_df``
+
+    """
+    n = len(stations_df)
+    if "plant:source" in stations_df.columns:
+        # one column per fuel appearing in any ';'-separated source list
+        dummies = stations_df["plant:source"].str.get_dummies(sep=";")
+        fuels = tuple(dummies.columns)
+        matrix = dummies.to_numpy(dtype=bool)
+    else:
+        fuels, matrix = (), np.zeros((n, 0), dtype=bool)
+
+    names = tuple(POWER_SOURCE_CATEGORIES)
+    # fuel -> category membership, so the category matrix is one boolean matrix product
+    membership = np.array([[fuel in POWER_SOURCE_CATEGORIES[name] for name in names] for fuel in fuels], dtype=bool)
+    category_matrix = matrix @ membership.reshape(len(fuels), len(names))
+
+    n_categories = category_matrix.sum(axis=1)
+    codes = np.where(n_categories == 1, category_matrix.argmax(axis=1), -1)
+    codes[n_categories > 1] = STATION_CATEGORIES.index(MIXED)
+    category = pd.Categorical.from_codes(codes, categories=STATION_CATEGORIES)
+
+    return FuelMatrix(fuels=fuels, matrix=matrix, categories=names, category_matrix=category_matrix, category=category)
@@ -0,0 +1,149 @@
+"""
+Binary startup cache for the GeoJSON assets of the Ukraine Energy Dashboard.
+
+Parsing GeoJSON, reprojecting and computing centroids is the bulk of every worker's cold start.
+The first load of a source file writes the prepared GeoDataFrame to a GeoParquet file (geometries
+as WKB, reprojection and centroids already done) named after the SHA-256 of the source bytes;
+later loads read that file memory-mapped. Editing the source file changes its hash, so stale
+caches are never read and are removed when the new one is written.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import geopandas as gpd
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached layout changes so that existing cache files are rebuilt
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path("assets/data/.cache")
+
+
+def file_digest(path: str | os.PathLike, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 hex digest of a file, reading it in chunks.
+
+    Args:
+        path: File to hash
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex digest string
+
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(source: str | os.PathLike, cache_dir: str | os.PathLike, crs: int, centroids: bool) -> Path:
+    """
+    Return the cache file location for a source file and load options.
+
+    Args:
+        source: Source GeoJSON file
+        cache_dir: Directory holding the cache files
+        crs: EPSG code the data is reprojected to
+        centroids: Whether a 'centroid' column is precomputed
+
+    Returns:
+        Path of the GeoParquet cache file
+
+    """
+    source = Path(source)
+    key = hashlib.sha256(f"{file_digest(source)}|{crs}|{centroids}|{CACHE_FORMAT_VERSION}".encode()).hexdigest()
+    return Path(cache_dir) / f"{source.stem}-{key[:16]}.parquet"
+
+
+def _add_timing(timings: dict[str, float] | None, phase: str, start: float) -> float:
+    """Add the time elapsed since ``start`` to a phase of ``timings`` and return the current time."""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + now - start
+    return now
+
+
+def _read_source(source: Path, crs: int, centroids: bool, timings: dict[str, float] | None = None) -> gpd.GeoDataFrame:
+    """Parse a GeoJSON file, reproject it and optionally add a 'centroid' geometry column."""
+    start = time.perf_counter()
+    gdf = gpd.read_file(source).set_geometry("geometry")
+    start = _add_timing(timings, "read", start)
+    gdf = gdf.to_crs(crs)
+    start = _add_timing(timings, "reproject", start)
+    if centroids and "centroid" not in gdf.columns:
+        gdf["centroid"] = gdf.geometry.centroid
+        _add_timing(timings, "centroid", start)
+    return gdf
+
+
+def _write_cache(gdf: gpd.GeoDataFrame, path: Path) -> None:
+    """Write a GeoParquet cache file atomically and remove stale caches of the same source."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write next to the target and rename, so concurrently booting workers never read a partial file
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".tmp")
+    os.close(fd)
+    try:
+        gdf.to_parquet(tmp_name, index=True, compression="zstd")
+        os.replace(tmp_name, path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+    source_stem = path.stem.rsplit("-", 1)[0]
+    for stale in path.parent.glob(f"{source_stem}-*.parquet"):
+        if stale != path and stale.stem.rsplit("-", 1)[0] == source_stem:
+            stale.unlink(missing_ok=True)
+
+
+def load_geodataframe(
+    source: str | os.PathLike,
+    crs: int = 4326,
+    centroids: bool = False,
+    cache_dir: str | os.PathLike | None = DEFAULT_CACHE_DIR,
+    timings: dict[str, float] | None = None,
+) -> gpd.GeoDataFrame:
+    """
+    Load a GeoJSON asset through the GeoParquet startup cache.
+
+    Args:
+        source: Source GeoJSON file
+        crs: EPSG code to reproject to
+        centroids: Whether to add a 'centroid' geometry column (kept if the source already has one)
+        cache_dir: Directory holding the cache files; None disables the cache
+        timings: Optional dict the seconds spent per phase ('read', 'reproject', 'centroid') are added to
+
+    Returns:
+        GeoDataFrame with 'geometry' as active geometry column, in ``crs``
+
+    """
+    source = Path(source)
+    if cache_dir is None:
+        return _read_source(source, crs, centroids, timings)
+
+    start = time.perf_counter()
+    path = cache_path(source, cache_dir, crs, centroids)
+    if path.exists():
+        try:
+            gdf = gpd.read_parquet(path, memory_map=True)
+            _add_timing(timings, "read", start)
+            logger.info("Loaded %s from cache %s in %.3fs", source.name, path, time.perf_counter() - start)
+            return gdf
+        except Exception:
+            logger.exception("Unreadable cache file %s, rebuilding from %s", path, source)
+
+    gdf = _read_source(source, crs, centroids, timings)
+    try:
+        _write_cache(gdf, path)
+    except (ImportError, OSError):
+        # pyarrow missing or read-only filesystem: serve the parsed data without caching it
+        logger.warning("Could not write cache file %s", path, exc_info=True)
+    logger.info("Parsed %s in %.3fs", source.name, time.perf_counter() - start)
+    return gdf
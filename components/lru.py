@@ -0,0 +1,112 @@
+"""
+Bounded, thread-safe LRU cache shared by the Ukraine Energy Dashboard's per-process caches.
+
+Values are computed outside the lock, so concurrent misses on different keys do not serialise;
+two concurrent misses on the same key both compute it and the last one is kept.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded LRU cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def lookup(self, key: K) -> V | None:
+        """
+        Return the cached value for ``key`` (None on a miss), counting the hit or miss.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None
+
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> V:
+        """
+        Store a value as the most recently used entry, evicting the least recently used ones.
+
+        Args:
+            key: Cache key
+            value: Value to store
+
+        Returns:
+            ``value``
+
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def get_or_compute(self, key: K, compute: Callable[[], V]) -> V:
+        """
+        Return the cached value for ``key``, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument function building the value
+
+        Returns:
+            Cached or computed value (shared between callers, must not be mutated)
+
+        """
+        value = self.lookup(key)
+        if value is not None:
+            return value
+        return self.put(key, compute())
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Return cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_ratio, size and maxsize
+
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,78 @@
+"""
+Web mercator projection shared by the Ukraine Energy Dashboard's map components.
+
+Longitude and latitude are projected once, onto the plane in units of half the world's width
+(x and y in [-1, 1], y pointing north), and then scaled: to metres (EPSG:3857) for the vector
+tiles, or to pixels (origin at the top-left corner of the world, y pointing south) for the
+clusters and the fit-to-bounds zooms.
+"""
+
+import numpy as np
+
+# Latitude limit of web mercator, where the world is square
+MAX_LATITUDE = 85.05112878
+
+# Half the circumference of the web mercator world, in metres
+WORLD_HALF = 20037508.342789244
+
+# Edge length of the world in pixels at zoom 0
+TILE_SIZE = 256
+
+
+def _project(lon: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Project lon/lat in degrees to the plane, in units of half the world's width."""
+    lat_rad = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    return np.asarray(lon, dtype=np.float64) / 180.0, np.log(np.tan(np.pi / 4 + lat_rad / 2)) / np.pi
+
+
+def mercator_metres(lon: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Project lon/lat to web mercator metres (EPSG:3857).
+
+    Args:
+        lon: Longitudes in degrees
+        lat: Latitudes in degrees
+
+    Returns:
+        Tuple of (x, y) arrays in metres, origin at (0, 0) lon/lat
+
+    """
+    x, y = _project(lon, lat)
+    return x * WORLD_HALF, y * WORLD_HALF
+
+
+def mercator_pixels(lon: np.ndarray, lat: np.ndarray, zoom: float = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Project lon/lat to web mercator pixel coordinates at a zoom level.
+
+    Args:
+        lon: Longitudes in degrees
+        lat: Latitudes in degrees
+        zoom: Mapbox zoom level
+
+    Returns:
+        Tuple of (x, y) pixel arrays, origin at the top-left corner of the world
+
+    """
+    scale = TILE_SIZE * 2.0**zoom
+    x, y = _project(lon, lat)
+    return (x + 1.0) / 2.0 * scale, (1.0 - y) / 2.0 * scale
+
+
+def pixels_to_lonlat(x: np.ndarray, y: np.ndarray, zoom: float = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Invert ``mercator_pixels``.
+
+    Args:
+        x: Pixel columns
+        y: Pixel rows
+        zoom: Mapbox zoom level
+
+    Returns:
+        Tuple of (lon, lat) arrays in degrees
+
+    """
+    scale = TILE_SIZE * 2.0**zoom
+    lon = np.asarray(x, dtype=np.float64) / scale * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * np.asarray(y, dtype=np.float64) / scale))))
+    return lon, lat
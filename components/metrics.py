@@ -0,0 +1,298 @@
+"""
+Request metrics for the Ukraine Energy Dashboard.
+
+Every Dash callback request is timed by Flask request hooks around the callback endpoint. The
+hooks record wall time, CPU time (of the serving thread) and response size per callback and
+trigger as histograms. ``/metrics`` renders them in the Prometheus text format, together with
+gauges read at scrape time, e.g. the data-load phases and the cache hit ratios.
+The metrics are per process, so with several gunicorn workers each scrape sees the worker that
+answered it. Optionally the slowest N requests are kept with their inputs for inspection.
+"""
+
+import bisect
+import heapq
+import itertools
+import json
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import dash
+import flask
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Path of the Dash callback endpoint (below the app's requests_pathname_prefix)
+CALLBACK_PATH = "_dash-update-component"
+
+# Bucket upper bounds: seconds for the timings, bytes for the response sizes
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Serialised inputs of a slow request are cut to this many characters
+MAX_INPUTS_CHARS = 4000
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    """Render a label set, e.g. ``{callback="update_map",le="0.1"}``."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    """Format a sample value (integers without a decimal point, infinities as +Inf)."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with a fixed label set."""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...], buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self.buckets = tuple(sorted(buckets))
+        # per label values: [count per bucket (non-cumulative, last one is +Inf), sum]
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value
+            labels: Label values, in the order of the label names
+
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def clear(self) -> None:
+        """Drop all observations."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        """
+        Render the histogram in the Prometheus text format.
+
+        Returns:
+            Lines of the exposition (HELP, TYPE, buckets, sum and count per label set)
+
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total[0]) for labels, (counts, total) in sorted(self._series.items())]
+        for labels, counts, total in series:
+            cumulative = list(itertools.accumulate(counts))
+            for bound, count in zip((*self.buckets, math.inf), cumulative, strict=True):
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative[-1]}")
+        return lines
+
+
+def gauge_lines(name: str, documentation: str, samples: Iterable[tuple[Mapping[str, str], float]]) -> list[str]:
+    """
+    Render gauge samples read at scrape time.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        samples: (labels, value) pairs
+
+    Returns:
+        Lines of the exposition
+
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return lines
+
+
+@dataclass(order=True)
+class CallbackRequest:
+    """Timings, size and inputs of one finished callback request."""
+
+    seconds: float
+    callback: str = field(compare=False)
+    trigger: str = field(compare=False)
+    cpu_seconds: float = field(compare=False)
+    response_bytes: int = field(compare=False)
+    status: int = field(compare=False)
+    inputs: str = field(compare=False)  # serialised inputs and state, cut to MAX_INPUTS_CHARS
+
+
+class CallbackMetrics:
+    """Callback request histograms, the slowest requests and the scrape-time gauges of one process."""
+
+    def __init__(self, slowest: int = 0) -> None:
+        self.slowest = slowest
+        labels = ("callback", "trigger")
+        self.duration = Histogram(
+            "dash_callback_duration_seconds", "Wall time of Dash callback requests", labels, DURATION_BUCKETS
+        )
+        self.cpu = Histogram(
+            "dash_callback_cpu_seconds",
+            "CPU time of the thread serving Dash callback requests",
+            labels,
+            DURATION_BUCKETS,
+        )
+        self.size = Histogram(
+            "dash_callback_response_bytes", "Serialised size of Dash callback responses", labels, SIZE_BUCKETS
+        )
+        self._statuses: dict[tuple[str, str], int] = {}
+        self._slow: list[CallbackRequest] = []  # min-heap of the slowest requests
+        self._gauges: list[Callable[[], list[str]]] = []
+        self._lock = threading.Lock()
+
+    def add_gauges(self, collect: Callable[[], list[str]]) -> None:
+        """
+        Register a function rendering gauges at scrape time (see ``gauge_lines``).
+
+        Args:
+            collect: Zero-argument function returning exposition lines
+
+        """
+        self._gauges.append(collect)
+
+    def observe(self, request: CallbackRequest) -> None:
+        """
+        Record a finished callback request.
+
+        Args:
+            request: Timings, size, status and inputs of the request
+
+        """
+        labels = (request.callback, request.trigger)
+        self.duration.observe(request.seconds, *labels)
+        self.cpu.observe(request.cpu_seconds, *labels)
+        self.size.observe(request.response_bytes, *labels)
+        with self._lock:
+            key = (request.callback, str(request.status))
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+            if self.slowest > 0:
+                if len(self._slow) < self.slowest:
+                    heapq.heappush(self._slow, request)
+                elif request.seconds > self._slow[0].seconds:
+                    heapq.heapreplace(self._slow, request)
+
+    def slowest_requests(self) -> list[dict[str, Any]]:
+        """
+        Return the slowest recorded requests, slowest first.
+
+        Returns:
+            List of request dictionaries (empty unless ``slowest`` is set)
+
+        """
+        with self._lock:
+            slow = sorted(self._slow, reverse=True)
+        return [vars(request) for request in slow]
+
+    def clear(self) -> None:
+        """Drop all observations."""
+        for histogram in (self.duration, self.cpu, self.size):
+            histogram.clear()
+        with self._lock:
+            self._statuses.clear()
+            self._slow.clear()
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Returns:
+            Exposition text
+
+        """
+        with self._lock:
+            statuses = sorted(self._statuses.items())
+        lines = [
+            "# HELP dash_callback_requests_total Dash callback requests by response status",
+            "# TYPE dash_callback_requests_total counter",
+            *(f"dash_callback_requests_total{_labels(('callback', 'status'), key)} {count}" for key, count in statuses),
+        ]
+        for histogram in (self.duration, self.cpu, self.size):
+            lines.extend(histogram.render())
+        for collect in self._gauges:
+            try:
+                lines.extend(collect())
+            except Exception:
+                logger.exception("Metrics collector %r failed", collect)
+        return "\n".join(lines) + "\n"
+
+
+def callback_name(app: dash.Dash, output: str) -> str:
+    """Function name of the callback writing ``output`` (the output id when unknown)."""
+    func = app.callback_map.get(output, {}).get("callback")
+    return getattr(func, "__name__", None) or output
+
+
+def _serialise_inputs(body: Mapping[str, Any]) -> str:
+    """Inputs and state of a callback request as (truncated) JSON."""
+    values = {
+        f"{item.get('id')}.{item.get('property')}": item.get("value")
+        for item in [*body.get("inputs", []), *body.get("state", [])]
+        if isinstance(item, dict)
+    }
+    text = json.dumps(values, default=str)
+    return text if len(text) <= MAX_INPUTS_CHARS else text[:MAX_INPUTS_CHARS] + "..."
+
+
+def instrument_callbacks(app: dash.Dash, metrics: CallbackMetrics) -> None:
+    """
+    Time every Dash callback request of an app with Flask request hooks.
+
+    Args:
+        app: Dash app whose ``server`` receives the callback requests
+        metrics: CallbackMetrics to record into
+
+    """
+    server = app.server
+
+    @server.before_request
+    def _start_timer() -> None:
+        if flask.request.path.endswith(CALLBACK_PATH):
+            flask.g.metrics_start = (time.perf_counter(), time.thread_time())
+
+    @server.after_request
+    def _record(response: flask.Response) -> flask.Response:
+        start = flask.g.pop("metrics_start", None)
+        if start is None:
+            return response
+        body = flask.request.get_json(silent=True) or {}
+        output = body.get("output", "")
+        metrics.observe(
+            CallbackRequest(
+                seconds=time.perf_counter() - start[0],
+                callback=callback_name(app, output),
+                # ctx.triggered of the callback is built from the changed properties
+                trigger=",".join(sorted(body.get("changedPropIds") or [])) or "initial",
+                cpu_seconds=time.thread_time() - start[1],
+                response_bytes=response.calculate_content_length() or 0,
+                status=response.status_code,
+                inputs=_serialise_inputs(body) if metrics.slowest > 0 else "",
+            )
+        )
+        return response
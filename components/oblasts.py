@@ -0,0 +1,160 @@
+"""
+Oblast registry for Ukraine Energy Dashboard.
+
+Everything the map needs to show an oblast is derived once when the data is loaded: an integer
+code per oblast (and per station), the dissolved outline, a representative point, the bounding
+box, the zoom that fits the bounding box into the map, and the stations inside it. Selecting an
+oblast is then a dictionary lookup without any geometry work.
+"""
+
+import math
+from dataclasses import dataclass
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry.base import BaseGeometry
+
+from components.mercator import mercator_pixels, pixels_to_lonlat
+
+# Map size (pixels) the fit-to-bounds zoom is computed for, and the margin kept around the oblast
+FIT_VIEWPORT_PIXELS = (900, 600)
+FIT_PADDING = 0.1
+
+# Fit-to-bounds zooms are kept within this range (Kiev City would otherwise zoom in to street level)
+MIN_FIT_ZOOM = 5.0
+MAX_FIT_ZOOM = 10.0
+
+NO_OBLAST = -1
+
+
+@dataclass(frozen=True, eq=False)
+class Oblast:
+    """Precomputed view and stations of one oblast."""
+
+    code: int
+    name: str
+    geometry: BaseGeometry  # dissolved outline (EPSG:4326)
+    point: dict[str, float]  # representative point ({'lat', 'lon'}), always inside the oblast
+    bounds: tuple[float, float, float, float]  # (west, south, east, north)
+    center: dict[str, float]  # center of the bounding box on the map, the camera center of the oblast view
+    zoom: float  # zoom fitting the bounding box into FIT_VIEWPORT_PIXELS
+    rows: np.ndarray  # sorted row positions of the stations in the oblast
+
+
+@dataclass(frozen=True, eq=False)
+class OblastRegistry:
+    """All oblasts keyed by name, plus the oblast code of every station."""
+
+    oblasts: dict[str, Oblast]
+    station_codes: np.ndarray  # oblast code per station row (NO_OBLAST when unassigned)
+
+    @property
+    def names(self) -> list[str]:
+        """Oblast names in alphabetical order."""
+        return list(self.oblasts)
+
+    def get(self, name: str | None) -> Oblast | None:
+        """
+        Look up an oblast by name.
+
+        Args:
+            name: Oblast name (None or 'all' for the whole country)
+
+        Returns:
+            Oblast, or None for the whole country and unknown names
+
+        """
+        return self.oblasts.get(name) if name else None
+
+    def restrict(self, rows: np.ndarray, name: str | None) -> np.ndarray:
+        """
+        Keep the rows of stations inside an oblast.
+
+        Args:
+            rows: Station row positions
+            name: Oblast name; None keeps all rows
+
+        Returns:
+            Subset of ``rows`` (order preserved); empty for unknown names
+
+        """
+        if not name:
+            return rows
+        oblast = self.oblasts.get(name)
+        if oblast is None:
+            return rows[:0]
+        return rows[self.station_codes[rows] == oblast.code]
+
+
+def _mercator_mid_lat(south: float, north: float) -> float:
+    """Latitude halfway between two latitudes on the map (in web mercator, not in degrees)."""
+    _, (y_south, y_north) = mercator_pixels([0.0, 0.0], [south, north])
+    return float(pixels_to_lonlat(0.0, (y_south + y_north) / 2)[1])
+
+
+def fit_zoom(
+    bounds: tuple[float, float, float, float],
+    pixels: tuple[int, int] = FIT_VIEWPORT_PIXELS,
+    padding: float = FIT_PADDING,
+) -> float:
+    """
+    Return the largest zoom at which lon/lat bounds fit into a map of the given size.
+
+    Args:
+        bounds: Tuple of (west, south, east, north) in degrees
+        pixels: (width, height) of the map in pixels
+        padding: Fraction of the map kept free on each side
+
+    Returns:
+        Mapbox zoom, clamped to [MIN_FIT_ZOOM, MAX_FIT_ZOOM]
+
+    """
+    west, south, east, north = bounds
+    # extent in web mercator pixels at zoom 0 (256 px for the whole world)
+    (x_west, x_east), (y_south, y_north) = mercator_pixels([west, east], [south, north])
+    width = max(x_east - x_west, 1e-9)
+    height = max(y_south - y_north, 1e-9)
+    usable = 1 - 2 * padding
+    zoom = min(math.log2(pixels[0] * usable / width), math.log2(pixels[1] * usable / height))
+    return round(min(max(zoom, MIN_FIT_ZOOM), MAX_FIT_ZOOM), 2)
+
+
+def build_oblast_registry(oblasts_gdf: gpd.GeoDataFrame, stations_df: gpd.GeoDataFrame) -> OblastRegistry:
+    """
+    Build the oblast registry from the oblast boundaries and the oblast assignment of the stations.
+
+    Args:
+        oblasts_gdf: GeoDataFrame containing oblast boundaries ('oblast_name_en')
+        stations_df: GeoDataFrame containing station data ('oblast_name_en')
+
+    Returns:
+        OblastRegistry with oblasts in alphabetical order
+
+    """
+    outlines = oblasts_gdf.dissolve("oblast_name_en").sort_index()
+    names = outlines.index.tolist()
+    if "oblast_name_en" in stations_df.columns:
+        station_codes = pd.Categorical(stations_df["oblast_name_en"], categories=names).codes.astype(np.int16)
+    else:
+        station_codes = np.full(len(stations_df), NO_OBLAST, dtype=np.int16)
+
+    # one stable sort groups the stations by oblast code (rows stay sorted within each oblast)
+    order = np.argsort(station_codes, kind="stable")
+    starts = np.searchsorted(station_codes[order], np.arange(len(names) + 1))
+
+    oblasts = {}
+    for code, (name, geometry) in enumerate(outlines.geometry.items()):
+        bounds = tuple(float(value) for value in geometry.bounds)
+        point = geometry.representative_point()
+        oblasts[name] = Oblast(
+            code=code,
+            name=name,
+            geometry=geometry,
+            point={"lat": point.y, "lon": point.x},
+            bounds=bounds,
+            center={"lat": _mercator_mid_lat(bounds[1], bounds[3]), "lon": (bounds[0] + bounds[2]) / 2},
+            zoom=fit_zoom(bounds),
+            rows=order[starts[code] : starts[code + 1]],
+        )
+    return OblastRegistry(oblasts=oblasts, station_codes=station_codes)
@@ -0,0 +1,278 @@
+"""
+Opt-in profiling of individual Dash callback requests.
+
+A profiled request is either sampled at random (``sample_rate``) or explicitly requested: a
+page opened with ``?profile=1`` sets a cookie that marks the browser's callback requests, and
+scripts can send an ``X-Profile: 1`` header. Sampled requests are written to disk only when they
+take longer than ``threshold`` seconds; requested ones are always written.
+
+The default profiler samples the stack of the serving thread from a background thread, which
+gives exact collapsed stacks (``.collapsed``, for flamegraph.pl and speedscope) and a speedscope
+file (``.speedscope.json``). ``mode='cprofile'`` traces every call with cProfile instead and
+writes a pstats file (``.prof``, e.g. for snakeviz). Nothing is installed unless profiling is
+enabled, so a disabled profiler costs nothing per request.
+"""
+
+import cProfile
+import datetime as dt
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+import dash
+import flask
+
+from components.geo_cache import DEFAULT_CACHE_DIR
+from components.metrics import CALLBACK_PATH, callback_name
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+
+DEFAULT_PROFILE_DIR = DEFAULT_CACHE_DIR / "profiles"
+
+# Query parameter (page) / cookie (callback requests) / header marking requests to profile
+PROFILE_PARAMETER = "profile"
+PROFILE_HEADER = "X-Profile"
+
+DEFAULT_SAMPLE_INTERVAL = 0.001
+
+# One frame of a stack: (function name, file, first line of the function)
+Frame = tuple[str, str, int]
+
+
+class StackSampler:
+    """Samples the stack of one thread from a background thread until stopped."""
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[tuple[Frame, ...]] = Counter()  # root-first stack -> seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                # each sample stands for the time since the previous one
+                self.stacks[_stack(frame)] += now - last
+            last = now
+
+
+def _stack(frame: FrameType | None) -> tuple[Frame, ...]:
+    """Root-first frames of a stack."""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def _frame_label(frame: Frame) -> str:
+    """Flamegraph label of a frame: ``function (file:line)``, without the stack separator."""
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+def collapsed_stacks(stacks: Counter[tuple[Frame, ...]], unit: float = 1e-6) -> str:
+    """
+    Render sampled stacks in the collapsed format (``root;child;leaf count``).
+
+    Args:
+        stacks: Root-first stacks and their sampled seconds
+        unit: Seconds per count (microseconds by default)
+
+    Returns:
+        One line per stack
+
+    """
+    lines = []
+    for stack, seconds in stacks.most_common():
+        count = round(seconds / unit)
+        if count:
+            lines.append(f"{';'.join(_frame_label(frame) for frame in stack)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def speedscope_profile(stacks: Counter[tuple[Frame, ...]], name: str) -> dict:
+    """
+    Render sampled stacks as a speedscope file (one 'sampled' profile, weights in seconds).
+
+    Args:
+        stacks: Root-first stacks and their sampled seconds
+        name: Name of the profile
+
+    Returns:
+        Dictionary following https://www.speedscope.app/file-format-schema.json
+
+    """
+    index: dict[Frame, int] = {}
+    samples, weights = [], []
+    for stack, seconds in stacks.items():
+        samples.append([index.setdefault(frame, len(index)) for frame in stack])
+        weights.append(seconds)
+    frames = [{"name": fn, "file": filename, "line": line} for fn, filename, line in index]
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "ukr-energy-dash",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+class CallbackProfiler:
+    """Profiles sampled or requested callback requests and writes the slow ones to a directory."""
+
+    def __init__(
+        self,
+        output_dir: str | os.PathLike = DEFAULT_PROFILE_DIR,
+        threshold: float = 0.5,
+        sample_rate: float = 0.0,
+        allow_requests: bool = False,
+        mode: str = "sample",
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+        self.output_dir = Path(output_dir)
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.allow_requests = allow_requests
+        self.mode = mode
+        self.interval = DEFAULT_SAMPLE_INTERVAL
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any request can be profiled."""
+        return self.sample_rate > 0 or self.allow_requests
+
+    def requested(self, request: flask.Request) -> bool:
+        """Whether a request asks to be profiled (cookie or header), if that is allowed."""
+        if not self.allow_requests:
+            return False
+        return request.cookies.get(PROFILE_PARAMETER) == "1" or request.headers.get(PROFILE_HEADER) == "1"
+
+    def start(self) -> StackSampler | cProfile.Profile:
+        """Start profiling the current thread."""
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+            return profile
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        return sampler
+
+    def write(self, profile: StackSampler | cProfile.Profile, callback: str, seconds: float) -> list[Path]:
+        """
+        Write a finished profile to the output directory.
+
+        Args:
+            profile: Stopped sampler or disabled cProfile profile
+            callback: Callback name (part of the file names)
+            seconds: Wall time of the request
+
+        Returns:
+            Paths of the written files
+
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = dt.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        stem = self.output_dir / f"{stamp}-{re.sub(r'[^A-Za-z0-9_.-]', '_', callback)}-{seconds * 1000:.0f}ms"
+        if isinstance(profile, cProfile.Profile):
+            path = stem.with_suffix(".prof")
+            profile.dump_stats(path)
+            return [path]
+        collapsed = stem.with_suffix(".collapsed")
+        collapsed.write_text(collapsed_stacks(profile.stacks), encoding="utf-8")
+        speedscope = stem.with_suffix(".speedscope.json")
+        speedscope.write_text(json.dumps(speedscope_profile(profile.stacks, stem.name)), encoding="utf-8")
+        return [collapsed, speedscope]
+
+
+def instrument_profiling(app: dash.Dash, profiler: CallbackProfiler) -> None:
+    """
+    Install the request hooks profiling Dash callback requests (nothing is installed when disabled).
+
+    Args:
+        app: Dash app whose ``server`` receives the callback requests
+        profiler: Configured CallbackProfiler
+
+    Raises:
+        ValueError: If profiling is enabled with an unknown mode
+
+    """
+    if not profiler.enabled:
+        return
+    if profiler.mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {profiler.mode!r}, expected one of {PROFILE_MODES}")
+    server = app.server
+
+    @server.before_request
+    def _start_profile() -> None:
+        request = flask.request
+        if not request.path.endswith(CALLBACK_PATH):
+            return
+        requested = profiler.requested(request)
+        if requested or random.random() < profiler.sample_rate:  # noqa: S311
+            flask.g.profile = (profiler.start(), time.perf_counter(), requested)
+
+    @server.after_request
+    def _stop_profile(response: flask.Response) -> flask.Response:
+        state = flask.g.pop("profile", None)
+        if state is None:
+            return response
+        profile, start, requested = state
+        if isinstance(profile, cProfile.Profile):
+            profile.disable()
+        else:
+            profile.stop()
+        seconds = time.perf_counter() - start
+        if requested or seconds >= profiler.threshold:
+            body = flask.request.get_json(silent=True) or {}
+            callback = callback_name(app, body.get("output", ""))
+            paths = profiler.write(profile, callback, seconds)
+            logger.info("Profiled %s (%.3fs) -> %s", callback, seconds, ", ".join(str(path) for path in paths))
+        return response
+
+    if profiler.allow_requests:
+
+        @server.after_request
+        def _remember_opt_in(response: flask.Response) -> flask.Response:
+            # ?profile=1 on a page marks the callback requests of this browser session, ?profile=0 ends it
+            value = flask.request.args.get(PROFILE_PARAMETER)
+            if value == "1":
+                response.set_cookie(PROFILE_PARAMETER, "1", httponly=True, samesite="Lax")
+            elif value == "0":
+                response.delete_cookie(PROFILE_PARAMETER)
+            return response
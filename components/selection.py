@@ -0,0 +1,154 @@
+"""
+Shared station selection for Ukraine Energy Dashboard callbacks.
+
+The rows picked by the sidebar filters, the oblast and a lasso/box selection are resolved once
+per interaction by a single callback. The row arrays stay in a process-local, bounded LRU cache
+on the server; the browser only holds a small ``selection-store`` with the selection token and
+the URL parameters it was computed from. The map, table, details panel and export read the rows
+from the cache, and a worker that has not seen a token yet (or evicted it) rebuilds the entry
+from the parameters instead of re-running the filters per callback.
+"""
+
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from components.data_provider import DashboardData
+from components.figure_cache import MapState
+from components.lru import LRUCache
+from components.spatial import selection_geometry
+from components.table import TableQuery
+
+
+@dataclass(frozen=True, eq=False)
+class Selection:
+    """Rows of one selection state, shared by all callbacks of an interaction (read-only)."""
+
+    token: str
+    query: TableQuery  # sidebar filters and lasso/box outline (no table filter row or sort)
+    rows: np.ndarray  # sorted positions passing the sidebar filters and the oblast (the map markers)
+    selected: np.ndarray  # ``rows`` inside the lasso/box selection, all of ``rows`` without one
+
+    @property
+    def map_state(self) -> MapState:
+        """Normalised map state of the selection (the lasso/box outline does not change the map)."""
+        query = self.query
+        return MapState(
+            oblast=query.oblast,
+            power_source=query.power_source,
+            gppd_only=query.gppd_only,
+            include_substations=query.include_substations,
+        )
+
+    def to_store(self) -> dict[str, Any]:
+        """
+        Encode the selection for the browser's ``selection-store``.
+
+        Returns:
+            Dictionary with the token and the URL parameters of the selection
+
+        """
+        return {"token": self.token, "params": self.query.to_params()}
+
+
+def selection_query(query: TableQuery) -> TableQuery:
+    """
+    Reduce a table query to the part shared by all callbacks, in canonical form.
+
+    The table filter row and sort order only apply to the table and export, and the substations
+    toggle is ignored while a power source filter is active, so equivalent states share one token.
+
+    Args:
+        query: Table query (sidebar filters, lasso/box outline, table filter row, sort)
+
+    Returns:
+        TableQuery without filter row and sort order
+
+    """
+    return query._replace(
+        filter_query="",
+        sort_by=(),
+        include_substations=query.power_source == "all" and query.include_substations,
+    )
+
+
+def selection_token(query: TableQuery) -> str:
+    """
+    Return the token of a selection query: a short hash of its canonical URL parameters.
+
+    Args:
+        query: Selection query (see ``selection_query``)
+
+    Returns:
+        Hex digest identifying the selection in every worker process
+
+    """
+    payload = json.dumps(selection_query(query).to_params(), sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def compute_selection(data: DashboardData, query: TableQuery) -> Selection:
+    """
+    Resolve a selection query to the rows of the map and of the table.
+
+    Args:
+        data: Loaded dashboard data
+        query: Table query; its filter row and sort order are ignored
+
+    Returns:
+        Selection of ``data``
+
+    """
+    query = selection_query(query)
+    rows = data.filter_index.select(
+        gppd_only=query.gppd_only,
+        power_source=query.power_source,
+        include_substations=query.include_substations,
+    )
+    rows = data.oblast_registry.restrict(rows, query.oblast)
+
+    selected = rows
+    # lasso/box selection is resolved from its outline and narrows the filtered rows
+    if query.selection:
+        inside = data.spatial_index.query(selection_geometry(query.selection))
+        selected = np.intersect1d(rows, inside, assume_unique=True)
+    return Selection(token=selection_token(query), query=query, rows=rows, selected=selected)
+
+
+class SelectionCache(LRUCache[str, Selection]):
+    """Bounded LRU cache of selections keyed by token, with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        super().__init__(maxsize)
+
+    def get(self, data: DashboardData, query: TableQuery) -> Selection:
+        """
+        Return the selection for a query, computing and storing it on a miss.
+
+        Args:
+            data: Loaded dashboard data the rows refer to
+            query: Table query; its filter row and sort order are ignored
+
+        Returns:
+            Selection (shared between callers, must not be mutated)
+
+        """
+        return self.get_or_compute(selection_token(query), lambda: compute_selection(data, query))
+
+    def from_store(self, data: DashboardData, store: Mapping[str, Any] | None) -> Selection:
+        """
+        Return the selection recorded in the browser's ``selection-store``.
+
+        Args:
+            data: Loaded dashboard data the rows refer to
+            store: Store data written by ``Selection.to_store`` (None before the first selection)
+
+        Returns:
+            Selection; the default filters when the store is empty
+
+        """
+        return self.get(data, TableQuery.from_params((store or {}).get("params") or {}))
@@ -0,0 +1,111 @@
+"""
+Spatial index for map selections in Ukraine Energy Dashboard.
+
+Lasso and box selections are resolved on the server from the selection shape Plotly reports
+(``selectedData["lassoPoints"]`` / ``selectedData["range"]``) instead of the list of points it
+happened to render. A shapely STRtree over the station polygons and their centroids is built once
+when the data is loaded; a selection is a single bulk tree query whose row positions are then
+intersected with the active filter rows.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.geometry.base import BaseGeometry
+
+# Coordinate precision (degrees) kept when a selection shape is encoded, ~10 cm
+SELECTION_DECIMALS = 6
+
+
+@dataclass(frozen=True)
+class SpatialIndex:
+    """STRtree over station geometries and centroids, aligned with the stations frame rows."""
+
+    tree: shapely.STRtree
+    size: int
+
+    def query(self, geometry: BaseGeometry | None) -> np.ndarray:
+        """
+        Return the row positions of stations whose polygon or centroid intersects a shape.
+
+        Args:
+            geometry: Selection shape in EPSG:4326
+
+        Returns:
+            Sorted, unique array of row positions (empty for a missing or empty shape)
+
+        """
+        if geometry is None or geometry.is_empty:
+            return np.empty(0, dtype=np.intp)
+        # the tree holds the geometries followed by the centroids, so hits are folded back modulo size
+        hits = self.tree.query(geometry, predicate="intersects")
+        return np.unique(hits % self.size)
+
+
+def build_spatial_index(stations_df: gpd.GeoDataFrame) -> SpatialIndex:
+    """
+    Build the selection index for a stations GeoDataFrame.
+
+    Args:
+        stations_df: GeoDataFrame containing station geometries in EPSG:4326
+
+    Returns:
+        SpatialIndex aligned with the row positions of ``stations_df``
+
+    """
+    geometries = stations_df.geometry.to_numpy()
+    # centroids are indexed as well: a concave polygon's marker can lie outside the polygon itself
+    tree = shapely.STRtree(np.concatenate([geometries, shapely.centroid(geometries)]))
+    return SpatialIndex(tree=tree, size=len(geometries))
+
+
+def selection_ring(selected_data: dict[str, Any] | None) -> tuple[tuple[float, float], ...]:
+    """
+    Extract the selection outline from Plotly ``selectedData`` as a (lon, lat) ring.
+
+    Args:
+        selected_data: Data from a lasso (``lassoPoints``) or box (``range``) selection on the map
+
+    Returns:
+        Tuple of (lon, lat) vertices, empty when there is no (valid) selection shape
+
+    """
+    if not selected_data:
+        return ()
+
+    lasso = (selected_data.get("lassoPoints") or {}).get("mapbox")
+    if lasso:
+        ring = [(float(lon), float(lat)) for lon, lat in lasso]
+    else:
+        box = (selected_data.get("range") or {}).get("mapbox")
+        if not box or len(box) != 2:
+            return ()
+        (lon0, lat0), (lon1, lat1) = ((float(lon), float(lat)) for lon, lat in box)
+        ring = [(lon0, lat0), (lon1, lat0), (lon1, lat1), (lon0, lat1)]
+
+    if len(ring) < 3:
+        return ()
+    return tuple((round(lon, SELECTION_DECIMALS), round(lat, SELECTION_DECIMALS)) for lon, lat in ring)
+
+
+def selection_geometry(ring: Sequence[Sequence[float]]) -> BaseGeometry | None:
+    """
+    Build the selection shape from a (lon, lat) ring.
+
+    Args:
+        ring: Vertices of the lasso/box outline
+
+    Returns:
+        Valid (multi)polygon, or None when the ring has fewer than three vertices
+
+    """
+    if len(ring) < 3:
+        return None
+    polygon = Polygon(ring)
+    # a self-crossing lasso is split into its valid parts instead of being rejected
+    return polygon if polygon.is_valid else shapely.make_valid(polygon)
@@ -0,0 +1,362 @@
+"""
+Server-side querying of the stations table for Ukraine Energy Dashboard.
+
+The stations DataTable runs with ``page_action``, ``sort_action`` and ``filter_action`` set to
+``"custom"``: the browser only receives the visible page and the total row count. Sorting uses
+sort keys precomputed once per column when the data is loaded (dense ranks and full-table orders),
+and the table's filter row (``filter_query``) is evaluated as vectorised masks over the rows
+selected by the sidebar filters.
+"""
+
+import json
+import re
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from components.spatial import selection_ring
+
+TABLE_COLUMNS = ["name", "station_name_en", "power", "plant:source", "plant:method", "oblast_name_en", "gppd_overlap"]
+
+DEFAULT_PAGE_SIZE = 10
+
+# One clause of a DataTable filter query, e.g. '{plant:source} contains "coal"' or '{power} = plant'
+_FILTER_CLAUSE = re.compile(
+    r"^\s*\{(?P<column>[^}]+)\}\s*"
+    r"(?P<operator>>=|<=|!=|=|<|>|[is]?(?:eq|ne|lt|le|gt|ge|contains|datestartswith)\b|is (?:not )?blank)"
+    r"\s*(?P<value>.*?)\s*$"
+)
+
+_SYMBOL_OPERATORS = {">=": "ge", "<=": "le", "!=": "ne", "=": "eq", "<": "lt", ">": "gt"}
+
+
+class TableQuery(NamedTuple):
+    """Normalised row selection of the stations table, shared by the table callback and the export endpoint."""
+
+    oblast: str | None = None
+    gppd_only: bool = False
+    power_source: str = "all"
+    include_substations: bool = True
+    selection: tuple[tuple[float, float], ...] = ()  # (lon, lat) outline of a lasso/box selection
+    filter_query: str = ""
+    sort_by: tuple[tuple[str, str], ...] = ()  # (column_id, direction), highest priority first
+
+    def to_params(self) -> dict[str, str]:
+        """
+        Encode the query as URL parameters (only non-default values).
+
+        Returns:
+            Dictionary of parameter name to string value
+
+        """
+        params = {
+            "oblast": self.oblast or "",
+            "gppd": "1" if self.gppd_only else "",
+            "power_source": self.power_source if self.power_source != "all" else "",
+            "substations": "" if self.include_substations else "0",
+            "selection": json.dumps([list(vertex) for vertex in self.selection]) if self.selection else "",
+            "filter": self.filter_query,
+            "sort": json.dumps([list(spec) for spec in self.sort_by]) if self.sort_by else "",
+        }
+        return {key: value for key, value in params.items() if value}
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, str]) -> "TableQuery":
+        """
+        Decode a query from URL parameters written by ``to_params``; malformed values fall back to defaults.
+
+        Args:
+            params: Request arguments
+
+        Returns:
+            TableQuery
+
+        """
+        try:
+            selection = tuple((float(lon), float(lat)) for lon, lat in json.loads(params.get("selection") or "[]"))
+        except (TypeError, ValueError):
+            selection = ()
+        try:
+            sort_by = tuple(
+                (str(column), str(direction)) for column, direction in json.loads(params.get("sort") or "[]")
+            )
+        except (TypeError, ValueError):
+            sort_by = ()
+        return cls(
+            oblast=params.get("oblast") or None,
+            gppd_only=params.get("gppd") == "1",
+            power_source=params.get("power_source") or "all",
+            include_substations=params.get("substations") != "0",
+            selection=selection,
+            filter_query=params.get("filter", ""),
+            sort_by=sort_by,
+        )
+
+
+def normalise_table_query(
+    oblast: str | None,
+    gppd_store: dict[str, bool] | None,
+    power_source_store: dict[str, str] | None,
+    substations_store: dict[str, bool] | None,
+    selected_data: dict[str, Any] | None,
+    filter_query: str | None,
+    sort_by: list[dict[str, str]] | None,
+) -> TableQuery:
+    """
+    Collapse raw dropdown/store/table values into a TableQuery.
+
+    Args:
+        oblast: Selected oblast from the dropdown
+        gppd_store: GPPD filter store data
+        power_source_store: Power source filter store data
+        substations_store: Substations filter store data
+        selected_data: Data from lasso/box selection on the map
+        filter_query: Query from the table's filter row
+        sort_by: Sort columns and directions of the table
+
+    Returns:
+        TableQuery
+
+    """
+    return TableQuery(
+        oblast=oblast if oblast and oblast != "all" else None,
+        gppd_only=bool(gppd_store and gppd_store.get("enabled")),
+        power_source=(power_source_store or {}).get("type") or "all",
+        include_substations=not (substations_store and not substations_store.get("enabled")),
+        selection=selection_ring(selected_data),
+        filter_query=filter_query or "",
+        sort_by=normalise_sort_by(sort_by),
+    )
+
+
+def normalise_sort_by(sort_by: list[dict[str, str]] | None) -> tuple[tuple[str, str], ...]:
+    """
+    Convert the table's ``sort_by`` property into (column_id, direction) pairs.
+
+    Args:
+        sort_by: Sort columns and directions of the table
+
+    Returns:
+        Tuple of (column_id, direction), highest priority first
+
+    """
+    return tuple((spec["column_id"], spec.get("direction", "asc")) for spec in sort_by or [] if "column_id" in spec)
+
+
+@dataclass(frozen=True)
+class ColumnKeys:
+    """Precomputed sort and filter keys of one table column, aligned with the stations frame rows."""
+
+    rank: np.ndarray  # dense rank of each row's value, missing values ranked last (== missing_rank)
+    missing_rank: int
+    ascending: np.ndarray  # all row positions in ascending order (stable, missing last)
+    descending: np.ndarray  # all row positions in descending order (stable, missing last)
+    text: np.ndarray  # lower-cased string value per row ('' when missing)
+    numeric: np.ndarray  # float value per row (NaN when not numeric)
+
+
+@dataclass(frozen=True)
+class TableIndex:
+    """Sort/filter keys for every table column."""
+
+    columns: dict[str, ColumnKeys]
+    size: int
+
+
+def _column_keys(values: pd.Series) -> ColumnKeys:
+    """Compute the sort and filter keys of a single column."""
+    missing = values.isna().to_numpy()
+    codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=True)
+    missing_rank = len(uniques)
+    rank = np.where(codes < 0, missing_rank, codes).astype(np.int32)
+    descending_rank = np.where(missing, missing_rank, missing_rank - 1 - rank)
+
+    text = values.astype("string").str.lower().fillna("").to_numpy(dtype=object)
+    numeric = values.to_numpy(dtype=float) if values.dtype == bool else pd.to_numeric(values, errors="coerce")
+    return ColumnKeys(
+        rank=rank,
+        missing_rank=missing_rank,
+        ascending=np.argsort(rank, kind="stable"),
+        descending=np.argsort(descending_rank, kind="stable"),
+        text=text,
+        numeric=np.asarray(numeric, dtype=float),
+    )
+
+
+def build_table_index(stations_df: gpd.GeoDataFrame, columns: Sequence[str] = TABLE_COLUMNS) -> TableIndex:
+    """
+    Precompute the sort and filter keys of the table columns.
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+        columns: Table columns to index (missing columns are skipped)
+
+    Returns:
+        TableIndex aligned with the row positions of ``stations_df``
+
+    """
+    return TableIndex(
+        columns={column: _column_keys(stations_df[column]) for column in columns if column in stations_df.columns},
+        size=len(stations_df),
+    )
+
+
+def parse_filter_query(filter_query: str | None) -> list[tuple[str, str, str | float]]:
+    """
+    Split a DataTable filter query into (column, operator, value) clauses.
+
+    Symbol operators are mapped to their names ('>=' -> 'ge'); the case prefixes of the
+    DataTable syntax ('icontains', 'seq') are dropped, as matching is always case-insensitive.
+    Unparsable clauses are ignored.
+
+    Args:
+        filter_query: Query such as '{power} = plant && {plant:source} contains "coal"'
+
+    Returns:
+        List of clauses; numeric values are returned as floats
+
+    """
+    clauses: list[tuple[str, str, str | float]] = []
+    for part in (filter_query or "").split(" && "):
+        match = _FILTER_CLAUSE.match(part)
+        if not match:
+            continue
+        operator = match["operator"]
+        operator = _SYMBOL_OPERATORS.get(operator, operator)
+        if operator[0] in "is" and not operator.startswith("is "):
+            operator = operator[1:]
+
+        raw = match["value"]
+        value: str | float
+        if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "'\"`":
+            value = raw[1:-1].replace("\\" + raw[0], raw[0])
+        else:
+            try:
+                value = float(raw)
+            except ValueError:
+                value = raw
+        clauses.append((match["column"], operator, value))
+    return clauses
+
+
+def _clause_mask(keys: ColumnKeys, rows: np.ndarray, operator: str, value: str | float) -> np.ndarray:
+    """Evaluate one filter clause for the given row positions."""
+    text = keys.text[rows]
+    if operator == "is blank":
+        return text == ""
+    if operator == "is not blank":
+        return text != ""
+    if operator == "contains":
+        return pd.Series(text).str.contains(str(value).lower(), regex=False).to_numpy()
+    if operator == "datestartswith":
+        return pd.Series(text).str.startswith(str(value).lower()).to_numpy()
+
+    if isinstance(value, float):
+        # numeric comparison where the column has numbers; booleans compare as 0/1
+        left: np.ndarray = keys.numeric[rows]
+        right: float | str = value
+    else:
+        left, right = text, value.lower()
+        if operator in {"lt", "le", "gt", "ge"}:
+            # blank values never satisfy an ordering comparison
+            valid = left != ""
+            return valid & _compare(left, operator, right)
+    return _compare(left, operator, right)
+
+
+def _compare(left: np.ndarray, operator: str, right: float | str) -> np.ndarray:
+    """Apply a comparison operator element-wise."""
+    if operator == "eq":
+        return left == right
+    if operator == "ne":
+        return left != right
+    if operator == "lt":
+        return left < right
+    if operator == "le":
+        return left <= right
+    if operator == "gt":
+        return left > right
+    return left >= right
+
+
+def filter_rows(index: TableIndex, rows: np.ndarray, filter_query: str | None) -> np.ndarray:
+    """
+    Keep the rows matching every clause of a DataTable filter query.
+
+    Args:
+        index: TableIndex of the stations frame
+        rows: Row positions selected by the sidebar filters
+        filter_query: DataTable ``filter_query``
+
+    Returns:
+        Subset of ``rows`` (order preserved)
+
+    """
+    for column, operator, value in parse_filter_query(filter_query):
+        keys = index.columns.get(column)
+        if keys is None or not rows.size:
+            continue
+        rows = rows[_clause_mask(keys, rows, operator, value)]
+    return rows
+
+
+def sort_rows(index: TableIndex, rows: np.ndarray, sort_by: Sequence[tuple[str, str]]) -> np.ndarray:
+    """
+    Order rows by the DataTable ``sort_by`` columns using the precomputed keys.
+
+    A single sort column walks the precomputed full-table order and keeps the selected rows
+    (no per-request sort); several columns are combined with one lexsort over the ranks.
+
+    Args:
+        index: TableIndex of the stations frame
+        rows: Row positions to order
+        sort_by: (column_id, direction) pairs, highest priority first
+
+    Returns:
+        Reordered row positions (missing values last in either direction)
+
+    """
+    sort_by = [(column, direction) for column, direction in sort_by if column in index.columns]
+    if not sort_by or not rows.size:
+        return rows
+
+    if len(sort_by) == 1:
+        column, direction = sort_by[0]
+        keys = index.columns[column]
+        order = keys.descending if direction == "desc" else keys.ascending
+        selected = np.zeros(index.size, dtype=bool)
+        selected[rows] = True
+        return order[selected[order]]
+
+    sort_keys = []
+    for column, direction in sort_by:
+        keys = index.columns[column]
+        rank = keys.rank[rows]
+        if direction == "desc":
+            rank = np.where(rank == keys.missing_rank, keys.missing_rank, keys.missing_rank - 1 - rank)
+        sort_keys.append(rank)
+    # lexsort treats the last key as primary
+    return rows[np.lexsort(sort_keys[::-1])]
+
+
+def page_bounds(total: int, page_current: int | None, page_size: int | None) -> tuple[int, int, int]:
+    """
+    Clamp the requested page to the available rows.
+
+    Args:
+        total: Number of rows after filtering
+        page_current: Requested zero-based page
+        page_size: Rows per page
+
+    Returns:
+        Tuple of (page, page_count, page_size)
+
+    """
+    page_size = page_size or DEFAULT_PAGE_SIZE
+    page_count = max(1, -(-total // page_size))
+    page = min(max(page_current or 0, 0), page_count - 1)
+    return page, page_count, page_size
@@ -0,0 +1,459 @@
+"""
+Mapbox Vector Tiles of stations and boundaries for Ukraine Energy Dashboard.
+
+Tiles are served from ``/tiles/<layer>/<z>/<x>/<y>.pbf`` and drawn by the browser's map as
+``mapbox.layers``, so panning and zooming over them never serialises features in Python. Each
+layer keeps its geometries in web mercator together with an STRtree; a tile is one tree query,
+a clip to the (buffered) tile square and an MVT encoding. Encoded tiles are cached on disk under
+a key of the source data files, and can be pre-seeded with::
+
+    python -m components.tiles seed --zooms 4-12
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import mapbox_vector_tile
+import numpy as np
+import shapely
+
+from components.data_provider import (
+    DEFAULT_DATA_DIR,
+    OBLASTS_FILE,
+    OUTER_UKRAINE_FILE,
+    STATIONS_FILE,
+    DashboardData,
+    load_dashboard_data,
+)
+from components.geo_cache import DEFAULT_CACHE_DIR, file_digest
+from components.mercator import WORLD_HALF, mercator_metres
+from components.utils import SUBSTATION_COLOR
+
+logger = logging.getLogger(__name__)
+
+# Bump when the tile contents change so that existing disk caches are not served
+TILE_FORMAT_VERSION = 1
+
+DEFAULT_TILE_CACHE_DIR = DEFAULT_CACHE_DIR / "tiles"
+
+TILE_LAYERS = ("stations", "oblasts", "country")
+
+# MVT coordinate resolution per tile edge, and the margin drawn around it (in the same units)
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+# Zoom levels pre-rendered by the seed command and served by the endpoint
+DEFAULT_SEED_ZOOMS = range(4, 13)
+MIN_TILE_ZOOM = 0
+MAX_TILE_ZOOM = 16
+
+# Below this zoom stations are encoded as points, at and above it as their polygons
+STATION_POLYGON_MIN_ZOOM = 12
+
+# Point features of a tile are thinned to one per cell of this grid (one per screen pixel)
+POINT_GRID = 256
+
+MVT_MIMETYPE = "application/vnd.mapbox-vector-tile"
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """
+    Return the web mercator bounds of an XYZ tile.
+
+    Args:
+        z: Zoom level
+        x: Tile column (0 at the antimeridian, increasing eastwards)
+        y: Tile row (0 at the north edge, increasing southwards)
+
+    Returns:
+        Tuple of (minx, miny, maxx, maxy) in metres (EPSG:3857)
+
+    """
+    size = 2 * WORLD_HALF / 2**z
+    minx = -WORLD_HALF + x * size
+    maxy = WORLD_HALF - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def tiles_covering(bounds: tuple[float, float, float, float], z: int) -> Iterator[tuple[int, int]]:
+    """
+    Enumerate the tiles of a zoom level intersecting web mercator bounds.
+
+    Args:
+        bounds: Tuple of (minx, miny, maxx, maxy) in metres
+        z: Zoom level
+
+    Yields:
+        (x, y) tile coordinates
+
+    """
+    size = 2 * WORLD_HALF / 2**z
+    last = 2**z - 1
+    x0 = min(max(int((bounds[0] + WORLD_HALF) // size), 0), last)
+    x1 = min(max(int((bounds[2] + WORLD_HALF) // size), 0), last)
+    y0 = min(max(int((WORLD_HALF - bounds[3]) // size), 0), last)
+    y1 = min(max(int((WORLD_HALF - bounds[1]) // size), 0), last)
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield x, y
+
+
+def dataset_version(data_dir: str | os.PathLike = DEFAULT_DATA_DIR) -> str:
+    """
+    Key of the tile cache: changes whenever one of the source files (or the tile format) changes.
+
+    Args:
+        data_dir: Directory containing the GeoJSON assets
+
+    Returns:
+        Hex digest string
+
+    """
+    data_dir = Path(data_dir)
+    digests = [file_digest(data_dir / name) for name in (STATIONS_FILE, OBLASTS_FILE, OUTER_UKRAINE_FILE)]
+    return hashlib.sha256("|".join([*digests, str(TILE_FORMAT_VERSION)]).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class TileLayer:
+    """Web mercator geometries of one layer, their STRtree and the feature properties."""
+
+    geometries: np.ndarray
+    tree: shapely.STRtree
+    properties: dict[str, np.ndarray]  # property name -> value per feature
+    points: np.ndarray | None = None  # marker points used below STATION_POLYGON_MIN_ZOOM
+
+
+def _tile_layer(
+    geometries: np.ndarray, properties: dict[str, np.ndarray], points: np.ndarray | None = None
+) -> TileLayer:
+    """Build a layer from EPSG:4326 geometries (and marker points), projecting them to web mercator."""
+    geometries = _to_mercator(geometries)
+    points = _to_mercator(points) if points is not None else None
+    # stations are found through their points at low zoom, so the tree holds both like the selection index
+    tree = shapely.STRtree(np.concatenate([geometries, points]) if points is not None else geometries)
+    return TileLayer(geometries=geometries, tree=tree, properties=properties, points=points)
+
+
+def _to_mercator(geometries: np.ndarray) -> np.ndarray:
+    """Project an array of EPSG:4326 geometries to web mercator."""
+    return shapely.transform(geometries, lambda coords: np.column_stack(mercator_metres(coords[:, 0], coords[:, 1])))
+
+
+@dataclass(frozen=True)
+class TileSource:
+    """All tile layers of one loaded dataset."""
+
+    layers: dict[str, TileLayer]
+    version: str
+
+    def render(self, layer: str, z: int, x: int, y: int) -> bytes:
+        """
+        Encode one tile of a layer.
+
+        Args:
+            layer: Name of the layer (see TILE_LAYERS)
+            z: Zoom level
+            x: Tile column
+            y: Tile row
+
+        Returns:
+            MVT-encoded tile (an empty tile when no feature intersects it)
+
+        """
+        tile_layer = self.layers[layer]
+        minx, miny, maxx, maxy = tile_bounds(z, x, y)
+        buffer = (maxx - minx) * TILE_BUFFER / TILE_EXTENT
+        box = (minx - buffer, miny - buffer, maxx + buffer, maxy + buffer)
+
+        size = len(tile_layer.geometries)
+        hits = np.unique(tile_layer.tree.query(shapely.box(*box)) % size)
+        if tile_layer.points is not None and z < STATION_POLYGON_MIN_ZOOM:
+            hits, geometries = _thin_points(tile_layer.points, hits, box)
+        else:
+            geometries = shapely.clip_by_rect(tile_layer.geometries[hits], *box)
+            # outlines are simplified to the tile resolution, so low-zoom tiles stay small
+            geometries = shapely.simplify(geometries, (maxx - minx) / TILE_EXTENT)
+            keep = ~shapely.is_empty(geometries)
+            hits, geometries = hits[keep], geometries[keep]
+
+        features = [
+            {"geometry": geometry, "properties": _feature_properties(tile_layer.properties, hit)}
+            for hit, geometry in zip(hits, geometries, strict=True)
+        ]
+        return mapbox_vector_tile.encode(
+            [{"name": layer, "features": features}],
+            default_options={"quantize_bounds": (minx, miny, maxx, maxy), "extents": TILE_EXTENT},
+        )
+
+
+def _thin_points(
+    points: np.ndarray, hits: np.ndarray, box: tuple[float, float, float, float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Keep the points inside the box, at most one per POINT_GRID cell (the first in row order)."""
+    x, y = shapely.get_x(points[hits]), shapely.get_y(points[hits])
+    inside = (x >= box[0]) & (x <= box[2]) & (y >= box[1]) & (y <= box[3])
+    hits, x, y = hits[inside], x[inside], y[inside]
+    cell = (box[2] - box[0]) / POINT_GRID
+    keys = np.floor((x - box[0]) / cell).astype(np.int64) * (POINT_GRID + 1) + np.floor((y - box[1]) / cell)
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+    return hits[first], points[hits[first]]
+
+
+def _feature_properties(properties: dict[str, np.ndarray], position: int) -> dict[str, Any]:
+    """Properties of one feature, without missing values (MVT has no null)."""
+    values = {}
+    for name, column in properties.items():
+        value = column[position]
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            continue
+        values[name] = value.item() if isinstance(value, np.generic) else value
+    return values
+
+
+def build_tile_source(data: DashboardData, version: str) -> TileSource:
+    """
+    Prepare the tile layers of a loaded dataset.
+
+    Args:
+        data: Loaded DashboardData
+        version: Dataset key used for the disk cache (see dataset_version)
+
+    Returns:
+        TileSource
+
+    """
+    store = data.station_store
+    stations_df = data.stations_df
+    station_properties = {
+        "id": np.asarray(store.index),
+        "category": np.asarray(store.category, dtype=np.int64),
+        "color": np.asarray(store.color, dtype=object),
+    }
+    for column in ("name", "power"):
+        if column in stations_df.columns:
+            station_properties[column] = stations_df[column].to_numpy(dtype=object)
+    station_points = shapely.points(store.lon, store.lat)
+
+    oblasts = data.oblast_registry.oblasts
+    return TileSource(
+        layers={
+            "stations": _tile_layer(stations_df.geometry.to_numpy(), station_properties, station_points),
+            "oblasts": _tile_layer(
+                shapely.boundary(np.array([oblast.geometry for oblast in oblasts.values()])),
+                {"name": np.array(list(oblasts), dtype=object)},
+            ),
+            "country": _tile_layer(
+                np.array([data.outer_ukraine.geometry.union_all().boundary]), {"name": np.array(["Ukraine"])}
+            ),
+        },
+        version=version,
+    )
+
+
+def data_bounds(source: TileSource) -> tuple[float, float, float, float]:
+    """Web mercator bounds of all features of a tile source."""
+    return tuple(shapely.total_bounds(np.concatenate([layer.geometries for layer in source.layers.values()])))
+
+
+class TileCache:
+    """Renders tiles of the current dataset and keeps the encoded tiles on disk."""
+
+    def __init__(self, cache_dir: str | os.PathLike | None = DEFAULT_TILE_CACHE_DIR) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._source: TileSource | None = None
+        self._data: DashboardData | None = None
+        self._lock = threading.Lock()
+
+    def source(self, data: DashboardData, data_dir: str | os.PathLike) -> TileSource:
+        """
+        Return the tile source of a dataset, building it on first use (and after a reload).
+
+        Args:
+            data: Loaded DashboardData
+            data_dir: Directory the data was loaded from (keys the disk cache)
+
+        Returns:
+            TileSource
+
+        """
+        with self._lock:
+            if self._data is not data:
+                self._source = build_tile_source(data, dataset_version(data_dir))
+                self._data = data
+            return self._source
+
+    def reset(self) -> None:
+        """Forget the tile source, e.g. after the data was reloaded."""
+        with self._lock:
+            self._source = None
+            self._data = None
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Return cache statistics (disk hits and rendered misses since start).
+
+        Returns:
+            Dictionary with hits, misses and hit_ratio
+
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+    def path(self, source: TileSource, layer: str, z: int, x: int, y: int) -> Path | None:
+        """Disk location of a tile, or None when the disk cache is disabled."""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / source.version[:16] / layer / str(z) / str(x) / f"{y}.pbf"
+
+    def get(self, source: TileSource, layer: str, z: int, x: int, y: int) -> bytes:
+        """
+        Return an encoded tile from the disk cache, rendering and storing it on a miss.
+
+        Args:
+            source: TileSource of the current dataset
+            layer: Name of the layer
+            z: Zoom level
+            x: Tile column
+            y: Tile row
+
+        Returns:
+            MVT-encoded tile
+
+        """
+        path = self.path(source, layer, z, x, y)
+        if path is not None and path.exists():
+            self.hits += 1
+            return path.read_bytes()
+        self.misses += 1
+        tile = source.render(layer, z, x, y)
+        if path is not None:
+            _write_tile(path, tile)
+        return tile
+
+    def seed(
+        self, source: TileSource, zooms: Iterable[int] = DEFAULT_SEED_ZOOMS, layers: Sequence[str] = TILE_LAYERS
+    ) -> int:
+        """
+        Render all tiles covering the data for the given zooms into the disk cache.
+
+        Args:
+            source: TileSource of the current dataset
+            zooms: Zoom levels to seed
+            layers: Layers to seed
+
+        Returns:
+            Number of tiles written (tiles already cached are skipped)
+
+        """
+        bounds = data_bounds(source)
+        written = 0
+        for z in zooms:
+            for x, y in tiles_covering(bounds, z):
+                for layer in layers:
+                    path = self.path(source, layer, z, x, y)
+                    if path is None or path.exists():
+                        continue
+                    _write_tile(path, source.render(layer, z, x, y))
+                    written += 1
+            logger.info("Seeded zoom %d (%d tiles written so far)", z, written)
+        return written
+
+
+def _write_tile(path: Path, tile: bytes) -> None:
+    """Write a tile atomically, so concurrent readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(tile)
+        os.replace(tmp, path)
+    except OSError:
+        logger.warning("Could not write tile cache file %s", path, exc_info=True)
+        Path(tmp).unlink(missing_ok=True)
+
+
+def vector_tile_layers(url_prefix: str) -> list[dict[str, Any]]:
+    """
+    Mapbox layers drawing the country border, oblast outlines and station dots from the tile endpoint.
+
+    Args:
+        url_prefix: Absolute URL of the tile endpoint, e.g. 'https://host/tiles'
+
+    Returns:
+        List of ``layout.mapbox.layers`` entries (drawn below the figure traces)
+
+    """
+
+    def _source(layer: str) -> list[str]:
+        return [f"{url_prefix}/{layer}/{{z}}/{{x}}/{{y}}.pbf"]
+
+    return [
+        {
+            "sourcetype": "vector",
+            "source": _source("country"),
+            "sourcelayer": "country",
+            "type": "line",
+            "color": "black",
+            "line": {"width": 1.5},
+            "below": "traces",
+        },
+        {
+            "sourcetype": "vector",
+            "source": _source("oblasts"),
+            "sourcelayer": "oblasts",
+            "type": "line",
+            "color": "rgba(0,0,0,0.5)",
+            "line": {"width": 0.8},
+            "below": "traces",
+        },
+        {
+            "sourcetype": "vector",
+            "source": _source("stations"),
+            "sourcelayer": "stations",
+            "type": "circle",
+            "color": SUBSTATION_COLOR,
+            "circle": {"radius": 2},
+            "opacity": 0.6,
+            "below": "traces",
+        },
+    ]
+
+
+def _parse_zooms(value: str) -> range:
+    """Parse a zoom range such as '4-12' or '7'."""
+    first, _, last = value.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command line entry point: ``python -m components.tiles seed``."""
+    parser = argparse.ArgumentParser(description="Vector tiles of the Ukraine Energy Dashboard")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    seed = subparsers.add_parser("seed", help="pre-render tiles into the disk cache")
+    seed.add_argument("--zooms", type=_parse_zooms, default=DEFAULT_SEED_ZOOMS, help="zoom range, e.g. 4-12")
+    seed.add_argument("--layers", nargs="+", choices=TILE_LAYERS, default=list(TILE_LAYERS))
+    seed.add_argument("--data-dir", default=os.getenv("DATA_DIR", str(DEFAULT_DATA_DIR)))
+    seed.add_argument("--cache-dir", default=os.getenv("TILE_CACHE_DIR", str(DEFAULT_TILE_CACHE_DIR)))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    data = load_dashboard_data(args.data_dir, os.getenv("GEO_CACHE_DIR", str(DEFAULT_CACHE_DIR)) or None)
+    cache = TileCache(args.cache_dir)
+    written = cache.seed(cache.source(data, args.data_dir), args.zooms, args.layers)
+    logger.info("Seeded %d tiles into %s", written, args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
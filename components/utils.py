@@ -5,14 +5,23 @@ This module provides utility functions for map visualization, data processing,
 and UI component generation for the Ukraine Energy Dashboard.
 """
 
+from collections.abc import Hashable, Iterable, Sequence
+from dataclasses import dataclass, field
 from typing import Any
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import shapely
 from dash import dcc, html
 from matplotlib import colors as mcolors
 from shapely.geometry import MultiPolygon, Point, Polygon
+from shapely.geometry.base import BaseGeometry
+
+from components.boundaries import COUNTRY_KEY, BoundaryPyramid
+from components.fuels import FuelMatrix, build_fuel_matrix
+from components.oblasts import OblastRegistry, build_oblast_registry
 
 power_source_colors = {
     # Renewables
@@ -60,7 +69,179 @@ def hex_to_rgba(hex_color: str, alpha: float = 0.25) -> str:
     return f"rgba({r},{g},{b},{alpha})"
 
 
-def add_station_markers(fig: go.Figure, stations_df: gpd.GeoDataFrame, show_legend: bool = False) -> None:
+# Legend traces for plants (one per fuel), in display order
+plant_legend_categories = {
+    # Renewables
+    "solar": "Solar",
+    "wind": "Wind",
+    "hydro": "Hydro",
+    "biogas": "Biogas",
+    "biomass": "Biomass",
+    "wood": "Wood",
+    "waste": "Waste",
+    # Nuclear
+    "nuclear": "Nuclear",
+    # Fossil fuels
+    "coal": "Coal",
+    "gas": "Gas",
+    "oil": "Oil",
+    "diesel": "Diesel",
+    "mazut": "Mazut",
+}
+
+# Category codes stored per station: 0..12 single fuels, then mixed/other plants, then substations
+MIXED_CATEGORY = len(plant_legend_categories)
+SUBSTATION_CATEGORY = MIXED_CATEGORY + 1
+NO_CATEGORY = -1
+
+PLANT_FALLBACK_COLOR = "#6a3d9a"
+SUBSTATION_COLOR = "#382b2b"
+
+UKRAINE_CENTER = {"lat": 48.3794, "lon": 31.1656}
+
+# Fixed trace layout of the legend map figures, so callbacks can patch traces by index
+OUTLINE_TRACE_INDEX = 0
+MARKER_TRACE_OFFSET = 1
+HIGHLIGHT_TRACE_INDEX = MARKER_TRACE_OFFSET + SUBSTATION_CATEGORY + 1
+CLUSTER_TRACE_INDEX = HIGHLIGHT_TRACE_INDEX + 1
+
+
+@dataclass(frozen=True)
+class StationStore:
+    """
+    Columnar view of the stations GeoDataFrame used for building marker traces.
+
+    All arrays are aligned by position; ``index`` holds the original DataFrame index labels
+    that are sent to the browser as ``customdata``. Marker colours are stored as codes into
+    ``palette``, so traces can send one small integer per station with a discrete colorscale.
+    """
+
+    index: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    color_code: np.ndarray
+    palette: tuple[str, ...]
+    hovertext: np.ndarray
+    category: np.ndarray
+    oblast: np.ndarray
+    _positions: pd.Index = field(repr=False)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def color(self) -> np.ndarray:
+        """Hex marker colour of every station."""
+        return np.asarray(self.palette, dtype=object)[self.color_code]
+
+    def all_rows(self) -> np.ndarray:
+        """Return the positions of every station in the store."""
+        return np.arange(len(self), dtype=np.intp)
+
+    def rows_for(self, labels: pd.Index) -> np.ndarray:
+        """
+        Translate DataFrame index labels to store positions.
+
+        Args:
+            labels: Index labels of (a subset of) the stations GeoDataFrame
+
+        Returns:
+            Array of store positions, labels unknown to the store are dropped
+
+        """
+        positions = self._positions.get_indexer(labels)
+        return positions[positions >= 0]
+
+
+def build_station_store(stations_df: gpd.GeoDataFrame, fuels: FuelMatrix | None = None) -> StationStore:
+    """
+    Precompute marker arrays (centroid coordinates, colours, hover text, categories) for all stations.
+
+    Args:
+        stations_df: GeoDataFrame containing station data with geometry and attributes
+        fuels: Prebuilt FuelMatrix for ``stations_df``; built on the fly when omitted
+
+    Returns:
+        StationStore with one entry per station, in the order of ``stations_df``
+
+    """
+    n = len(stations_df)
+    centroids = shapely.centroid(np.asarray(stations_df.geometry.values))
+    power = stations_df["power"].to_numpy() if "power" in stations_df.columns else np.full(n, None)
+    sources = stations_df["plant:source"] if "plant:source" in stations_df.columns else pd.Series([None] * n)
+    names = stations_df["station_name_en"] if "station_name_en" in stations_df.columns else pd.Series([None] * n)
+    oblasts = stations_df["oblast_name_en"] if "oblast_name_en" in stations_df.columns else pd.Series([None] * n)
+    fuels = fuels if fuels is not None else build_fuel_matrix(stations_df)
+
+    is_plant = power == "plant"
+    is_substation = power == "substation"
+
+    # Plants: legend trace of their single fuel; several or unknown fuels fall into the "Mixed/Other" bucket
+    legend_fuels = list(plant_legend_categories)
+    # trailing -1 so that single_fuel()'s -1 (no or several fuels) maps to "no legend fuel"
+    legend_code = np.array([legend_fuels.index(fuel) if fuel in legend_fuels else -1 for fuel in fuels.fuels] + [-1])
+    fuel_codes = legend_code[fuels.single_fuel()]
+    category = np.full(n, NO_CATEGORY, dtype=np.int8)
+    category[is_plant] = np.where(fuel_codes[is_plant] >= 0, fuel_codes[is_plant], MIXED_CATEGORY)
+    category[is_substation] = SUBSTATION_CATEGORY
+
+    # single-fuel plants take their legend colour, fuel combinations their own shade where defined
+    legend_colors = np.array([color for _, color in _legend_entries()], dtype=object)
+    color = pd.Series(sources.to_numpy()).map(power_source_colors).fillna(PLANT_FALLBACK_COLOR).to_numpy(dtype=object)
+    single = is_plant & (category < MIXED_CATEGORY)
+    color[single] = legend_colors[category[single]]
+    color[is_substation] = SUBSTATION_COLOR
+    palette, color_code = np.unique(color.astype(str), return_inverse=True)
+
+    return StationStore(
+        index=stations_df.index.to_numpy(),
+        lat=shapely.get_y(centroids),
+        lon=shapely.get_x(centroids),
+        color_code=color_code.astype(np.uint8 if len(palette) <= 256 else np.int32),
+        palette=tuple(palette.tolist()),
+        hovertext=pd.Series(names.to_numpy(), dtype=object).fillna("Unknown").to_numpy(dtype=object),
+        category=category,
+        oblast=oblasts.to_numpy(dtype=object),
+        _positions=pd.Index(stations_df.index),
+    )
+
+
+def _marker_trace(
+    store: StationStore, rows: np.ndarray, name: str, marker: dict[str, Any], **kwargs: object
+) -> go.Scattermapbox:
+    """Build a Scattermapbox marker trace from a slice of the station store."""
+    return go.Scattermapbox(
+        lat=store.lat[rows],
+        lon=store.lon[rows],
+        mode="markers",
+        marker=marker,
+        customdata=store.index[rows],
+        hoverinfo="text",
+        hovertext=store.hovertext[rows],
+        name=name,
+        **kwargs,
+    )
+
+
+def _resolve_rows(
+    stations_df: gpd.GeoDataFrame, store: StationStore | None, rows: np.ndarray | None
+) -> tuple[StationStore, np.ndarray]:
+    """Return the store to draw from and the store positions to draw."""
+    if store is None:
+        store = build_station_store(stations_df)
+        return store, store.all_rows() if rows is None else rows
+    if rows is None:
+        rows = store.rows_for(stations_df.index)
+    return store, rows
+
+
+def add_station_markers(
+    fig: go.Figure,
+    stations_df: gpd.GeoDataFrame,
+    show_legend: bool = False,
+    store: StationStore | None = None,
+    rows: np.ndarray | None = None,
+) -> go.Figure:
     """
     Add plants and substations to the map as separate traces.
 
@@ -68,249 +249,244 @@ def add_station_markers(fig: go.Figure, stations_df: gpd.GeoDataFrame, show_lege
         fig: Plotly figure object to add markers to
         stations_df: GeoDataFrame containing station data with geometry and attributes
         show_legend: Whether to show legend with separate traces for each power source
+        store: Precomputed StationStore covering ``stations_df``; built on the fly when omitted
+        rows: Store positions to draw (e.g. from a FilterIndex); defaults to the rows of ``stations_df``
+
+    Returns:
+        The figure with marker traces added
 
     """
+    store, rows = _resolve_rows(stations_df, store, rows)
+
     if show_legend:
         # Create separate traces for each power source for elegant legend
-        _add_station_markers_with_legend(fig, stations_df)
+        _add_station_markers_with_legend(fig, store, rows)
     else:
         # Original implementation - single trace per power type
-        _add_station_markers_single_trace(fig, stations_df)
+        _add_station_markers_single_trace(fig, store, rows)
 
     return fig
 
 
-def _add_station_markers_single_trace(fig: go.Figure, stations_df: gpd.GeoDataFrame) -> None:
+def _add_station_markers_single_trace(fig: go.Figure, store: StationStore, rows: np.ndarray) -> None:
     """Original implementation with single trace per power type."""
-    # Plants
-    plants_df = stations_df[stations_df["power"] == "plant"]
-    if not plants_df.empty:
-        lats, lons, colors, indices, hovertexts = [], [], [], [], []
-
-        for idx, row in plants_df.iterrows():
-            geom = row.geometry
-            lat, lon = (geom.centroid.y, geom.centroid.x) if not isinstance(geom, Point) else (geom.y, geom.x)
-            source = row.get("plant:source", "Other")
-            color = power_source_colors.get(source, "#6a3d9a")
-
-            lats.append(lat)
-            lons.append(lon)
-            colors.append(color)
-            indices.append(idx)
-            hovertexts.append(row.get("station_name_en", "Unknown"))
+    category = store.category[rows]
 
+    # Plants
+    plant_rows = rows[(category >= 0) & (category < SUBSTATION_CATEGORY)]
+    if plant_rows.size:
         fig.add_trace(
-            go.Scattermapbox(
-                lat=lats,
-                lon=lons,
-                mode="markers",
-                marker={"size": 8, "color": colors, "symbol": "circle"},
-                customdata=indices,
-                hoverinfo="text",
-                hovertext=hovertexts,
-                name="Plants",
+            _marker_trace(
+                store,
+                plant_rows,
+                "Plants",
+                {"size": 8, **indexed_colors(store.color_code[plant_rows], store.palette), "symbol": "circle"},
                 showlegend=False,
             )
         )
 
     # Substations
-    subs_df = stations_df[stations_df["power"] == "substation"]
-    if not subs_df.empty:
-        lats, lons, hovertexts = [], [], []
-        for _, row in subs_df.iterrows():
-            geom = row.geometry
-            # use centroid for polygon or point
-            lat, lon = (geom.centroid.y, geom.centroid.x) if not geom.geom_type == "Point" else (geom.y, geom.x)
-            lats.append(lat)
-            lons.append(lon)
-            hovertexts.append(row.get("station_name_en", "Unknown"))
-
+    sub_rows = rows[category == SUBSTATION_CATEGORY]
+    if sub_rows.size:
         fig.add_trace(
-            go.Scattermapbox(
-                lat=lats,
-                lon=lons,
-                mode="markers",
-                marker={
+            _marker_trace(
+                store,
+                sub_rows,
+                "Substations",
+                {
                     "size": 6,
-                    "color": "#382b2b",  # fill
+                    "color": SUBSTATION_COLOR,  # fill
                     "symbol": "circle",  # only symbol that supports color/size
                 },
-                text=hovertexts,
-                hovertext=hovertexts,
-                hoverinfo="text",
-                customdata=subs_df.index,
-                name="Substations",
                 showlegend=False,
             )
         )
 
 
-def _add_station_markers_with_legend(fig: go.Figure, stations_df: gpd.GeoDataFrame) -> None:
-    """Create separate traces for each power source for elegant legend."""
-    # Define power source categories with display names
-    power_source_categories = {
-        # Renewables
-        "solar": "Solar",
-        "wind": "Wind",
-        "hydro": "Hydro",
-        "biogas": "Biogas",
-        "biomass": "Biomass",
-        "wood": "Wood",
-        "waste": "Waste",
-        # Nuclear
-        "nuclear": "Nuclear",
-        # Fossil fuels
-        "coal": "Coal",
-        "gas": "Gas",
-        "oil": "Oil",
-        "diesel": "Diesel",
-        "mazut": "Mazut",
-    }
+def _legend_entries() -> list[tuple[str, str]]:
+    """Return (display name, colour) for every plant legend trace, in category code order."""
+    return [
+        *(
+            (name, power_source_colors.get(source, PLANT_FALLBACK_COLOR))
+            for source, name in plant_legend_categories.items()
+        ),
+        ("Mixed/Other", PLANT_FALLBACK_COLOR),
+    ]
 
-    # Plants - group by power source
-    plants_df = stations_df[stations_df["power"] == "plant"]
-    if not plants_df.empty:
-        # Group stations by power source
-        for source, display_name in power_source_categories.items():
-            source_plants = plants_df[plants_df["plant:source"] == source]
-            if source_plants.empty:
-                continue
-
-            lats, lons, indices, hovertexts = [], [], [], []
-
-            for idx, row in source_plants.iterrows():
-                geom = row.geometry
-                lat, lon = (geom.centroid.y, geom.centroid.x) if not isinstance(geom, Point) else (geom.y, geom.x)
-
-                lats.append(lat)
-                lons.append(lon)
-                indices.append(idx)
-                hovertexts.append(row.get("station_name_en", "Unknown"))
-
-            # Get color for this source
-            color = power_source_colors.get(source, "#6a3d9a")
-
-            fig.add_trace(
-                go.Scattermapbox(
-                    lat=lats,
-                    lon=lons,
-                    mode="markers",
-                    marker={"size": 8, "color": color, "symbol": "circle"},
-                    customdata=indices,
-                    hoverinfo="text",
-                    hovertext=hovertexts,
-                    name=display_name,
-                    showlegend=True,
-                    legendgroup="plants",
-                )
-            )
 
-        # Handle mixed and other sources
-        mixed_plants = plants_df[~plants_df["plant:source"].isin(power_source_categories.keys())]
-        if not mixed_plants.empty:
-            lats, lons, indices, hovertexts = [], [], [], []
-
-            for idx, row in mixed_plants.iterrows():
-                geom = row.geometry
-                lat, lon = (geom.centroid.y, geom.centroid.x) if not isinstance(geom, Point) else (geom.y, geom.x)
-
-                lats.append(lat)
-                lons.append(lon)
-                indices.append(idx)
-                hovertexts.append(row.get("station_name_en", "Unknown"))
-
-            fig.add_trace(
-                go.Scattermapbox(
-                    lat=lats,
-                    lon=lons,
-                    mode="markers",
-                    marker={"size": 8, "color": "#6a3d9a", "symbol": "circle"},
-                    customdata=indices,
-                    hoverinfo="text",
-                    hovertext=hovertexts,
-                    name="Mixed/Other",
-                    showlegend=True,
-                    legendgroup="plants",
-                )
-            )
+def indexed_colors(codes: np.ndarray, palette: Sequence[str]) -> dict[str, Any]:
+    """
+    Marker colour properties drawing integer codes in the colours of a palette.
 
-    # Substations - single trace
-    subs_df = stations_df[stations_df["power"] == "substation"]
-    if not subs_df.empty:
-        lats, lons, hovertexts = [], [], []
-        for _, row in subs_df.iterrows():
-            geom = row.geometry
-            # use centroid for polygon or point
-            lat, lon = (geom.centroid.y, geom.centroid.x) if not geom.geom_type == "Point" else (geom.y, geom.x)
-            lats.append(lat)
-            lons.append(lon)
-            hovertexts.append(row.get("station_name_en", "Unknown"))
+    Args:
+        codes: Palette position of every point
+        palette: Hex colours
+
+    Returns:
+        Dictionary with color (the codes), a stepped colorscale, cmin, cmax and showscale
+
+    """
+    n = max(len(palette), 1)
+    # one flat band per colour; code i sits in the middle of band i with cmin/cmax at the band edges
+    colorscale = [[bound / n, color] for i, color in enumerate(palette) for bound in (i, i + 1)]
+    return {"color": codes, "colorscale": colorscale, "cmin": -0.5, "cmax": n - 0.5, "showscale": False}
+
+
+def category_colors() -> list[str]:
+    """Return the marker colour of every category code (plant legend traces, then substations)."""
+    return [color for _, color in _legend_entries()] + [SUBSTATION_COLOR]
+
+
+def category_labels() -> list[str]:
+    """Return the legend name of every category code (plant legend traces, then substations)."""
+    return [name for name, _ in _legend_entries()] + ["Substations"]
+
+
+def marker_trace_data(store: StationStore, rows: np.ndarray) -> list[dict[str, Any]]:
+    """
+    Split store rows into the data arrays of the legend marker traces.
+
+    The result has one entry per legend trace (plant categories, then substations), always in the
+    same order, so it can be used both to build the traces and to patch them in place.
+
+    Args:
+        store: StationStore to read marker arrays from
+        rows: Store positions of the stations to draw
 
+    Returns:
+        List of trace property dicts (lat, lon, customdata, hovertext, visible)
+
+    """
+    # group rows by category with one stable sort instead of one mask per category
+    rows = rows[np.argsort(store.category[rows], kind="stable")]
+    bounds = np.searchsorted(store.category[rows], np.arange(SUBSTATION_CATEGORY + 2))
+
+    data = []
+    for code in range(SUBSTATION_CATEGORY + 1):
+        code_rows = rows[bounds[code] : bounds[code + 1]]
+        data.append(
+            {
+                "lat": store.lat[code_rows],
+                "lon": store.lon[code_rows],
+                "customdata": store.index[code_rows],
+                "hovertext": store.hovertext[code_rows],
+                # empty traces are hidden so they do not show up in the legend
+                "visible": bool(code_rows.size),
+            }
+        )
+    return data
+
+
+def _add_station_markers_with_legend(fig: go.Figure, store: StationStore, rows: np.ndarray) -> None:
+    """Create separate traces for each power source for elegant legend (one trace per category, always)."""
+    trace_data = marker_trace_data(store, rows)
+
+    # Plants - one trace per power source, then mixed and other sources
+    for (display_name, color), data in zip(_legend_entries(), trace_data[:SUBSTATION_CATEGORY], strict=True):
         fig.add_trace(
             go.Scattermapbox(
-                lat=lats,
-                lon=lons,
                 mode="markers",
-                marker={
-                    "size": 6,
-                    "color": "#382b2b",  # fill
-                    "symbol": "circle",  # only symbol that supports color/size
-                },
-                text=hovertexts,
-                hovertext=hovertexts,
+                marker={"size": 8, "color": color, "symbol": "circle"},
                 hoverinfo="text",
-                customdata=subs_df.index,
-                name="Substations",
+                name=display_name,
                 showlegend=True,
-                legendgroup="substations",
+                legendgroup="plants",
+                **data,
             )
         )
 
+    # Substations - single trace
+    fig.add_trace(
+        go.Scattermapbox(
+            mode="markers",
+            marker={
+                "size": 6,
+                "color": SUBSTATION_COLOR,  # fill
+                "symbol": "circle",  # only symbol that supports color/size
+            },
+            hoverinfo="text",
+            name="Substations",
+            showlegend=True,
+            legendgroup="substations",
+            **trace_data[SUBSTATION_CATEGORY],
+        )
+    )
 
-# Default map
-def default_map_figure(stations_df: gpd.GeoDataFrame, outer_ukraine: gpd.GeoDataFrame | None = None) -> go.Figure:
+
+def _ring_coordinates(geometries: Iterable[BaseGeometry]) -> tuple[list[float | None], list[float | None]]:
+    """Concatenate the exterior rings of (multi)polygons into None-separated lat/lon lists."""
+    lats: list[float | None] = []
+    lons: list[float | None] = []
+    for geom in geometries:
+        if geom is None or geom.is_empty or not isinstance(geom, Polygon | MultiPolygon):
+            continue
+        polygons = [geom] if isinstance(geom, Polygon) else geom.geoms
+        for poly in polygons:
+            x, y = poly.exterior.xy
+            lats.extend([*y, None])
+            lons.extend([*x, None])
+    return lats, lons
+
+
+def _outline_coordinates(
+    geometries: Iterable[BaseGeometry], boundaries: BoundaryPyramid | None, key: Hashable, zoom: float
+) -> tuple[list[float | None], list[float | None]]:
+    """Outline rings from the boundary pyramid level matching ``zoom``, or at full resolution without one."""
+    if boundaries is not None:
+        return boundaries.outline(key, zoom)
+    return _ring_coordinates(geometries)
+
+
+def _outline_trace(lats: list[float | None], lons: list[float | None]) -> go.Scattermapbox:
+    """Single line trace with the None-separated outlines of the country or an oblast."""
+    return go.Scattermapbox(
+        lat=lats,
+        lon=lons,
+        mode="lines",
+        line={"width": 1, "color": "black"},
+        hoverinfo="none",
+        showlegend=False,
+    )
+
+
+def highlight_trace_data(geom: BaseGeometry | None, color: str = SUBSTATION_COLOR) -> dict[str, Any]:
     """
-    Default whole-Ukraine view with all stations (single trace).
+    Trace properties of the highlight polygon drawn around a clicked station.
 
     Args:
-        stations_df: GeoDataFrame containing station data
-        outer_ukraine: Optional GeoDataFrame containing Ukraine border geometry
+        geom: Station geometry; points and lines produce an empty highlight
+        color: Hex colour of the station's power source
 
     Returns:
-        Plotly figure object with default map view
+        Dictionary with lat, lon, fillcolor and line of the highlight trace
 
     """
-    fig = go.Figure()
+    lats, lons = _ring_coordinates([geom])
+    return {"lat": lats, "lon": lons, "fillcolor": hex_to_rgba(color, 0.25), "line": {"width": 2, "color": color}}
+
+
+def station_color(station_row: pd.Series) -> str:
+    """Return the power source colour used to highlight a station."""
+    source = station_row.get("plant:source") or station_row.get("power_source") or "Other"
+    return power_source_colors.get(source, SUBSTATION_COLOR)
+
+
+def station_center(geom: BaseGeometry) -> dict[str, float]:
+    """Return the mapbox center (centroid for polygons) of a station geometry."""
+    if isinstance(geom, Point):
+        return {"lat": geom.y, "lon": geom.x}
+    c = geom.centroid
+    return {"lat": c.y, "lon": c.x}
+
 
-    # lightweight Ukraine border (can be combined further if desired)
-    if outer_ukraine is not None and not outer_ukraine.empty:
-        for _, row in outer_ukraine.iterrows():
-            geom = row.geometry
-            if geom is None or geom.is_empty:
-                continue
-            polygons = [geom] if isinstance(geom, Polygon) else geom.geoms
-            for poly in polygons:
-                x, y = poly.exterior.xy
-                fig.add_trace(
-                    go.Scattermapbox(
-                        lat=list(y),
-                        lon=list(x),
-                        mode="lines",
-                        line={"width": 1, "color": "black"},
-                        hoverinfo="none",
-                        showlegend=False,
-                    )
-                )
-
-    # markers with legend
-    fig = add_station_markers(fig, stations_df, show_legend=True)
-
-    # always set a full mapbox layout so centering works reliably
-    fig.update_layout(
-        mapbox={"style": "carto-positron", "center": {"lat": 48.3794, "lon": 31.1656}, "zoom": 5},
-        margin={"r": 0, "t": 0, "l": 0, "b": 0},
-        showlegend=True,
-        legend=dict(
+def _map_layout(center: dict[str, float], zoom: float) -> dict[str, Any]:
+    """Shared mapbox/legend layout of all map views."""
+    return {
+        # always set a full mapbox layout so centering works reliably
+        "mapbox": {"style": "carto-positron", "center": center, "zoom": zoom},
+        "margin": {"r": 0, "t": 0, "l": 0, "b": 0},
+        "showlegend": True,
+        "legend": dict(
             orientation="v",
             yanchor="top",
             y=0.98,
@@ -321,7 +497,80 @@ def default_map_figure(stations_df: gpd.GeoDataFrame, outer_ukraine: gpd.GeoData
             borderwidth=1,
             font=dict(size=10),
         ),
+    }
+
+
+def _station_map_figure(
+    outline: tuple[list[float | None], list[float | None]],
+    stations_df: gpd.GeoDataFrame,
+    store: StationStore | None,
+    rows: np.ndarray | None,
+    highlight: dict[str, Any] | None = None,
+) -> go.Figure:
+    """
+    Assemble a map figure with the fixed trace layout used for partial updates.
+
+    Trace order: outline (index 0), legend marker traces (MARKER_TRACE_OFFSET onwards), highlight
+    polygon (HIGHLIGHT_TRACE_INDEX), station clusters (CLUSTER_TRACE_INDEX). All traces are always
+    present, possibly empty.
+    """
+    fig = go.Figure()
+    fig.add_trace(_outline_trace(*outline))
+    fig = add_station_markers(fig, stations_df, show_legend=True, store=store, rows=rows)
+    fig.add_trace(
+        go.Scattermapbox(
+            mode="lines",
+            fill="toself",
+            hoverinfo="none",
+            showlegend=False,
+            **(highlight or highlight_trace_data(None)),
+        )
+    )
+    # filled in by level-of-detail rendering when there are too many stations to draw individually
+    fig.add_trace(
+        go.Scattermapbox(
+            lat=[],
+            lon=[],
+            mode="markers",
+            marker={"size": 8, "color": SUBSTATION_COLOR},
+            hoverinfo="text",
+            name="Clusters",
+            showlegend=False,
+            visible=False,
+        )
+    )
+    return fig
+
+
+# Default map
+def default_map_figure(
+    stations_df: gpd.GeoDataFrame,
+    outer_ukraine: gpd.GeoDataFrame | None = None,
+    store: StationStore | None = None,
+    rows: np.ndarray | None = None,
+    boundaries: BoundaryPyramid | None = None,
+) -> go.Figure:
+    """
+    Default whole-Ukraine view with all stations (single trace).
+
+    Args:
+        stations_df: GeoDataFrame containing station data
+        outer_ukraine: Optional GeoDataFrame containing Ukraine border geometry
+        store: Optional precomputed StationStore used to build the marker traces
+        rows: Optional store positions of the stations to draw
+        boundaries: Optional simplified outline pyramid; the border is drawn at full resolution without it
+
+    Returns:
+        Plotly figure object with default map view
+
+    """
+    # lightweight Ukraine border, merged into a single trace
+    zoom = 5
+    outline = _outline_coordinates(
+        outer_ukraine.geometry if outer_ukraine is not None else [], boundaries, COUNTRY_KEY, zoom
     )
+    fig = _station_map_figure(outline, stations_df, store, rows)
+    fig.update_layout(**_map_layout(UKRAINE_CENTER, zoom))
     return fig
 
 
@@ -332,13 +581,17 @@ def generate_map_figure(
     click_data: dict[str, Any] | None = None,
     reset: bool = False,
     outer_ukraine: gpd.GeoDataFrame | None = None,
+    store: StationStore | None = None,
+    rows: np.ndarray | None = None,
+    boundaries: BoundaryPyramid | None = None,
+    oblasts: OblastRegistry | None = None,
 ) -> go.Figure:
     """
     Build Mapbox figure with priority.
 
     1) reset=True → full Ukraine
     2) click_data → zoom to clicked station (even if no oblast)
-    3) selected_oblast → zoom to oblast centroid
+    3) selected_oblast → fit the oblast's bounding box
     4) fallback → full Ukraine.
 
     Args:
@@ -348,128 +601,54 @@ def generate_map_figure(
         click_data: Click event data from map interaction
         reset: Whether to reset to full Ukraine view
         outer_ukraine: Optional GeoDataFrame containing Ukraine border geometry
+        store: Optional precomputed StationStore used to build the marker traces
+        rows: Optional store positions of the stations to draw (already filtered by the caller)
+        boundaries: Optional simplified outline pyramid; outlines are drawn at full resolution without it
+        oblasts: Optional precomputed OblastRegistry; built from ``oblasts_gdf`` on the fly when omitted
 
     Returns:
         Plotly figure object with map visualization
 
     Note:
-        Lasso/box selection is enabled.
+        Lasso/box selection is enabled. All views share the trace layout of ``_station_map_figure``.
 
     """
-    fig = go.Figure()
-
-    # Reset or no selection → full Ukraine
-    if reset or (selected_oblast is None and not click_data):
-        fig = default_map_figure(stations_df, outer_ukraine=outer_ukraine)
+    store, rows = _resolve_rows(stations_df, store, rows)
 
     # ClickData present → zoom to clicked station
-    elif click_data and "points" in click_data and len(click_data["points"]) > 0:
+    if not reset and click_data and "points" in click_data and len(click_data["points"]) > 0:
         point = click_data["points"][0]
         station_index = point.get("customdata")
         if station_index is not None and station_index in stations_df.index:
             station_row = stations_df.loc[station_index]
             geom = station_row.geometry
-            source = station_row.get("plant:source") or station_row.get("power_source") or "Other"
-            color = power_source_colors.get(source, "#382b2b")
-            fill_rgba = hex_to_rgba(color, 0.25)
-
-            # compute centroid for centering
-            if isinstance(geom, Point):
-                lat, lon = geom.y, geom.x
-            else:
-                c = geom.centroid
-                lat, lon = c.y, c.x
 
-            # Add all stations as markers
-            fig = add_station_markers(fig, stations_df, show_legend=True)
-
-            # Zoom to clicked station
-            fig.update_layout(
-                mapbox={"center": {"lat": lat, "lon": lon}, "zoom": 15, "style": "carto-positron"},
-                margin={"r": 0, "t": 0, "l": 0, "b": 0},
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="top",
-                    y=0.98,
-                    xanchor="left",
-                    x=0.01,
-                    bgcolor="rgba(255,255,255,0.9)",
-                    bordercolor="rgba(0,0,0,0.2)",
-                    borderwidth=1,
-                    font=dict(size=10),
-                ),
+            # Add all stations as markers, draw polygon fill if polygonal
+            zoom = 15
+            outline = _outline_coordinates(
+                outer_ukraine.geometry if outer_ukraine is not None else [], boundaries, COUNTRY_KEY, zoom
             )
-
-            # Draw polygon fill if polygonal
-            if isinstance(geom, Polygon | MultiPolygon):
-                polygons = [geom] if isinstance(geom, Polygon) else geom.geoms
-                for poly in polygons:
-                    x, y = poly.exterior.xy
-                    fig.add_trace(
-                        go.Scattermapbox(
-                            lat=list(y),
-                            lon=list(x),
-                            mode="lines",
-                            fill="toself",
-                            fillcolor=fill_rgba,
-                            line={"width": 2, "color": color},
-                            hoverinfo="none",
-                            showlegend=False,
-                        )
-                    )
-            # click zoom has top priority → return early
-            fig.update_layout(dragmode="lasso", hovermode="closest")
+            fig = _station_map_figure(
+                outline, stations_df, store, rows, highlight=highlight_trace_data(geom, station_color(station_row))
+            )
+            # Zoom to clicked station
+            fig.update_layout(**_map_layout(station_center(geom), zoom), dragmode="lasso", hovermode="closest")
             return fig
 
     # selected_oblast → zoom to oblast
-    elif selected_oblast:
-        filtered_oblast = oblasts_gdf[oblasts_gdf["oblast_name_en"] == selected_oblast]
-        if not filtered_oblast.empty:
-            # Draw oblast outline
-            for _, row in filtered_oblast.iterrows():
-                geom = row.geometry
-                polygons = [geom] if isinstance(geom, Polygon) else geom.geoms
-                for poly in polygons:
-                    x, y = poly.exterior.xy
-                    fig.add_trace(
-                        go.Scattermapbox(
-                            lat=list(y),
-                            lon=list(x),
-                            mode="lines",
-                            line={"width": 1, "color": "black"},
-                            hoverinfo="none",
-                            showlegend=False,
-                        )
-                    )
-            # Add stations inside oblast
-            filtered_stations = stations_df[stations_df["oblast_name_en"] == selected_oblast]
-            fig = add_station_markers(fig, filtered_stations, show_legend=True)
-
-            # Center on oblast centroid
-            centroid = filtered_oblast.geometry.unary_union.centroid
-            fig.update_layout(
-                mapbox={"center": {"lat": centroid.y, "lon": centroid.x}, "zoom": 7, "style": "carto-positron"},
-                margin={"r": 0, "t": 0, "l": 0, "b": 0},
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="top",
-                    y=0.98,
-                    xanchor="left",
-                    x=0.01,
-                    bgcolor="rgba(255,255,255,0.9)",
-                    bordercolor="rgba(0,0,0,0.2)",
-                    borderwidth=1,
-                    font=dict(size=10),
-                ),
-                dragmode="lasso",
-                hovermode="closest",
-            )
+    elif not reset and selected_oblast:
+        oblasts = oblasts if oblasts is not None else build_oblast_registry(oblasts_gdf, stations_df)
+        oblast = oblasts.get(selected_oblast)
+        if oblast is not None:
+            # Draw oblast outline and the stations inside the oblast, fitted to its bounding box
+            oblast_rows = oblasts.restrict(rows, selected_oblast)
+            outline = _outline_coordinates([oblast.geometry], boundaries, selected_oblast, oblast.zoom)
+            fig = _station_map_figure(outline, stations_df, store, oblast_rows)
+            fig.update_layout(**_map_layout(oblast.center, oblast.zoom), dragmode="lasso", hovermode="closest")
             return fig
 
-    # fallback → full Ukraine
-    fig = default_map_figure(stations_df, outer_ukraine=outer_ukraine)
+    # Reset, no selection or fallback → full Ukraine
+    fig = default_map_figure(stations_df, outer_ukraine=outer_ukraine, store=store, rows=rows, boundaries=boundaries)
     fig.update_layout(dragmode="lasso", hovermode="closest")
     return fig
 
@@ -556,40 +735,32 @@ def get_station_details(row: pd.Series) -> html.Div:
     return details_layout
 
 
-def generate_data_note(gdf: gpd.GeoDataFrame) -> html.Div:
+def generate_data_note(gdf: gpd.GeoDataFrame, fuels: FuelMatrix | None = None) -> html.Div:
     """
     Generate a note inside the sidebar summarizing the dataset.
 
+    Plants are counted by the same power source categories as the sidebar filter; plants whose
+    fuels span several categories are counted as mixed.
+
     Args:
         gdf: GeoDataFrame containing station data with attributes
+        fuels: Prebuilt FuelMatrix for ``gdf``; built on the fly when omitted
 
     Returns:
         Dash HTML Div component with formatted data note
 
     """
     # Split plants vs substation
-    plants_df = gdf[gdf["power"] == "plant"].copy()
-    substation_count = (gdf["power"] == "substation").sum()
-
-    # Define categories
-    renewable = {"solar", "hydro", "wind", "biomass", "biogas", "waste", "wood"}
-    fossil = {"coal", "gas", "oil", "diesel", "mazut"}
-
-    renew_count, fossil_count, nuclear_count = 0, 0, 0
-
-    for sources in plants_df["plant:source"].dropna():
-        fuels = set(str(sources).split(";"))
-        if "nuclear" in fuels:
-            nuclear_count += 1
-        elif any(f in renewable for f in fuels):
-            renew_count += 1
-        elif any(f in fossil for f in fuels):
-            fossil_count += 1
-        else:
-            # catch uncategorized sources
-            renew_count += 0
-
-    total_plants = plants_df.shape[0]
+    power = gdf["power"].to_numpy()
+    plant_rows = np.flatnonzero(power == "plant")
+    substation_count = int((power == "substation").sum())
+
+    fuels = fuels if fuels is not None else build_fuel_matrix(gdf)
+    counts = fuels.category_counts(plant_rows)
+    renew_count, thermal_count = counts["renewable"], counts["thermal"]
+    nuclear_count, mixed_count = counts["nuclear"], counts["mixed"]
+
+    total_plants = len(plant_rows)
     total_stations = total_plants + substation_count
 
     return html.Div(
@@ -624,11 +795,13 @@ def generate_data_note(gdf: gpd.GeoDataFrame) -> html.Div:
                 [
                     "Among the power plants: ",
                     html.Span(renew_count, className="data-number"),
-                    " renewable (solar, hydro, wind, biomass, etc.), ",
-                    html.Span(fossil_count, className="data-number"),
-                    " fossil-fuel (gas, coal, oil, etc.), and ",
+                    " renewable (solar, hydro, wind), ",
+                    html.Span(thermal_count, className="data-number"),
+                    " thermal (gas, coal, oil, biomass, etc.), ",
                     html.Span(nuclear_count, className="data-number"),
-                    " nuclear stations.",
+                    " nuclear and ",
+                    html.Span(mixed_count, className="data-number"),
+                    " mixed-source stations.",
                 ],
                 className="data-note-text-2",
             ),
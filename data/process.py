@@ -6,22 +6,93 @@ from OpenStreetMap using the Overpass API and matching with the Global Power
 Plant Database (GPPD).
 """
 
+import argparse
+import codecs
+import hashlib
+import itertools
+import json
 import logging
+import os
+import random
+import re
+import threading
+import time
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 import requests
-from shapely.geometry import LineString, MultiPolygon, Point, Polygon
+import shapely
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+# Multipolygon member roles: outer rings (an empty role counts as outer) and holes
+OUTER_ROLES = ("outer", "")
+INNER_ROLES = ("inner",)
+
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+GADM_URL = "https://geodata.ucdavis.edu/gadm/gadm4.1/gpkg/gadm41_UKR.gpkg"
+GPPD_URL = (
+    "https://github.com/wri/global-power-plant-database/raw/master/output_database/global_power_plant_database.csv"
+)
 DATA_ASSETS_PATH = Path(__file__).parent.parent / "assets" / "data"
 DATA_ASSETS_PATH.mkdir(parents=True, exist_ok=True)
 
+# Bytes read from the HTTP body at a time when streaming a response
+STREAM_CHUNK_SIZE = 1 << 16
+# Ways or relations turned into geometries at a time when building streamed features
+STREAM_BATCH_SIZE = 50_000
+
+# Tiled bulk download: Ukraine's bounding box (south, west, north, east), split into a grid
+UKRAINE_BBOX = (44.0, 22.0, 52.5, 40.3)
+DEFAULT_GRID = (3, 4)
+# Overpass instances grant a couple of slots per client; be polite with workers and request spacing
+DEFAULT_WORKERS = 2
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 5.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Transient request errors; others (e.g. InvalidURL or MissingSchema from a mistyped endpoint) raise at once
+RETRY_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.HTTPError,
+    RuntimeError,
+)
+# Finished tiles, kept until the run succeeds so an interrupted download resumes
+DOWNLOAD_DIR = DATA_ASSETS_PATH / ".cache" / "overpass"
+
+# Relations fetched by id in addition to the bulk query (e.g. plants its filters miss); the
+# relations of the bulk response, Kakhovka HPP (7317657) included, are assembled locally
+CRITICAL_RELATIONS: tuple[int, ...] = ()
+# Relation ids per query; longer lists are split into batches fetched concurrently
+RELATION_BATCH_SIZE = 100
+# Responses of by-id queries, content-addressed by query text
+RESPONSE_CACHE_DIR = DATA_ASSETS_PATH / ".cache" / "overpass-responses"
+DEFAULT_CACHE_TTL = 24 * 3600
+
+BULK_QUERY = """
+[out:json][timeout:{timeout}];
+area["ISO3166-1"="UA"][admin_level=2]->.a;
+(
+  node["power"="plant"](area.a){bbox};
+  way["power"="plant"](area.a){bbox};
+  relation["power"="plant"](area.a){bbox};
+  node["power"="substation"]["substation"="transmission"](area.a){bbox};
+  way["power"="substation"]["substation"="transmission"](area.a){bbox};
+  relation["power"="substation"]["substation"="transmission"](area.a){bbox};
+);
+out body; >; out skel qt;
+"""
+
 
 def fetch_overpass_data(query: str) -> dict[str, Any]:
     """
@@ -42,69 +113,1037 @@ def fetch_overpass_data(query: str) -> dict[str, Any]:
     return r.json()
 
 
-def elements_to_geodataframe(data: dict) -> gpd.GeoDataFrame:
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR_END = re.compile(r"[ \t\n\r,\]}]")
+
+
+class _JsonStream:
+    """Cursor over a JSON document arriving in byte chunks; only the unread part is buffered."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def _fill(self) -> bool:
+        """Drop the consumed text and append the next chunk; False once the stream is exhausted."""
+        self.buffer, self.pos = self.buffer[self.pos :], 0
+        for chunk in self._chunks:
+            text = self._text.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self._text.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at the end)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def skip(self, char: str) -> bool:
+        """Consume ``char`` if it is the next non-whitespace character."""
+        if self.peek() != char:
+            return False
+        self.pos += 1
+        return True
+
+    def expect(self, char: str) -> None:
+        """Consume ``char``, which must be the next non-whitespace character."""
+        if not self.skip(char):
+            raise ValueError(f"Expected {char!r} at {self.buffer[self.pos : self.pos + 40]!r}")
+
+    def value(self) -> Any:  # noqa: ANN401
+        """Decode the next JSON value."""
+        if self.peek() not in '"{[':
+            # a number or literal is complete only once the character after it has arrived
+            while not _SCALAR_END.search(self.buffer, self.pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, self.pos = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # strings, objects and arrays are delimited: an error means more text is needed
+                if not self._fill():
+                    raise
+                continue
+            return value
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str, members: dict[str, Any] | None = None) -> Iterator[Any]:
+    """
+    Yield the items of one array member of a JSON object while the document is being read.
+
+    Only one item is decoded at a time, so the memory used does not grow with the array.
+
+    Args:
+        chunks: Bytes of the JSON document (e.g. ``response.iter_content()``)
+        key: Name of the top-level member holding the array (e.g. 'elements')
+        members: Dictionary receiving the other top-level members once the document is read
+
+    Yields:
+        Decoded array items, in document order
+
+    Raises:
+        ValueError: If the document is not a JSON object or is truncated
+
+    """
+    stream = _JsonStream(chunks)
+    stream.expect("{")
+    while not stream.skip("}"):
+        name = stream.value()
+        stream.expect(":")
+        if name == key:
+            stream.expect("[")
+            while not stream.skip("]"):
+                yield stream.value()
+                stream.skip(",")
+        elif members is not None:
+            members[name] = stream.value()
+        else:
+            stream.value()
+        stream.skip(",")
+
+
+def stream_overpass_elements(
+    query: str, url: str = OVERPASS_URL, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[dict[str, Any]]:
+    """
+    Run an Overpass query and yield its elements while the response is downloaded.
+
+    Args:
+        query: Overpass QL query string
+        url: Overpass API endpoint
+        chunk_size: Bytes read from the response at a time
+
+    Yields:
+        Element dictionaries, in response order
+
+    Raises:
+        requests.HTTPError: If the request fails
+        RuntimeError: If Overpass reports a runtime error (e.g. a timeout) after the elements
+
+    """
+    members: dict[str, Any] = {}
+    with requests.post(url, data={"data": query}, timeout=180, stream=True) as r:
+        r.raise_for_status()
+        yield from iter_json_array(r.iter_content(chunk_size), "elements", members)
+    # Overpass answers timeouts and memory exhaustion with HTTP 200, partial elements and a remark
+    remark = members.get("remark") or ""
+    if "error" in remark:
+        raise RuntimeError(f"Overpass query failed: {remark}")
+
+
+@dataclass(frozen=True)
+class Tile:
+    """A bounding box of the tiled bulk download."""
+
+    name: str
+    south: float
+    west: float
+    north: float
+    east: float
+
+    @property
+    def bbox(self) -> str:
+        """Overpass bounding box filter value: 'south,west,north,east'."""
+        return f"{self.south:.6f},{self.west:.6f},{self.north:.6f},{self.east:.6f}"
+
+
+def bulk_query(tile: Tile | None = None, timeout: int = 180) -> str:
+    """
+    Build the bulk query for power plants and transmission substations.
+
+    Args:
+        tile: Restrict the query to a tile (all of Ukraine when None)
+        timeout: Server-side timeout of the query in seconds
+
+    Returns:
+        Overpass QL query string
+
+    """
+    return BULK_QUERY.format(timeout=timeout, bbox=f"({tile.bbox})" if tile is not None else "")
+
+
+def grid_tiles(bbox: tuple[float, float, float, float] = UKRAINE_BBOX, rows: int = 3, cols: int = 4) -> list[Tile]:
+    """
+    Split a bounding box into a grid of tiles.
+
+    Args:
+        bbox: (south, west, north, east) in degrees
+        rows: Tiles from south to north
+        cols: Tiles from west to east
+
+    Returns:
+        List of rows x cols tiles named 'r<row>c<col>'
+
+    """
+    south, west, north, east = bbox
+    lats, lons = np.linspace(south, north, rows + 1), np.linspace(west, east, cols + 1)
+    return [
+        Tile(f"r{row}c{col}", lats[row], lons[col], lats[row + 1], lons[col + 1])
+        for row in range(rows)
+        for col in range(cols)
+    ]
+
+
+def oblast_tiles(gadm_url: str = GADM_URL) -> list[Tile]:
+    """
+    One tile per oblast: the bounding box of its GADM boundary.
+
+    Args:
+        gadm_url: Path or URL to the GADM GeoPackage
+
+    Returns:
+        List of tiles named after the oblasts
+
+    """
+    gdf_oblasts = gpd.read_file(gadm_url, layer="ADM_ADM_1").to_crs("EPSG:4326")
+    bounds = gdf_oblasts.bounds
+    return [
+        Tile(re.sub(r"[^A-Za-z0-9_-]", "_", str(name)), row.miny, row.minx, row.maxy, row.maxx)
+        for name, row in zip(gdf_oblasts["NAME_1"], bounds.itertuples(), strict=True)
+    ]
+
+
+class RateLimiter:
+    """Spaces out request starts across threads by at least ``min_interval`` seconds."""
+
+    def __init__(self, min_interval: float = DEFAULT_MIN_INTERVAL) -> None:
+        self.min_interval = min_interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next request may start."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+_REMARK = re.compile(rb'"remark"\s*:\s*("(?:[^"\\]|\\.)*")\s*}\s*$')
+
+
+def _check_download(path: Path) -> None:
+    """
+    Check that a downloaded response is complete and reports no Overpass runtime error.
+
+    Only the end of the file is read: a complete JSON object ends with '}', and Overpass writes
+    its top-level 'remark' last.
+
+    Raises:
+        RuntimeError: If the body is truncated or its remark reports an error
+
+    """
+    with path.open("rb") as f:
+        f.seek(max(path.stat().st_size - 4096, 0))
+        tail = f.read()
+    if not tail.rstrip().endswith(b"}"):
+        raise RuntimeError(f"Truncated Overpass response ({path.stat().st_size} bytes)")
+    match = _REMARK.search(tail)
+    remark = json.loads(match.group(1)) if match else ""
+    if "error" in remark:
+        raise RuntimeError(f"Overpass query failed: {remark}")
+
+
+def _retry_after(response: requests.Response) -> float:
+    """Seconds asked for by a Retry-After header (0 when absent or given as a date)."""
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.isdigit() else 0.0
+
+
+def download_overpass(
+    query: str,
+    path: Path,
+    url: str = OVERPASS_URL,
+    limiter: RateLimiter | None = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> Path:
+    """
+    Download the response of an Overpass query to a file, retrying with exponential backoff.
+
+    The body is streamed to ``<path>.part`` and renamed once complete, so an existing ``path``
+    is a finished download and is not fetched again. Connection errors, timeouts, bodies dropped
+    mid-transfer, the statuses in RETRY_STATUSES, truncated bodies and runtime errors reported in
+    the response's remark are retried after ``backoff * 2**attempt`` seconds (at least the
+    server's Retry-After) plus jitter; other HTTP and request errors are raised at once.
+
+    Args:
+        query: Overpass QL query string
+        path: Destination file
+        url: Overpass API endpoint
+        limiter: RateLimiter shared by concurrent downloads
+        retries: Retries after the first attempt
+        backoff: Base delay in seconds
+
+    Returns:
+        ``path``
+
+    Raises:
+        requests.RequestException: If the last attempt fails with a request error, or at once if
+            the error is not transient
+        RuntimeError: If the last attempt is truncated or reports an Overpass runtime error
+
+    """
+    if path.exists():
+        return path
+    partial = path.with_name(path.name + ".part")
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.wait()
+        retry_after = 0.0
+        try:
+            with requests.post(url, data={"data": query}, timeout=(30, 300), stream=True) as r:
+                retry_after = _retry_after(r)
+                r.raise_for_status()
+                with partial.open("wb") as f:
+                    for chunk in r.iter_content(STREAM_CHUNK_SIZE):
+                        f.write(chunk)
+            _check_download(partial)
+            partial.replace(path)
+            return path
+        except RETRY_ERRORS as e:
+            response = getattr(e, "response", None)
+            if attempt == retries or (response is not None and response.status_code not in RETRY_STATUSES):
+                raise
+            delay = max(backoff * 2**attempt, retry_after) + random.uniform(0, backoff)  # noqa: S311
+            logger.warning("%s failed (%s), retrying in %.1fs", path.name, e, delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+def query_digest(query: str) -> str:
+    """Content address of a query: the SHA-256 of its text."""
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def download_concurrently(
+    downloads: Mapping[str, tuple[str, Path]],
+    url: str = OVERPASS_URL,
+    workers: int = DEFAULT_WORKERS,
+    limiter: RateLimiter | None = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> list[str]:
+    """
+    Run ``download_overpass`` for several queries in a thread pool.
+
+    Args:
+        downloads: Name -> (query, destination file)
+        url: Overpass API endpoint
+        workers: Concurrent downloads
+        limiter: RateLimiter shared by the downloads
+        retries: Retries per query
+        backoff: Base delay of the exponential backoff in seconds
+
+    Returns:
+        Sorted names of the downloads that failed after their retries (logged)
+
+    """
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="overpass") as executor:
+        futures = {
+            executor.submit(download_overpass, query, path, url, limiter, retries, backoff): name
+            for name, (query, path) in downloads.items()
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            try:
+                future.result()
+                logger.info("%s ready (%d/%d)", name, done, len(futures))
+            except Exception:
+                logger.exception("%s failed", name)
+                failed.append(name)
+    return sorted(failed)
+
+
+def download_tiles(
+    tiles: Sequence[Tile],
+    directory: str | os.PathLike = DOWNLOAD_DIR,
+    url: str = OVERPASS_URL,
+    workers: int = DEFAULT_WORKERS,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    max_age: float = DEFAULT_CACHE_TTL,
+) -> list[Path]:
+    """
+    Download the bulk query of every tile concurrently, resuming from earlier partial runs.
+
+    Files are named after the tile and a hash of its query, so tiles finished by an interrupted
+    run are reused and a changed query is downloaded again. Tiles older than ``max_age`` seconds
+    are downloaded again, so a late rerun does not mix stale tiles with fresh ones.
+
+    Args:
+        tiles: Tiles to download
+        directory: Directory of the tile responses
+        url: Overpass API endpoint (e.g. a local stand-in server for testing)
+        workers: Concurrent downloads
+        min_interval: Minimum seconds between request starts, over all workers
+        retries: Retries per tile
+        backoff: Base delay of the exponential backoff in seconds
+        max_age: Maximum age of a finished tile in seconds
+
+    Returns:
+        Paths of the tile responses, in tile order
+
+    Raises:
+        RuntimeError: If tiles still fail after their retries (the finished ones are kept)
+
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    limiter = RateLimiter(min_interval)
+    paths: dict[str, tuple[str, Path]] = {}
+    for tile in tiles:
+        query = bulk_query(tile)
+        paths[tile.name] = (query, directory / f"{tile.name}-{query_digest(query)[:12]}.json")
+    ages = []
+    for _, path in paths.values():
+        if path.exists():
+            age = time.time() - path.stat().st_mtime
+            if age >= max_age:
+                path.unlink()
+            else:
+                ages.append(age)
+    if ages:
+        logger.info(
+            "Resuming: %d/%d tiles already downloaded, %.1f-%.1f h old",
+            len(ages),
+            len(paths),
+            min(ages) / 3600,
+            max(ages) / 3600,
+        )
+
+    failed = download_concurrently(paths, url, workers, limiter, retries, backoff)
+    if failed:
+        raise RuntimeError(f"{len(failed)} tiles failed ({', '.join(failed)}); rerun to resume")
+    return [path for _, path in paths.values()]
+
+
+def iter_file_elements(paths: Iterable[str | os.PathLike]) -> Iterator[dict[str, Any]]:
+    """
+    Yield the elements of downloaded Overpass responses, one file after the other.
+
+    Args:
+        paths: Overpass JSON files
+
+    Yields:
+        Element dictionaries
+
+    """
+    for path in paths:
+        with open(path, "rb") as f:
+            yield from iter_json_array(iter(lambda f=f: f.read(STREAM_CHUNK_SIZE), b""), "elements")
+
+
+def _search(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Position of every id in a sorted id array, -1 for missing ids."""
+    if not len(sorted_ids):
+        return np.full(len(ids), -1, dtype=np.intp)
+    positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[positions] == ids, positions, -1)
+
+
+@dataclass(frozen=True)
+class NodeStore:
+    """Node coordinates sorted by node id, so way references resolve with one binary search."""
+
+    ids: np.ndarray
+    lon: np.ndarray
+    lat: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def lookup(self, refs: np.ndarray) -> np.ndarray:
+        """
+        Resolve node ids to store positions.
+
+        Args:
+            refs: Node ids
+
+        Returns:
+            Store position of every id, -1 for ids missing from the store
+
+        """
+        return _search(self.ids, refs)
+
+
+def _last_occurrence(ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted unique ids and the position of each id's last occurrence (a dict keyed by id keeps the last)."""
+    order = np.argsort(ids, kind="stable")
+    ordered = ids[order]
+    last = np.append(ordered[1:] != ordered[:-1], True) if len(ordered) else np.zeros(0, dtype=bool)
+    return ordered[last], order[last]
+
+
+def build_node_store(ids: np.ndarray, lon: np.ndarray, lat: np.ndarray) -> NodeStore:
+    """
+    Pack node coordinates into a NodeStore.
+
+    Args:
+        ids: Node ids (repeated ids keep their last coordinates)
+        lon: Longitude of every node
+        lat: Latitude of every node
+
+    Returns:
+        NodeStore sorted by id
+
+    """
+    unique_ids, rows = _last_occurrence(np.asarray(ids, dtype=np.int64))
+    return NodeStore(unique_ids, np.asarray(lon, dtype=np.float64)[rows], np.asarray(lat, dtype=np.float64)[rows])
+
+
+def _ragged_positions(starts: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Flat positions of the slices ``[start, start + count)`` and the slice each position belongs to."""
+    slices = np.repeat(np.arange(len(counts)), counts)
+    within = np.arange(slices.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return starts[slices] + within, slices
+
+
+@dataclass(frozen=True)
+class WayCoordinates:
+    """Resolved coordinates of ways, concatenated: way ``i`` owns ``x/y[offsets[i]:offsets[i + 1]]``."""
+
+    x: np.ndarray
+    y: np.ndarray
+    offsets: np.ndarray
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Number of resolved coordinates per way."""
+        return np.diff(self.offsets)
+
+    def closed(self) -> np.ndarray:
+        """Whether each way has coordinates and ends where it starts."""
+        counts = self.counts
+        first = np.minimum(self.offsets[:-1], max(len(self.x) - 1, 0))
+        last = np.maximum(self.offsets[1:] - 1, 0)
+        if not len(self.x):
+            return np.zeros(len(counts), dtype=bool)
+        return (counts > 0) & (self.x[first] == self.x[last]) & (self.y[first] == self.y[last])
+
+    def coordinates(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gather the coordinates of some ways.
+
+        Args:
+            rows: Way positions
+
+        Returns:
+            Tuple of (n x 2 coordinates, position in ``rows`` of every coordinate)
+
+        """
+        positions, slices = _ragged_positions(self.offsets[rows], self.counts[rows])
+        return np.column_stack([self.x[positions], self.y[positions]]), slices
+
+
+def resolve_ways(refs: np.ndarray, ref_counts: np.ndarray, nodes: NodeStore) -> WayCoordinates:
+    """
+    Look up the node references of ways, dropping references to nodes missing from the store.
+
+    Args:
+        refs: Node ids of all ways, concatenated
+        ref_counts: Number of node ids per way
+        nodes: NodeStore of the response
+
+    Returns:
+        WayCoordinates aligned with ``ref_counts``
+
+    """
+    positions = nodes.lookup(refs)
+    found = positions >= 0
+    way_of_ref = np.repeat(np.arange(len(ref_counts)), ref_counts)
+    counts = np.bincount(way_of_ref[found], minlength=len(ref_counts))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return WayCoordinates(nodes.lon[positions[found]], nodes.lat[positions[found]], offsets)
+
+
+def way_geometries(ways: WayCoordinates) -> np.ndarray:
+    """
+    Build the geometry of every way in bulk.
+
+    Closed ways with at least 4 coordinates become polygons, other ways with at least 2
+    coordinates line strings; ways without enough resolved coordinates get None.
+
+    Args:
+        ways: Resolved way coordinates
+
+    Returns:
+        Object array of geometries (or None), aligned with the ways
+
+    """
+    geometries = np.full(len(ways.counts), None, dtype=object)
+    is_polygon = ways.closed() & (ways.counts >= 4)
+    is_line = ~is_polygon & (ways.counts >= 2)
+    polygon_rows, line_rows = np.flatnonzero(is_polygon), np.flatnonzero(is_line)
+    if polygon_rows.size:
+        coords, slices = ways.coordinates(polygon_rows)
+        geometries[polygon_rows] = shapely.polygons(shapely.linearrings(coords, indices=slices))
+    if line_rows.size:
+        coords, slices = ways.coordinates(line_rows)
+        geometries[line_rows] = shapely.linestrings(coords, indices=slices)
+    return geometries
+
+
+Point = tuple[float, float]
+
+
+def join_segments(segments: list[np.ndarray]) -> list[np.ndarray]:
+    """
+    Join open way segments into rings by hashing their end points.
+
+    Starting from each unused segment, the chain is extended at its tail and then at its head
+    with an unused segment sharing the end point (reversed where needed) until it closes. A
+    chain that cannot be closed, e.g. because a member way is missing from the response, is
+    closed by repeating its first coordinate, as a single open way always was.
+
+    Args:
+        segments: n x 2 coordinate arrays of the open ways of one relation and role
+
+    Returns:
+        Closed n x 2 coordinate arrays, one per ring
+
+    """
+    segments = [segment for segment in segments if len(segment) >= 2]
+    ends: dict[Point, list[int]] = {}
+    for i, segment in enumerate(segments):
+        for point in (segment[0], segment[-1]):
+            ends.setdefault((point[0], point[1]), []).append(i)
+    used = np.zeros(len(segments), dtype=bool)
+
+    def take(point: Point) -> np.ndarray | None:
+        """An unused segment ending at ``point``, marked as used."""
+        for j in ends.get(point, ()):
+            if not used[j]:
+                used[j] = True
+                return segments[j]
+        return None
+
+    rings = []
+    for i, segment in enumerate(segments):
+        if used[i]:
+            continue
+        used[i] = True
+        chain = [segment]
+        head, tail = (segment[0][0], segment[0][1]), (segment[-1][0], segment[-1][1])
+        while tail != head and (following := take(tail)) is not None:
+            following = following if (following[0][0], following[0][1]) == tail else following[::-1]
+            chain.append(following[1:])
+            tail = (following[-1][0], following[-1][1])
+        while tail != head and (preceding := take(head)) is not None:
+            preceding = preceding if (preceding[-1][0], preceding[-1][1]) == head else preceding[::-1]
+            chain.insert(0, preceding[:-1])
+            head = (preceding[0][0], preceding[0][1])
+        ring = np.concatenate(chain)
+        rings.append(ring if tail == head else np.concatenate([ring, ring[:1]]))
+    return rings
+
+
+def assemble_rings(
+    relation_of_member: np.ndarray, member_way_rows: np.ndarray, member_inner: np.ndarray, ways: WayCoordinates
+) -> tuple[WayCoordinates, np.ndarray, np.ndarray]:
+    """
+    Assemble the rings of relations from their member ways.
+
+    Closed member ways are rings on their own; the open ones are joined per relation and role
+    by ``join_segments``. Rings with fewer than 4 coordinates are dropped.
+
+    Args:
+        relation_of_member: Relation position of every member
+        member_way_rows: Way position of every member
+        member_inner: Whether every member is an inner way
+        ways: Resolved way coordinates
+
+    Returns:
+        Tuple of (ring coordinates, relation position of every ring, whether every ring is inner)
+
+    """
+    closed_rows = ways.closed()[member_way_rows]
+    closed = np.flatnonzero(closed_rows & (ways.counts[member_way_rows] >= 4))
+    coords, _ = ways.coordinates(member_way_rows[closed])
+    blocks, counts = [coords], [ways.counts[member_way_rows[closed]]]
+    relations, inner = [relation_of_member[closed]], [member_inner[closed]]
+
+    open_members = np.flatnonzero(~closed_rows)
+    # group the open members by relation and role, keeping the member order within a group
+    open_members = open_members[np.lexsort((member_inner[open_members], relation_of_member[open_members]))]
+    keys = np.column_stack([relation_of_member[open_members], member_inner[open_members]])
+    boundaries = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    coords, _ = ways.coordinates(member_way_rows[open_members])
+    segments = np.split(coords, np.cumsum(ways.counts[member_way_rows[open_members]])[:-1])
+    for group in np.split(np.arange(open_members.size), boundaries) if open_members.size else []:
+        rings = [ring for ring in join_segments([segments[i] for i in group]) if len(ring) >= 4]
+        blocks.extend(rings)
+        counts.append(np.array([len(ring) for ring in rings], dtype=np.intp))
+        relations.append(np.full(len(rings), relation_of_member[open_members[group[0]]]))
+        inner.append(np.full(len(rings), member_inner[open_members[group[0]]]))
+
+    coords, counts = np.concatenate(blocks), np.concatenate(counts).astype(np.intp)
+    rings = WayCoordinates(coords[:, 0], coords[:, 1], np.concatenate([[0], np.cumsum(counts)]).astype(np.intp))
+    return rings, np.concatenate(relations).astype(np.intp), np.concatenate(inner).astype(bool)
+
+
+def relation_geometries(
+    relation_of_member: np.ndarray,
+    member_way_rows: np.ndarray,
+    n_relations: int,
+    ways: WayCoordinates,
+    member_inner: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Build relation (multi)polygons from their member ways.
+
+    Member ways are assembled into rings (``assemble_rings``). Every inner ring becomes a hole of
+    the smallest outer ring of its relation containing it, found with an STRtree over the outer
+    rings; inner rings outside every outer ring are dropped. Invalid polygons are skipped.
+    Relations with one valid polygon become polygons, with several multipolygons.
+
+    Args:
+        relation_of_member: Relation position of every outer or inner member
+        member_way_rows: Way position of every member
+        n_relations: Number of relations
+        ways: Resolved way coordinates
+        member_inner: Whether every member is an inner way (all outer by default)
+
+    Returns:
+        Object array of geometries (or None), aligned with the relations
+
+    """
+    geometries = np.full(n_relations, None, dtype=object)
+    if member_inner is None:
+        member_inner = np.zeros(len(member_way_rows), dtype=bool)
+    rings, ring_relations, ring_inner = assemble_rings(relation_of_member, member_way_rows, member_inner, ways)
+    if not len(ring_relations):
+        return geometries
+    coords, slices = rings.coordinates(np.arange(len(ring_relations)))
+    ring_polygons = shapely.polygons(shapely.linearrings(coords, indices=slices))
+
+    shells = np.flatnonzero(~ring_inner)
+    holes = np.flatnonzero(ring_inner & shapely.is_valid(ring_polygons))
+    hole_rings, hole_owners = np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    if shells.size and holes.size:
+        tree = shapely.STRtree(ring_polygons[shells])
+        hole_of_pair, shell_of_pair = tree.query(ring_polygons[holes], predicate="covered_by")
+        same = ring_relations[holes[hole_of_pair]] == ring_relations[shells[shell_of_pair]]
+        hole_of_pair, shell_of_pair = hole_of_pair[same], shell_of_pair[same]
+        # the smallest containing outer ring (an island's shell rather than the lake's)
+        order = np.lexsort((shapely.area(ring_polygons[shells[shell_of_pair]]), hole_of_pair))
+        assigned, first = np.unique(hole_of_pair[order], return_index=True)
+        hole_rings, hole_owners = holes[assigned], shell_of_pair[order][first]
+
+    # one polygon per outer ring: its shell followed by its holes
+    ring_rows = np.concatenate([shells, hole_rings])
+    polygon_of_ring = np.concatenate([np.arange(shells.size), hole_owners])
+    order = np.lexsort((np.concatenate([np.zeros(shells.size), np.ones(hole_rings.size)]), polygon_of_ring))
+    coords, slices = rings.coordinates(ring_rows[order])
+    polygons = shapely.polygons(shapely.linearrings(coords, indices=slices), indices=polygon_of_ring[order])
+    valid = shapely.is_valid(polygons)
+    polygons, owners = polygons[valid], ring_relations[shells][valid]
+
+    if not polygons.size:
+        return geometries
+    order = np.argsort(owners, kind="stable")
+    polygons, owners = polygons[order], owners[order]
+    owner_ids, first, parts = np.unique(owners, return_index=True, return_counts=True)
+    geometries[owner_ids] = polygons[first]
+    multi = parts > 1
+    if multi.any():
+        in_multi = np.isin(owners, owner_ids[multi])
+        # owners are sorted by relation, so the group numbers increase as the indices require
+        _, groups = np.unique(owners[in_multi], return_inverse=True)
+        geometries[owner_ids[multi]] = shapely.multipolygons(polygons[in_multi], indices=groups)
+    return geometries
+
+
+def _valid_positions(geometries: np.ndarray, repair_invalid: bool = False) -> np.ndarray:
+    """Positions of the valid, non-empty geometries (invalid ones repaired in place first if requested)."""
+    valid = shapely.is_valid(geometries)
+    if repair_invalid:
+        broken = ~shapely.is_missing(geometries) & ~valid
+        geometries[broken] = shapely.make_valid(geometries[broken])
+        valid = ~shapely.is_missing(geometries)
+    return np.flatnonzero(valid & ~shapely.is_empty(geometries))
+
+
+def _feature_frame(
+    osm_ids: np.ndarray, osm_types: np.ndarray, tags: list[dict[str, str]], geometries: np.ndarray
+) -> gpd.GeoDataFrame:
+    """GeoDataFrame of features: osm_id, osm_type, one column per tag key, geometry."""
+    attributes = pd.DataFrame({"osm_id": osm_ids, "osm_type": osm_types})
+    tag_columns = pd.DataFrame.from_records(tags).set_axis(attributes.index)
+    return gpd.GeoDataFrame(pd.concat([attributes, tag_columns], axis=1), geometry=geometries, crs="EPSG:4326")
+
+
+def elements_to_geodataframe(data: dict, repair_invalid: bool = False) -> gpd.GeoDataFrame:
     """
     Convert Overpass JSON → GeoDataFrame (points/lines/polygons). Only keeps elements with valid geometries.
 
+    Node coordinates are packed into a NodeStore and way references resolved with one binary
+    search; points, line strings, polygons and relation multipolygons are built with the
+    vectorised shapely constructors and validated in one pass.
+
     Args:
         data: JSON response from Overpass API
+        repair_invalid: Repair invalid geometries with ``shapely.make_valid`` instead of dropping them
 
     Returns:
         GeoDataFrame with geometries.
 
     """
-    # Map nodes and ways
-    node_by_id = {el["id"]: el for el in data["elements"] if el["type"] == "node"}
-    way_by_id = {el["id"]: el for el in data["elements"] if el["type"] == "way"}
+    elements = data["elements"]
+    node_elements, node_ids, node_lon, node_lat = [], [], [], []
+    way_elements, way_ids, way_refs, way_ref_counts = [], [], [], []
+    relation_elements, relation_ids, member_relations, member_ways, member_inner = [], [], [], [], []
+    for position, el in enumerate(elements):
+        kind = el["type"]
+        if kind == "node":
+            if "lon" in el and "lat" in el:
+                node_elements.append(position)
+                node_ids.append(el["id"])
+                node_lon.append(el["lon"])
+                node_lat.append(el["lat"])
+        elif kind == "way":
+            refs = el.get("nodes", [])
+            way_elements.append(position)
+            way_ids.append(el["id"])
+            way_refs.extend(refs)
+            way_ref_counts.append(len(refs))
+        elif kind == "relation":
+            for m in el.get("members", []):
+                role = m.get("role")
+                if m["type"] == "way" and (role in OUTER_ROLES or role in INNER_ROLES):
+                    member_relations.append(len(relation_elements))
+                    member_ways.append(m["ref"])
+                    member_inner.append(role in INNER_ROLES)
+            relation_elements.append(position)
+            relation_ids.append(el["id"])
+
+    node_lon, node_lat = np.asarray(node_lon, dtype=np.float64), np.asarray(node_lat, dtype=np.float64)
+    nodes = build_node_store(np.asarray(node_ids, dtype=np.int64), node_lon, node_lat)
+    ways = resolve_ways(np.asarray(way_refs, dtype=np.int64), np.asarray(way_ref_counts, dtype=np.int64), nodes)
+
+    # member ways resolve to the last way with their id, members of unknown ways are dropped
+    unique_way_ids, way_rows = _last_occurrence(np.asarray(way_ids, dtype=np.int64))
+    member_ids = np.asarray(member_ways, dtype=np.int64)
+    lookup = _search(unique_way_ids, member_ids)
+    known = lookup >= 0
+
+    osm_ids = np.zeros(len(elements), dtype=np.int64)
+    osm_types = np.full(len(elements), None, dtype=object)
+    geometries = np.full(len(elements), None, dtype=object)
+    for positions, ids, kind in (
+        (node_elements, node_ids, "node"),
+        (way_elements, way_ids, "way"),
+        (relation_elements, relation_ids, "relation"),
+    ):
+        osm_ids[positions] = ids
+        osm_types[positions] = kind
+    geometries[node_elements] = shapely.points(node_lon, node_lat)
+    geometries[way_elements] = way_geometries(ways)
+    geometries[relation_elements] = relation_geometries(
+        np.asarray(member_relations, dtype=np.intp)[known],
+        way_rows[lookup[known]],
+        len(relation_elements),
+        ways,
+        np.asarray(member_inner, dtype=bool)[known],
+    )
+
+    # Only keep elements with valid geometry
+    keep = _valid_positions(geometries, repair_invalid)
+    return _feature_frame(
+        osm_ids[keep], osm_types[keep], [elements[position].get("tags", {}) for position in keep], geometries[keep]
+    )
+
+
+class ElementCollector:
+    """
+    Compact accumulator of streamed Overpass elements.
+
+    Node coordinates are appended to typed arrays (24 bytes per node) and way node references
+    and relation members to integer arrays, so the element dicts can be dropped as soon as they
+    are read. Only tags are kept as dicts. Untagged elements (the skeleton nodes and member ways
+    of ``>; out skel``) contribute geometry but are not returned as features; repeated untagged
+    elements collapse when the arrays are packed. A tagged element seen again (e.g. from
+    overlapping tiles) only contributes its geometry, so each feature is returned once.
+    """
 
-    features = []
+    def __init__(self) -> None:
+        self.node_ids, self.node_lon, self.node_lat = array("q"), array("d"), array("d")
+        self.way_ids, self.way_refs, self.way_ref_counts = array("q"), array("q"), array("q")
+        self.relation_ids, self.member_relations, self.member_ways = array("q"), array("q"), array("q")
+        self.member_inner = array("b")
+        # tags of the tagged elements (tagged nodes with their own coordinates), by way/relation position
+        self.tagged_nodes: list[tuple[int, float, float, dict[str, str]]] = []
+        self.way_tags: dict[int, dict[str, str]] = {}
+        self.relation_tags: list[dict[str, str]] = []
+        self._tagged: dict[str, set[int]] = {"node": set(), "way": set(), "relation": set()}
+
+    def __len__(self) -> int:
+        return len(self.node_ids) + len(self.way_ids) + len(self.relation_ids)
+
+    def add(self, el: dict[str, Any]) -> None:
+        """
+        Record one element.
 
-    for el in data["elements"]:
-        geom = None
+        Args:
+            el: Overpass element dictionary
 
-        if el["type"] == "node":
+        """
+        kind, tags = el["type"], el.get("tags")
+        if tags and kind in self._tagged:
+            if el["id"] in self._tagged[kind]:
+                tags = None  # repeated, e.g. from overlapping tiles: geometry only
+            else:
+                self._tagged[kind].add(el["id"])
+        if kind == "node":
             if "lon" in el and "lat" in el:
-                geom = Point(el["lon"], el["lat"])
-
-        elif el["type"] == "way":
-            coords = [(node_by_id[n]["lon"], node_by_id[n]["lat"]) for n in el.get("nodes", []) if n in node_by_id]
-            if coords:
-                if coords[0] == coords[-1] and len(coords) >= 4:
-                    poly = Polygon(coords)
-                    if poly.is_valid and not poly.is_empty:
-                        geom = poly
-                else:
-                    line = LineString(coords)
-                    if line.is_valid and not line.is_empty:
-                        geom = line
-
-        elif el["type"] == "relation":
-            polys = []
+                self.node_ids.append(el["id"])
+                self.node_lon.append(el["lon"])
+                self.node_lat.append(el["lat"])
+                if tags:
+                    self.tagged_nodes.append((el["id"], el["lon"], el["lat"], tags))
+        elif kind == "way":
+            refs = el.get("nodes", [])
+            if tags:
+                self.way_tags[len(self.way_ids)] = tags
+            self.way_ids.append(el["id"])
+            self.way_refs.extend(refs)
+            self.way_ref_counts.append(len(refs))
+        elif kind == "relation" and tags:
+            # untagged relations cannot become features, their members are not needed
             for m in el.get("members", []):
-                if m["type"] == "way" and m.get("role") in ["outer", ""]:
-                    way = way_by_id.get(m["ref"])
-                    if way:
-                        coords = [
-                            (node_by_id[n]["lon"], node_by_id[n]["lat"])
-                            for n in way.get("nodes", [])
-                            if n in node_by_id
-                        ]
-                        if len(coords) >= 3:  # relaxed: allow polygons even if not perfectly closed
-                            try:
-                                poly = Polygon(coords)
-                                if poly.is_valid:
-                                    polys.append(poly)
-                            except Exception:
-                                logger.warning(f"Invalid polygon for way {way['id']} in relation {el['id']}")
-                                continue
-            if polys:
-                geom = MultiPolygon(polys) if len(polys) > 1 else polys[0]
-
-        # Only keep elements with valid geometry
-        if geom is not None and geom.is_valid and not geom.is_empty:
-            features.append({"osm_id": el["id"], "osm_type": el["type"], **el.get("tags", {}), "geometry": geom})
-
-    return gpd.GeoDataFrame(features, crs="EPSG:4326")
+                role = m.get("role")
+                if m["type"] == "way" and (role in OUTER_ROLES or role in INNER_ROLES):
+                    self.member_relations.append(len(self.relation_ids))
+                    self.member_ways.append(m["ref"])
+                    self.member_inner.append(role in INNER_ROLES)
+            self.relation_ids.append(el["id"])
+            self.relation_tags.append(tags)
+
+    def extend(self, elements: Iterable[dict[str, Any]]) -> "ElementCollector":
+        """
+        Record elements from an iterable (e.g. ``stream_overpass_elements``), one at a time.
+
+        Args:
+            elements: Overpass element dictionaries
+
+        Returns:
+            The collector
+
+        """
+        for el in elements:
+            self.add(el)
+        return self
+
+    def _way_coordinates(self, rows: np.ndarray, nodes: NodeStore) -> WayCoordinates:
+        """Resolved coordinates of some ways."""
+        offsets = np.concatenate([[0], np.cumsum(self.way_ref_counts)]).astype(np.intp)
+        counts = np.frombuffer(self.way_ref_counts, dtype=np.int64)[rows]
+        positions, _ = _ragged_positions(offsets[rows], counts)
+        refs = np.frombuffer(self.way_refs, dtype=np.int64)[positions] if positions.size else np.zeros(0, np.int64)
+        return resolve_ways(refs, counts, nodes)
+
+    def feature_batches(
+        self, batch_size: int = STREAM_BATCH_SIZE, repair_invalid: bool = False
+    ) -> Iterator[gpd.GeoDataFrame]:
+        """
+        Build the features of the tagged elements, ``batch_size`` ways or relations at a time.
+
+        Args:
+            batch_size: Ways or relations per batch
+            repair_invalid: Repair invalid geometries with ``shapely.make_valid`` instead of dropping them
+
+        Yields:
+            GeoDataFrames of valid features: tagged nodes, then ways, then relations
+
+        """
+        nodes = build_node_store(
+            np.frombuffer(self.node_ids, dtype=np.int64),
+            np.frombuffer(self.node_lon, dtype=np.float64),
+            np.frombuffer(self.node_lat, dtype=np.float64),
+        )
+
+        for start in range(0, len(self.tagged_nodes), batch_size):
+            batch = self.tagged_nodes[start : start + batch_size]
+            ids, lon, lat, tags = zip(*batch, strict=True)
+            geometries = shapely.points(np.asarray(lon), np.asarray(lat))
+            keep = _valid_positions(geometries, repair_invalid)
+            yield _feature_frame(
+                np.asarray(ids)[keep],
+                np.full(keep.size, "node", dtype=object),
+                [tags[i] for i in keep],
+                geometries[keep],
+            )
+
+        tagged_ways = np.fromiter(self.way_tags, dtype=np.intp, count=len(self.way_tags))
+        for start in range(0, tagged_ways.size, batch_size):
+            rows = tagged_ways[start : start + batch_size]
+            geometries = way_geometries(self._way_coordinates(rows, nodes))
+            keep = _valid_positions(geometries, repair_invalid)
+            yield _feature_frame(
+                np.frombuffer(self.way_ids, dtype=np.int64)[rows[keep]],
+                np.full(keep.size, "way", dtype=object),
+                [self.way_tags[row] for row in rows[keep]],
+                geometries[keep],
+            )
+
+        # member ways resolve to the last way with their id, members of unknown ways are dropped
+        unique_way_ids, way_rows = _last_occurrence(np.frombuffer(self.way_ids, dtype=np.int64))
+        member_relations = np.frombuffer(self.member_relations, dtype=np.int64)
+        member_ways = np.frombuffer(self.member_ways, dtype=np.int64)
+        member_inner = np.frombuffer(self.member_inner, dtype=np.int8).astype(bool)
+        for start in range(0, len(self.relation_ids), batch_size):
+            stop = min(start + batch_size, len(self.relation_ids))
+            first, last = np.searchsorted(member_relations, [start, stop])
+            lookup = _search(unique_way_ids, member_ways[first:last])
+            known = lookup >= 0
+            ways = self._way_coordinates(way_rows[lookup[known]], nodes)
+            geometries = relation_geometries(
+                member_relations[first:last][known].astype(np.intp) - start,
+                np.arange(int(known.sum())),
+                stop - start,
+                ways,
+                member_inner[first:last][known],
+            )
+            keep = _valid_positions(geometries, repair_invalid)
+            yield _feature_frame(
+                np.frombuffer(self.relation_ids, dtype=np.int64)[start:stop][keep],
+                np.full(keep.size, "relation", dtype=object),
+                [self.relation_tags[start + i] for i in keep],
+                geometries[keep],
+            )
+
+    def to_geodataframe(self, batch_size: int = STREAM_BATCH_SIZE, repair_invalid: bool = False) -> gpd.GeoDataFrame:
+        """
+        Build the features of all tagged elements (see ``feature_batches``).
+
+        Args:
+            batch_size: Ways or relations per batch
+            repair_invalid: Repair invalid geometries with ``shapely.make_valid`` instead of dropping them
+
+        Returns:
+            GeoDataFrame with the same columns as ``elements_to_geodataframe``
+
+        """
+        batches = list(self.feature_batches(batch_size, repair_invalid))
+        if not batches:
+            return _feature_frame(np.zeros(0, np.int64), np.zeros(0, dtype=object), [], np.zeros(0, dtype=object))
+        return gpd.GeoDataFrame(pd.concat(batches, ignore_index=True), crs="EPSG:4326")
 
 
 def filter_power_stations(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
@@ -147,7 +1186,7 @@ def filter_power_stations(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
 
 def assign_oblasts(
     stations_gdf: gpd.GeoDataFrame,
-    gadm_url: str = "https://geodata.ucdavis.edu/gadm/gadm4.1/gpkg/gadm41_UKR.gpkg",
+    gadm_url: str = GADM_URL,
     swap_dict: dict | None = None,
 ) -> tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
     """
@@ -205,7 +1244,7 @@ def assign_oblasts(
     return matched_within, gdf_oblasts
 
 
-def match_with_gppd(ukraine_gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+def match_with_gppd(ukraine_gdf: gpd.GeoDataFrame, gppd_url: str = GPPD_URL) -> gpd.GeoDataFrame:
     """
     Add a boolean column 'gppd_overlap' to ukraine_gdf.
 
@@ -213,15 +1252,13 @@ def match_with_gppd(ukraine_gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
 
     Args:
         ukraine_gdf: GeoDataFrame containing Ukrainian power stations
+        gppd_url: URL or path of the GPPD CSV
 
     Returns:
         GeoDataFrame with added 'gppd_overlap' boolean column
 
     """
-    url = (
-        "https://github.com/wri/global-power-plant-database/raw/master/output_database/global_power_plant_database.csv"
-    )
-    df_gppd = pd.read_csv(url, low_memory=False)  # suppress dtype warning
+    df_gppd = pd.read_csv(gppd_url, low_memory=False)  # suppress dtype warning
     gdf_gppd = gpd.GeoDataFrame(
         df_gppd, geometry=gpd.points_from_xy(df_gppd["longitude"], df_gppd["latitude"]), crs="EPSG:4326"
     )
@@ -255,59 +1292,129 @@ def match_with_gppd(ukraine_gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     return ukraine_gdf
 
 
-def fetch_critical_relations(osm_ids: list[int]) -> dict:
-    """Fetch full geometry for critical multipolygon relations."""
-    import itertools
+def relations_query(osm_ids: Iterable[int], timeout: int = 180) -> str:
+    """
+    Build the query for relations by id, with their member ways and nodes as in the bulk response.
 
-    critical_data_list = []
-    for osm_id in osm_ids:
-        query = f"""
-        [out:json][timeout:180];
-        relation({osm_id});
-        out geom qt;
-        """
-        data = fetch_overpass_data(query)
-        critical_data_list.append(data)
+    Args:
+        osm_ids: Relation ids
+        timeout: Server-side timeout of the query in seconds
 
-    # Flatten all elements from individual responses
-    critical_elements = list(itertools.chain.from_iterable(d["elements"] for d in critical_data_list))
-    return {"elements": critical_elements}
+    Returns:
+        Overpass QL query string
 
+    """
+    return f"[out:json][timeout:{timeout}];\nrelation(id:{','.join(str(i) for i in osm_ids)});\nout body; >; out skel qt;\n"
 
-def main() -> None:
+
+def fetch_critical_relations(
+    osm_ids: Iterable[int],
+    url: str = OVERPASS_URL,
+    batch_size: int = RELATION_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    cache_dir: str | os.PathLike = RESPONSE_CACHE_DIR,
+    ttl: float = DEFAULT_CACHE_TTL,
+) -> dict:
+    """
+    Fetch relations by id with one ``relation(id:...)`` query per batch of ids.
+
+    Batches are downloaded concurrently into an on-disk cache keyed by the query text; cached
+    responses younger than ``ttl`` seconds are used without a request.
+
+    Args:
+        osm_ids: Relation ids (sorted and deduplicated, so equal lists share cache entries)
+        url: Overpass API endpoint
+        batch_size: Relation ids per query
+        workers: Concurrent downloads
+        cache_dir: Directory of the cached responses
+        ttl: Maximum age of a cached response in seconds (0 disables the cache)
+
+    Returns:
+        Dictionary with the 'elements' of all batches
+
+    Raises:
+        RuntimeError: If batches still fail after their retries
+
+    """
+    ids = sorted(set(osm_ids))
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    downloads: dict[str, tuple[str, Path]] = {}
+    for start in range(0, len(ids), batch_size):
+        query = relations_query(ids[start : start + batch_size])
+        path = cache_dir / f"{query_digest(query)}.json"
+        if path.exists() and time.time() - path.stat().st_mtime >= ttl:
+            path.unlink()
+        downloads[f"relations {ids[start]}-{ids[min(start + batch_size, len(ids)) - 1]}"] = (query, path)
+    cached = sum(path.exists() for _, path in downloads.values())
+    if cached:
+        logger.info("Using %d/%d cached relation batches", cached, len(downloads))
+
+    failed = download_concurrently(downloads, url, workers, RateLimiter())
+    if failed:
+        raise RuntimeError(f"{len(failed)} relation batches failed ({', '.join(failed)})")
+    paths = [path for _, path in downloads.values()]
+    return {"elements": list(iter_file_elements(paths))}
+
+
+def _parse_grid(value: str) -> tuple[int, int]:
+    """Parse a grid size such as '3x4' (rows x columns)."""
+    rows, _, cols = value.lower().partition("x")
+    return int(rows), int(cols or rows)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
     """
     Main function to process Ukrainian power stations data.
 
-    Implements two-step fetch: bulk skeleton + individual critical multipolygons.
-    """
-    # --- Bulk skeleton query ---
-    bulk_query = """
-    [out:json][timeout:180];
-    area["ISO3166-1"="UA"][admin_level=2]->.a;
-    (
-      node["power"="plant"](area.a);
-      way["power"="plant"](area.a);
-      relation["power"="plant"](area.a);
-      node["power"="substation"]["substation"="transmission"](area.a);
-      way["power"="substation"]["substation"="transmission"](area.a);
-      relation["power"="substation"]["substation"="transmission"](area.a);
-    );
-    out body; >; out skel qt;
-    """
-    print("Downloading bulk OSM power stations (skeleton)...")
-    bulk_data = fetch_overpass_data(bulk_query)
-
-    # --- Critical multipolygon relations ---
-    critical_relations = [7317657]  # Kakhovka HPP, add others as needed
-    print(f"Downloading critical relations with full geometry: {critical_relations}")
-    critical_data = fetch_critical_relations(critical_relations)
-
-    # --- Combine bulk + critical elements ---
-    all_elements = bulk_data["elements"] + critical_data["elements"]
-    combined_data = {"elements": all_elements}
+    Downloads the bulk skeleton tile by tile (or in one query) and builds all geometries locally.
+
+    Args:
+        argv: Command line arguments (``sys.argv[1:]`` when None)
+
+    """
+    parser = argparse.ArgumentParser(description="Refresh the power station data from OpenStreetMap")
+    parser.add_argument("--endpoint", default=OVERPASS_URL, help="Overpass API endpoint")
+    parser.add_argument("--tiles", choices=("grid", "oblasts", "none"), default="grid", help="bulk query split")
+    parser.add_argument("--grid", type=_parse_grid, default=DEFAULT_GRID, help="grid size, e.g. 3x4")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent tile downloads")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL, help="seconds between requests")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="retries per tile")
+    parser.add_argument("--download-dir", default=str(DOWNLOAD_DIR), help="tile responses (resumed from)")
+    parser.add_argument(
+        "--relation", type=int, action="append", default=list(CRITICAL_RELATIONS), help="extra relation id to fetch"
+    )
+    args = parser.parse_args(argv)
+
+    # The responses are parsed as they are read, elements are packed into arrays as they arrive
+    if args.tiles == "none":
+        print("Downloading bulk OSM power stations (skeleton)...")
+        elements, paths = stream_overpass_elements(bulk_query(), url=args.endpoint), []
+    else:
+        tiles = grid_tiles(UKRAINE_BBOX, *args.grid) if args.tiles == "grid" else oblast_tiles()
+        print(f"Downloading bulk OSM power stations (skeleton) in {len(tiles)} tiles...")
+        paths = download_tiles(
+            tiles,
+            args.download_dir,
+            url=args.endpoint,
+            workers=args.workers,
+            min_interval=args.min_interval,
+            retries=args.retries,
+        )
+        elements = iter_file_elements(paths)
+    if args.relation:
+        print(f"Downloading extra relations: {sorted(set(args.relation))}")
+        extra = fetch_critical_relations(args.relation, url=args.endpoint, workers=args.workers)
+        elements = itertools.chain(elements, extra["elements"])
+    # tiles overlap where features cross their edges and extra relations may be in the bulk
+    # response: the collector returns every tagged element once
+    collector = ElementCollector().extend(elements)
+    print(f"Elements received: {len(collector)}")
 
     # --- Convert to GeoDataFrame ---
-    gdf = elements_to_geodataframe(combined_data)
+    # Multipolygon relations (e.g. Kakhovka HPP, 7317657) are assembled from the member ways of
+    # the bulk response, split outer ways and inner holes included
+    gdf = collector.to_geodataframe()
     print(f"Total features after conversion: {len(gdf)}")
 
     # --- Filter valid power stations / substations ---
@@ -329,6 +1436,10 @@ def main() -> None:
     print(f"✅ Saved stations → {stations_path}")
     print(f"✅ Saved oblasts → {oblasts_path}")
 
+    # the next run downloads fresh data
+    for path in paths:
+        path.unlink(missing_ok=True)
+
 
 if __name__ == "__main__":
     main()
@@ -8,38 +8,11 @@ for the Ukraine Energy Dashboard including headers, footers, and content areas.
 import geopandas as gpd
 from dash import dash_table, dcc, html
 
+from components.export import EXPORT_FORMATS
+from components.fuels import FuelMatrix
+from components.table import DEFAULT_PAGE_SIZE, TABLE_COLUMNS
 from components.utils import generate_data_note
 
-unique_oblasts = [
-    "Cherkasy",
-    "Kiev",
-    "Zaporizhia",
-    "Mykolayiv",
-    "Khmelnytskyi",
-    "Rivne",
-    "Kharkiv",
-    "Vinnytsya",
-    "Crimea",
-    "Kherson",
-    "Donetsk",
-    "Kiev City",
-    "Chernihiv",
-    "Dnipropetrovsk",
-    "Luhansk",
-    "Lviv",
-    "Sevastopol",
-    "Odessa",
-    "Chernivtsi",
-    "Kirovohrad",
-    "Ivano-Frankivsk",
-    "Zakarpattia",
-    "Volyn",
-    "Ternopil",
-    "Zhytomyr",
-    "Sumy",
-    "Poltava",
-]
-
 
 def get_header_with_buttons() -> html.Div:
     """
@@ -89,13 +62,16 @@ def get_footer() -> html.Div:
     )
 
 
-def get_main_content_with_oblast(unique_oblasts: list[str], stations_df: gpd.GeoDataFrame) -> html.Div:
+def get_main_content_with_oblast(
+    oblast_names: list[str], stations_df: gpd.GeoDataFrame, fuels: FuelMatrix | None = None
+) -> html.Div:
     """
     Create the main content area with sidebar and map components.
 
     Args:
-        unique_oblasts: List of oblast names for the dropdown filter
+        oblast_names: Oblast names for the dropdown filter (from the OblastRegistry)
         stations_df: GeoDataFrame containing power station data for generating data note
+        fuels: Prebuilt FuelMatrix of ``stations_df`` for the data note
 
     Returns:
         Dash HTML Div containing the main dashboard content
@@ -109,7 +85,7 @@ def get_main_content_with_oblast(unique_oblasts: list[str], stations_df: gpd.Geo
                 className="description-container",
             ),
             # Data note
-            generate_data_note(stations_df),
+            generate_data_note(stations_df, fuels),
             # Filters
             html.Div(
                 [
@@ -208,7 +184,7 @@ def get_main_content_with_oblast(unique_oblasts: list[str], stations_df: gpd.Geo
                     dcc.Dropdown(
                         id="oblast-dropdown",
                         options=[{"label": "All Ukraine", "value": "all"}]
-                        + [{"label": oblast, "value": oblast} for oblast in unique_oblasts],
+                        + [{"label": oblast, "value": oblast} for oblast in oblast_names],
                         value=None,  # default: show whole Ukraine
                         className="dropdown-style",
                         clearable=True,
@@ -248,7 +224,21 @@ def get_main_content_with_oblast(unique_oblasts: list[str], stations_df: gpd.Geo
                     "modeBarButtonsToAdd": ["zoom2d", "resetScale2d", "lasso2d"],
                 },
             ),
+            html.Button(
+                [html.I(className="fas fa-expand", style={"margin-right": "6px"}), "Reset view"],
+                id="reset-view-button",
+                className="reset-view-btn",
+                n_clicks=0,
+            ),
+            # current viewport (center/zoom/bounds), written client-side on pan/zoom
             dcc.Store(id="map-view-store-mainpage", data={}),
+            # station the server last zoomed to, kept across filter changes
+            dcc.Store(id="map-focus-store", data={}),
+            # whether the map is drawn with level of detail, and the viewports forwarded to the server then
+            dcc.Store(id="map-lod-store", data={"enabled": False}),
+            dcc.Store(id="map-lod-view-store", data={}),
+            # token of the shared selection (filters, oblast, lasso/box); its rows stay in the server's cache
+            dcc.Store(id="selection-store", data={}),
         ],
         className="map-section",
     )
@@ -268,20 +258,17 @@ def get_main_content_with_oblast(unique_oblasts: list[str], stations_df: gpd.Geo
         children=[
             dash_table.DataTable(
                 id="stations-table",
-                columns=[
-                    {"name": c, "id": c}
-                    for c in [
-                        "name",
-                        "station_name_en",
-                        "power",
-                        "plant:source",
-                        "plant:method",
-                        "oblast_name_en",
-                        "gppd_overlap",
-                    ]
-                ],
+                columns=[{"name": c, "id": c} for c in TABLE_COLUMNS],
                 data=[],
-                page_size=10,
+                # paging, sorting and the filter row are answered on the server, one page at a time
+                page_action="custom",
+                page_current=0,
+                page_size=DEFAULT_PAGE_SIZE,
+                sort_action="custom",
+                sort_mode="multi",
+                sort_by=[],
+                filter_action="custom",
+                filter_query="",
                 export_format=None,  # disable default top-left export button
                 style_table={
                     "overflowX": "auto",
@@ -294,30 +281,42 @@ def get_main_content_with_oblast(unique_oblasts: list[str], stations_df: gpd.Geo
             ),
             html.Div(
                 children=[
-                    html.Span("Download", className="download-text"),  # text next to button
-                    html.Button(
+                    html.Span(id="stations-table-count", className="table-count"),
+                    html.Span("Download", className="download-text"),  # text next to dropdown + button
+                    dcc.Dropdown(
+                        id="export-format",
+                        options=[{"label": f.label, "value": key} for key, f in EXPORT_FORMATS.items()],
+                        value="xlsx",
+                        clearable=False,
+                        searchable=False,
+                        className="export-format-dropdown",
+                    ),
+                    # href is set by a callback to the server-side export of the current table rows
+                    html.A(
                         html.I(className="fa-solid fa-download"),  # Font Awesome icon
-                        id="download-button",
-                        n_clicks=0,
+                        id="download-link",
+                        href="/export/xlsx",
                         className="download-btn minimal-btn",
                     ),
                 ],
                 className="download-wrapper",
             ),
-            dcc.Download(id="download-data"),
         ],
     )
 
     return html.Div([top_section, table_section], className="main-content")
 
 
-def get_main_layout(unique_oblasts: list[str], stations_df: gpd.GeoDataFrame) -> html.Div:
+def get_main_layout(
+    oblast_names: list[str], stations_df: gpd.GeoDataFrame, fuels: FuelMatrix | None = None
+) -> html.Div:
     """
     Create the complete main layout for the dashboard.
 
     Args:
-        unique_oblasts: List of oblast names for the dropdown filter
+        oblast_names: Oblast names for the dropdown filter (from the OblastRegistry)
         stations_df: GeoDataFrame containing power station data for generating data note
+        fuels: Prebuilt FuelMatrix of ``stations_df`` for the data note
 
     Returns:
         Dash HTML Div containing the complete dashboard layout
@@ -326,7 +325,7 @@ def get_main_layout(unique_oblasts: list[str], stations_df: gpd.GeoDataFrame) ->
     return html.Div(
         [
             html.Div(children=[get_header_with_buttons()], className="header"),
-            html.Div(children=[get_main_content_with_oblast(unique_oblasts, stations_df)], className="body"),
+            html.Div(children=[get_main_content_with_oblast(oblast_names, stations_df, fuels)], className="body"),
             get_footer(),
         ],
         className="main-layout",